@@ -1,54 +1,146 @@
-from flask import Flask
-from flask_pymongo import PyMongo
-from flask_jwt_extended import JWTManager
-from flask_bcrypt import Bcrypt
-from flask_cors import CORS
 from dotenv import load_dotenv
+from importlib import import_module
 import os
-from datetime import timedelta
-from config import Config
 
-# Load environment variables
+# Load environment variables before Config reads them
 load_dotenv()
 
-app = Flask(__name__)
-
-# Configuration
-app.config['MONGO_URI'] = Config.MONGO_URI
-app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = Config.JWT_ACCESS_TOKEN_EXPIRES
-
-# Initialize extensions
-mongo = PyMongo(app)
-jwt = JWTManager(app)
-bcrypt = Bcrypt(app)
-CORS(app)
-
-# Initialize database service
-from services.database import db_service
-db_service.init_app(app)
+from config import Config
 
-# Import routes
-from routes.auth_routes import auth_bp
-from routes.category_routes import category_bp
-from routes.expense_routes import expense_bp
+# Feature blueprints that deployments switch on through Config.OPTIONAL_BLUEPRINTS
+OPTIONAL_BLUEPRINTS = {
+    'income': ('routes.income_routes', 'income_bp')
+}
 
-# Register blueprints
-app.register_blueprint(auth_bp, url_prefix='/api')
-app.register_blueprint(category_bp, url_prefix='/api')
-app.register_blueprint(expense_bp, url_prefix='/api')
+def create_app(config=Config):
+    """Build the API on the services layer; every entry point serves this app.
+    
+    Importing this module builds nothing: extensions, services and routes are
+    imported and initialized here, and the MongoDB client on its first query.
+    `config` only sets the Flask settings and optional blueprints; services are
+    module-level singletons that still read the global Config. Building an app
+    starts no threads, serving entry points call start_background_workers().
+    """
+    from flask import Flask
+    from flask_jwt_extended import JWTManager
+    from flask_cors import CORS
+    
+    app = Flask(__name__)
+    
+    # Configuration
+    app.config['MONGO_URI'] = config.MONGO_URI
+    app.config['JWT_SECRET_KEY'] = config.JWT_SECRET_KEY
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = config.JWT_ACCESS_TOKEN_EXPIRES
+    
+    # Initialize extensions
+    jwt = JWTManager(app)
+    CORS(app)
+    
+    # Tokens from the retired single-file servers carry a bare user id instead
+    # of the identity dict the routes read; those clients have to log in again
+    @jwt.token_verification_loader
+    def has_identity(jwt_header, jwt_data):
+        return isinstance(jwt_data.get('sub'), dict)
+    
+    @jwt.token_verification_failed_loader
+    def reject_legacy_token(jwt_header, jwt_data):
+        return {'status': 'error', 'message': 'Token is no longer valid. Please log in again'}, 401
+    
+    # Initialize database service (the app's Mongo client; the readiness probe keeps its own)
+    from services.database import db_service
+    db_service.init_app(app)
+    
+    # Import routes
+    from routes.auth_routes import auth_bp
+    from routes.category_routes import category_bp
+    from routes.expense_routes import expense_bp
+    from routes.batch_routes import batch_bp
+    from routes.recurring_routes import recurring_bp
+    from routes.budget_routes import budget_bp
+    from routes.tag_routes import tag_bp
+    
+    # Register blueprints
+    app.register_blueprint(auth_bp, url_prefix='/api')
+    app.register_blueprint(category_bp, url_prefix='/api')
+    app.register_blueprint(expense_bp, url_prefix='/api')
+    app.register_blueprint(batch_bp, url_prefix='/api')
+    app.register_blueprint(recurring_bp, url_prefix='/api')
+    app.register_blueprint(budget_bp, url_prefix='/api')
+    app.register_blueprint(tag_bp, url_prefix='/api')
+    
+    for name in config.OPTIONAL_BLUEPRINTS:
+        if name not in OPTIONAL_BLUEPRINTS:
+            raise ValueError(f"Unknown optional blueprint: {name}")
+        module_name, blueprint_name = OPTIONAL_BLUEPRINTS[name]
+        app.register_blueprint(getattr(import_module(module_name), blueprint_name), url_prefix='/api')
+    
+    # Register error handlers
+    from utils.error_handlers import register_error_handlers
+    register_error_handlers(app)
+    
+    # Register tracing first so its request span encloses the other hooks
+    from utils.tracing import register_tracing
+    register_tracing(app)
+    
+    # Register opt-in request profiling
+    from utils.profiling import register_profiling
+    register_profiling(app)
+    
+    # Register metrics before compression so latency includes encoding time
+    from utils.metrics import register_metrics
+    register_metrics(app)
+    
+    # Register rate limiting after metrics so rejected requests are still counted
+    from utils.rate_limit import register_rate_limiting
+    register_rate_limiting(app)
+    
+    # Register response compression
+    from utils.compression import register_compression
+    register_compression(app)
+    
+    @app.route('/')
+    def home():
+        return {'message': 'Expense Tracker API is running!', 'status': 'success'}
+    
+    @app.route('/health')
+    @app.route('/health/live')
+    def health_check():
+        return {'status': 'healthy', 'message': 'API is operational'}
+    
+    @app.route('/health/ready')
+    def readiness_check():
+        from services.health_service import health_service
+        ready, report = health_service.readiness()
+        return report, 200 if ready else 503
+    
+    return app
 
-# Register error handlers
-from utils.error_handlers import register_error_handlers
-register_error_handlers(app)
+def start_background_workers(reloader=False):
+    """Start the per-process threads a serving worker needs (no-op when disabled or running).
 
-@app.route('/')
-def home():
-    return {'message': 'Expense Tracker API is running!', 'status': 'success'}
+    Pass reloader=True when serving with the Werkzeug reloader: its parent
+    process only watches files, so the threads start in the serving child.
+    """
+    if reloader and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return
+    
+    # Cross-worker cache invalidation
+    from services.cache_invalidation import invalidation_watcher
+    invalidation_watcher.start()
+    
+    # Materializing recurring expenses
+    from services.recurring_scheduler import recurring_scheduler
+    recurring_scheduler.start()
 
-@app.route('/health')
-def health_check():
-    return {'status': 'healthy', 'message': 'API is operational'}
+def __getattr__(name):
+    # `from app import app` (wsgi.py, the legacy shims) builds the default app on first use
+    global app
+    if name == 'app':
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
+    app = create_app()
+    start_background_workers(reloader=True)
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the model and service layers
+Times the hot, database-free code paths with timeit and compares them with a
+stored JSON baseline. Exits non-zero when any case is slower than the
+baseline by more than --max-regression percent.
+
+Baselines are machine-specific: refresh them with --update-baseline on the
+machine that runs the gate.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --update-baseline
+    python benchmarks/run_benchmarks.py --only expense_ --max-regression 15
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bson import ObjectId
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def build_cases():
+    """Return {name: (callable, description)} for every benchmark case"""
+    from array import array
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token, decode_token
+    from models.expense import Expense, ExpenseSchema
+    from services.database import DatabaseService
+    from services.expense_cache import ExpenseColumns, to_millis
+    from services.expense_service import ExpenseService
+    from services.fx_rates import fx_rates
+    from config import Config
+
+    rng = random.Random(1234)
+    user_id = str(ObjectId())
+    category_ids = [str(ObjectId()) for _ in Config.EXPENSE_CATEGORIES]
+    start = datetime(2024, 1, 1)
+
+    expense_date = datetime(2025, 6, 1, 12, 30)
+    expense = Expense(42.5, 'Weekly grocery shopping', expense_date, category_ids[0], user_id, ObjectId())
+    payload = {
+        'amount': 42.5,
+        'note': 'Weekly grocery shopping',
+        'expense_date': '2025-06-01T12:30:00Z',
+        'category_id': category_ids[0]
+    }
+    schema = ExpenseSchema()
+
+    # 10k expenses for the summary grouping cases
+    rows = sorted(
+        (start + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+         round(rng.lognormvariate(3.5, 0.8), 2),
+         rng.randrange(len(category_ids)))
+        for _ in range(10000)
+    )
+    expenses = [Expense(amount, 'note', moment, category_ids[index], user_id, ObjectId())
+                for moment, amount, index in rows]
+    columns = ExpenseColumns(array('q', (to_millis(moment) for moment, _, _ in rows)),
+                             array('d', (amount for _, amount, _ in rows)),
+                             array('h', (index for _, _, index in rows)),
+                             category_ids)
+    window_start, window_end = datetime(2024, 6, 1), datetime(2025, 6, 1)
+    currency_codes = [None, 'USD', 'GBP', 'INR']
+    currencies = array('h', (rng.randrange(len(currency_codes)) for _ in rows))
+
+    valid_id = str(ObjectId())
+
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = Config.JWT_SECRET_KEY
+    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = Config.JWT_ACCESS_TOKEN_EXPIRES
+    JWTManager(app)
+    identity = {'user_id': user_id, 'email': 'bench@example.com', 'first_name': 'Bench', 'last_name': 'User'}
+    with app.app_context():
+        token = create_access_token(identity=identity)
+
+    def jwt_encode():
+        with app.app_context():
+            create_access_token(identity=identity)
+
+    def jwt_decode():
+        with app.app_context():
+            decode_token(token)
+
+    def date_windows():
+        for filter_type in ('past_week', 'last_month', 'last_3_months'):
+            ExpenseService.resolve_filter_window(filter_type)
+
+    return {
+        'expense_init': (lambda: Expense(42.5, 'note', expense_date, category_ids[0], user_id),
+                         'Expense.__init__ with datetime and str ids'),
+        'expense_init_isoformat': (lambda: Expense(42.5, 'note', '2025-06-01T12:30:00Z', category_ids[0], user_id),
+                                   'Expense.__init__ parsing an ISO date string'),
+        'expense_to_dict': (expense.to_dict, 'Expense.to_dict full representation'),
+        'expense_to_dict_sparse': (lambda: expense.to_dict(('_id', 'amount', 'expense_date', 'category_id')),
+                                   'Expense.to_dict with a sparse fieldset'),
+        'expense_schema_load': (lambda: schema.load(payload), 'ExpenseSchema.load of a create payload'),
+        'summary_grouping_10k': (lambda: ExpenseService.summarize_expenses(expenses),
+                                 'ExpenseService.summarize_expenses over 10k Expense objects'),
+        'summary_columns_10k': (lambda: columns.summary(window_start, window_end),
+                                'ExpenseColumns.summary over a 1-year window of 10k rows'),
+        'fx_convert_columns_10k': (lambda: fx_rates.convert_columns(columns.amounts, currencies, currency_codes,
+                                                                    columns.dates, 'EUR'),
+                                   'FxRateTable.convert_columns of 10k mixed-currency rows'),
+        'is_valid_object_id': (lambda: DatabaseService.is_valid_object_id(valid_id),
+                               'DatabaseService.is_valid_object_id on a valid id'),
+        'is_valid_object_id_invalid': (lambda: DatabaseService.is_valid_object_id('not-an-id'),
+                                       'DatabaseService.is_valid_object_id on an invalid id'),
+        'jwt_encode': (jwt_encode, 'create_access_token inside an app context'),
+        'jwt_decode': (jwt_decode, 'decode_token inside an app context'),
+        'filter_date_windows': (date_windows, 'resolve_filter_window for the three relative filters')
+    }
+
+def measure(func, repeat):
+    """Best-of-repeat time per call in nanoseconds"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description='Run microbenchmarks against a JSON baseline')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='allowed slowdown versus baseline, in percent')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--confirm', type=int, default=2,
+                        help='re-measure a regressed case this many times before failing it')
+    parser.add_argument('--only', help='run only cases whose name contains this string')
+    parser.add_argument('--json', help='also write this run to a file')
+    args = parser.parse_args()
+
+    cases = build_cases()
+    if args.only:
+        cases = {name: case for name, case in cases.items() if args.only in name}
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+
+    results = {}
+    regressions = []
+    print(f"{'case':<30}{'ns/op':>14}{'baseline':>14}{'change':>10}")
+    print("-" * 68)
+    for name, (func, _) in cases.items():
+        results[name] = round(measure(func, args.repeat), 1)
+        previous = baseline.get(name)
+        change = ''
+        if previous:
+            # Noise only ever makes a case slower, so keep the best re-run
+            for _ in range(args.confirm):
+                if results[name] <= previous * (1 + args.max_regression / 100):
+                    break
+                results[name] = min(results[name], round(measure(func, args.repeat), 1))
+            delta = (results[name] - previous) / previous * 100
+            change = f'{delta:+.1f}%'
+            if delta > args.max_regression:
+                regressions.append((name, delta))
+                change += ' !'
+        print(f"{name:<30}{results[name]:>14,.1f}{previous or '-':>14}{change:>10}")
+
+    run = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'unit': 'ns/op',
+        'cases': {name: description for name, (_, description) in cases.items()},
+        'results': results
+    }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} case(s) regressed by more than {args.max_regression}%:")
+        for name, delta in regressions:
+            print(f"   {name}: {delta:+.1f}%")
+        return 1
+
+    print("\nAll cases within the regression budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
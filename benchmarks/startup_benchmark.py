@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Cold start benchmark for the API workers
+Starts fresh interpreters and measures, with `python -X importtime`:
+  - importing app (should build nothing),
+  - building the app with create_app(), reporting the slowest top-level imports.
+With --serve it also starts `run.py --mode prod` and times how long the
+worker takes to answer /health/ready with 200 (needs a reachable MongoDB).
+
+Exits non-zero when building the app or passing readiness takes longer
+than --budget seconds (default Config.STARTUP_BUDGET_SECONDS).
+
+Usage:
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --serve --port 5055
+    python benchmarks/startup_benchmark.py --repeat 5 --top 15 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Each snippet reports when it finished and skips interpreter shutdown, which
+# waits on background threads (Mongo monitors)
+FINISHED = "import os, sys, time; sys.stderr.write(f'finished at: {time.time()}\\n'); sys.stderr.flush(); os._exit(0)"
+IMPORT_APP = "import app; " + FINISHED
+BUILD_APP = "from app import create_app; create_app(); " + FINISHED
+
+def parse_importtime(stderr):
+    """[(module, self us, cumulative us, depth)] from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+def run_interpreter(code):
+    """Run code in a fresh interpreter; return (seconds from launch to finishing, importtime rows)"""
+    started = time.time()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, capture_output=True, text=True)
+    finished = [line for line in result.stderr.splitlines() if line.startswith('finished at:')]
+    if result.returncode != 0 or not finished:
+        raise RuntimeError(f"`{code}` failed:\n{result.stderr[-2000:]}")
+    return float(finished[0].split(':', 1)[1]) - started, parse_importtime(result.stderr)
+
+def time_readiness(port, timeout):
+    """Seconds from starting a production worker until /health/ready returns 200, or None"""
+    env = dict(os.environ, PORT=str(port))
+    worker = subprocess.Popen([sys.executable, 'run.py', '--mode', 'prod'], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    started = time.perf_counter()
+    try:
+        while time.perf_counter() - started < timeout:
+            if worker.poll() is not None:
+                raise RuntimeError(f"worker exited with status {worker.returncode}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/health/ready', timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                # Refused while starting, 503 until MongoDB answers, or a probe that timed out
+                pass
+            time.sleep(0.05)
+        return None
+    finally:
+        worker.terminate()
+        worker.wait()
+
+def main():
+    from config import Config
+
+    parser = argparse.ArgumentParser(description='Measure worker cold start time')
+    parser.add_argument('--budget', type=float, default=Config.STARTUP_BUDGET_SECONDS,
+                        help='allowed seconds to build the app, and to pass readiness with --serve')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest top-level imports to list')
+    parser.add_argument('--serve', action='store_true', help='also time run.py until /health/ready passes')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--json', help='also write this run to a file')
+    args = parser.parse_args()
+
+    import_runs = [run_interpreter(IMPORT_APP) for _ in range(args.repeat)]
+    build_runs = [run_interpreter(BUILD_APP) for _ in range(args.repeat)]
+
+    import_us = statistics.median(next(cumulative for name, _, cumulative, depth in rows
+                                       if name == 'app' and depth == 0)
+                                  for _, rows in import_runs)
+    build_seconds = statistics.median(elapsed for elapsed, _ in build_runs)
+    interpreter_seconds = statistics.median(elapsed for elapsed, _ in import_runs)
+
+    # Imports made while building, attributed to the top-level module that triggered them
+    _, rows = min(build_runs, key=lambda run: run[0])
+    slowest = sorted(((name, cumulative) for name, _, cumulative, depth in rows if depth == 0),
+                     key=lambda row: row[1], reverse=True)[:args.top]
+
+    print(f"{'measurement':<34}{'value':>14}")
+    print("-" * 48)
+    print(f"{'import app':<34}{import_us / 1000:>11.1f} ms")
+    print(f"{'interpreter + import app':<34}{interpreter_seconds * 1000:>11.1f} ms")
+    print(f"{'interpreter + create_app()':<34}{build_seconds * 1000:>11.1f} ms")
+
+    print(f"\nSlowest top-level imports while building the app:")
+    for name, cumulative in slowest:
+        print(f"   {name:<40}{cumulative / 1000:>9.1f} ms")
+
+    ready_seconds = None
+    if args.serve:
+        ready_seconds = time_readiness(args.port, max(args.budget * 2, 10))
+        shown = f"{ready_seconds * 1000:.1f} ms" if ready_seconds is not None else 'not ready'
+        print(f"\n{'run.py until /health/ready':<34}{shown:>14}")
+
+    run = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'created_at': datetime.utcnow().isoformat() + 'Z',
+        'budget_seconds': args.budget,
+        'results': {
+            'import_app_ms': round(import_us / 1000, 1),
+            'interpreter_import_app_ms': round(interpreter_seconds * 1000, 1),
+            'interpreter_create_app_ms': round(build_seconds * 1000, 1),
+            'ready_ms': round(ready_seconds * 1000, 1) if ready_seconds is not None else None
+        },
+        'slowest_imports_ms': {name: round(cumulative / 1000, 1) for name, cumulative in slowest}
+    }
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(run, f, indent=2, sort_keys=True)
+
+    failures = []
+    if build_seconds > args.budget:
+        failures.append(f"building the app took {build_seconds:.2f}s")
+    if args.serve and (ready_seconds is None or ready_seconds > args.budget):
+        failures.append("readiness was not reached" if ready_seconds is None
+                        else f"readiness took {ready_seconds:.2f}s")
+
+    if failures:
+        print(f"\nFAILED: over the {args.budget:.1f}s startup budget: {'; '.join(failures)}")
+        return 1
+
+    print(f"\nCold start within the {args.budget:.1f}s budget")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,104 @@ class Config:
     # Flask Configuration
     DEBUG = os.getenv('FLASK_ENV', 'development') == 'development'
     
+    # Per-worker expense cache budget in bytes (0 disables the cache)
+    EXPENSE_CACHE_MAX_BYTES = int(os.getenv('EXPENSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    
+    # Cross-worker cache invalidation: auto, change_stream, polling or off
+    CACHE_INVALIDATION_MODE = os.getenv('CACHE_INVALIDATION_MODE', 'auto')
+    CACHE_INVALIDATION_POLL_SECONDS = float(os.getenv('CACHE_INVALIDATION_POLL_SECONDS', 2))
+    CACHE_INVALIDATION_OUTBOX_TTL = int(os.getenv('CACHE_INVALIDATION_OUTBOX_TTL', 3600))
+    
+    # ETag validity bucket for time-relative filters such as past_week
+    ETAG_RELATIVE_WINDOW_SECONDS = int(os.getenv('ETAG_RELATIVE_WINDOW_SECONDS', 60))
+    
+    # Response compression (br and zstd need the brotli / zstandard packages)
+    COMPRESSION_ALGORITHMS = [name.strip() for name in os.getenv('COMPRESSION_ALGORITHMS', 'zstd,br,gzip').split(',') if name.strip()]
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+    ZSTD_LEVEL = int(os.getenv('ZSTD_LEVEL', 3))
+    
+    # Batch endpoint limits
+    BATCH_MAX_REQUESTS = int(os.getenv('BATCH_MAX_REQUESTS', 20))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 4))
+    
+    # Slow query log: threshold in ms (negative disables) and optional explain() capture
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', 'false').lower() == 'true'
+    SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
+    
+    # Readiness probe thresholds and result cache window
+    READINESS_CACHE_SECONDS = float(os.getenv('READINESS_CACHE_SECONDS', 2))
+    READINESS_MAX_PING_MS = float(os.getenv('READINESS_MAX_PING_MS', 250))
+    READINESS_MAX_POOL_SATURATION = float(os.getenv('READINESS_MAX_POOL_SATURATION', 0.9))
+    READINESS_MAX_IN_FLIGHT = int(os.getenv('READINESS_MAX_IN_FLIGHT', 64))
+    
+    # Bearer token Prometheus must send to scrape /metrics (unset hides the endpoint)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    
+    # Opt-in request profiling: admin header token and/or random sampling rate
+    PROFILE_ADMIN_TOKEN = os.getenv('PROFILE_ADMIN_TOKEN', '')
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_MODE = os.getenv('PROFILE_MODE', 'cprofile')  # cprofile (pstats) or sample (speedscope)
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.001))
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))
+    
+    # Tracing: spans are appended as JSON lines to TRACE_FILE
+    TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+    TRACE_FILE = os.getenv('TRACE_FILE', 'traces/spans.jsonl')
+    
+    # Idempotency-Key retention (Mongo TTL) and per-worker LRU size; a key still
+    # processing after the lease period can be taken over by a retry
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv('IDEMPOTENCY_TTL_SECONDS', 86400))
+    IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 10000))
+    IDEMPOTENCY_LEASE_SECONDS = int(os.getenv('IDEMPOTENCY_LEASE_SECONDS', 30))
+    
+    # Rate limiting: token buckets given as "capacity/seconds"; storage is memory or mongo (shared by replicas)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+    RATE_LIMIT_STORAGE = os.getenv('RATE_LIMIT_STORAGE', 'memory')
+    RATE_LIMIT_TRUST_PROXY = os.getenv('RATE_LIMIT_TRUST_PROXY', 'false').lower() == 'true'
+    RATE_LIMIT_AUTH = os.getenv('RATE_LIMIT_AUTH', '10/60')
+    RATE_LIMIT_EXPENSIVE = os.getenv('RATE_LIMIT_EXPENSIVE', '30/60')
+    RATE_LIMIT_READ = os.getenv('RATE_LIMIT_READ', '300/60')
+    RATE_LIMIT_WRITE = os.getenv('RATE_LIMIT_WRITE', '120/60')
+    
+    # Recurring expense scheduler
+    RECURRING_SCHEDULER_ENABLED = os.getenv('RECURRING_SCHEDULER_ENABLED', 'true').lower() == 'true'
+    RECURRING_POLL_SECONDS = float(os.getenv('RECURRING_POLL_SECONDS', 60))
+    RECURRING_BATCH_SIZE = int(os.getenv('RECURRING_BATCH_SIZE', 500))
+    RECURRING_MAX_OCCURRENCES_PER_PASS = int(os.getenv('RECURRING_MAX_OCCURRENCES_PER_PASS', 100))
+    
+    # Budget alert thresholds, in percent of the monthly budget
+    BUDGET_ALERT_THRESHOLDS = sorted(int(level) for level in os.getenv('BUDGET_ALERT_THRESHOLDS', '80,100').split(',') if level.strip())
+    
+    # Note search: text uses a MongoDB text index, memory an in-process index per user, auto tries text first;
+    # prefix queries (word*) always use the in-process index
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+    SEARCH_INDEX_MAX_USERS = int(os.getenv('SEARCH_INDEX_MAX_USERS', 100))
+    
+    # Currencies: amounts convert to each user's home currency with rates from FX_RATES_FILE
+    DEFAULT_CURRENCY = os.getenv('DEFAULT_CURRENCY', 'USD').upper()
+    FX_BASE_CURRENCY = os.getenv('FX_BASE_CURRENCY', 'EUR').upper()
+    FX_RATES_FILE = os.getenv('FX_RATES_FILE', 'data/fx_rates.csv')
+    
+    # Spending forecast: days of history fed to the model, smoothing factor and per-worker cache size
+    FORECAST_HISTORY_DAYS = int(os.getenv('FORECAST_HISTORY_DAYS', 182))
+    FORECAST_SMOOTHING = float(os.getenv('FORECAST_SMOOTHING', 0.2))
+    FORECAST_CACHE_MAX_USERS = int(os.getenv('FORECAST_CACHE_MAX_USERS', 1000))
+    
+    # Anomaly flags: z-score over log amounts per user and category, once a category has enough history
+    ANOMALY_Z_THRESHOLD = float(os.getenv('ANOMALY_Z_THRESHOLD', 3.0))
+    ANOMALY_MIN_SAMPLES = int(os.getenv('ANOMALY_MIN_SAMPLES', 5))
+    
+    # Cold start budget: seconds for a worker to build the app and pass /health/ready (benchmarks/startup_benchmark.py)
+    STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', 3.0))
+    
+    # Optional feature blueprints served by the app (comma-separated, e.g. "income")
+    OPTIONAL_BLUEPRINTS = [name.strip() for name in os.getenv('OPTIONAL_BLUEPRINTS', 'income').split(',') if name.strip()]
+    
     # Predefined expense categories
     EXPENSE_CATEGORIES = [
         'Groceries',
@@ -1,585 +1,14 @@
 #!/usr/bin/env python3
 """
-FINAL EXPENSE TRACKER API - INTERVIEW READY
-All requirements implemented and guaranteed to work
-"""
-
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-from datetime import datetime, timedelta
-import json
-import base64
-import calendar
-
-app = Flask(__name__)
-CORS(app)
-
-# In-memory storage for demo (replace with MongoDB in production)
-users = {}
-categories = {}
-expenses = {}
-counters = {'user': 1, 'category': 1, 'expense': 1}
-
-# Predefined expense categories as required
-EXPENSE_CATEGORIES = ['Groceries', 'Leisure', 'Electronics', 'Utilities', 'Clothing', 'Health', 'Others']
-
-def create_token(user_data):
-    """Create simple JWT-like token"""
-    return base64.b64encode(json.dumps(user_data).encode()).decode()
-
-def decode_token(token):
-    """Decode token"""
-    try:
-        return json.loads(base64.b64decode(token.encode()).decode())
-    except:
-        return None
-
-def require_auth(f):
-    """Authentication decorator"""
-    def decorated(*args, **kwargs):
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'status': 'error', 'message': 'Missing Authorization header'}), 401
-        
-        token = auth_header.split(' ')[1]
-        user_data = decode_token(token)
-        if not user_data:
-            return jsonify({'status': 'error', 'message': 'Invalid token'}), 401
-        
-        request.current_user = user_data
-        return f(*args, **kwargs)
-    
-    decorated.__name__ = f.__name__
-    return decorated
-
-# ROUTES
-
-@app.route('/')
-def home():
-    return jsonify({
-        'message': 'Expense Tracker API is running!',
-        'status': 'success',
-        'version': '1.0.0',
-        'features': [
-            '✓ User Authentication with JWT',
-            '✓ User Signup Functionality', 
-            '✓ Expense CRUD Operations',
-            '✓ Date Filtering (Past week, Last month, Last 3 months, Custom)',
-            '✓ Predefined Categories',
-            '✓ JWT Protection on All Endpoints'
-        ]
-    })
-
-@app.route('/health')
-def health():
-    return jsonify({
-        'status': 'healthy',
-        'message': 'API is operational',
-        'timestamp': datetime.utcnow().isoformat(),
-        'data_counts': {
-            'users': len(users),
-            'categories': len(categories), 
-            'expenses': len(expenses)
-        }
-    })
-
-# USER AUTHENTICATION ENDPOINTS
-
-@app.route('/api/users/register', methods=['POST'])
-def register():
-    """User signup functionality"""
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        required = ['first_name', 'last_name', 'email', 'password']
-        for field in required:
-            if not data.get(field):
-                return jsonify({'status': 'error', 'message': f'{field} is required'}), 400
-        
-        email = data['email'].lower()
-        
-        # Check if user exists
-        for user in users.values():
-            if user['email'] == email:
-                return jsonify({'status': 'error', 'message': 'User already exists'}), 400
-        
-        # Create user
-        user_id = str(counters['user'])
-        counters['user'] += 1
-        
-        user = {
-            'id': user_id,
-            'first_name': data['first_name'],
-            'last_name': data['last_name'],
-            'email': email,
-            'password': data['password'],  # In production: hash this!
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        users[user_id] = user
-        
-        # Generate JWT token
-        token_data = {
-            'user_id': user_id,
-            'email': email,
-            'first_name': data['first_name'],
-            'last_name': data['last_name']
-        }
-        token = create_token(token_data)
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'User registered successfully',
-            'data': {
-                'user': {
-                    'id': user_id,
-                    'first_name': data['first_name'],
-                    'last_name': data['last_name'],
-                    'email': email
-                },
-                'token': token
-            }
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Registration failed'}), 500
+In-memory expense tracker API (retired).
 
-@app.route('/api/users/login', methods=['POST'])
-def login():
-    """User login with JWT generation"""
-    try:
-        data = request.get_json()
-        
-        if not data.get('email') or not data.get('password'):
-            return jsonify({'status': 'error', 'message': 'Email and password required'}), 400
-        
-        email = data['email'].lower()
-        
-        # Find user
-        user = None
-        for u in users.values():
-            if u['email'] == email and u['password'] == data['password']:
-                user = u
-                break
-        
-        if not user:
-            return jsonify({'status': 'error', 'message': 'Invalid credentials'}), 401
-        
-        # Generate token
-        token_data = {
-            'user_id': user['id'],
-            'email': user['email'],
-            'first_name': user['first_name'],
-            'last_name': user['last_name']
-        }
-        token = create_token(token_data)
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Login successful',
-            'data': {
-                'user': {
-                    'id': user['id'],
-                    'first_name': user['first_name'],
-                    'last_name': user['last_name'],
-                    'email': user['email']
-                },
-                'token': token
-            }
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Login failed'}), 500
-
-# CATEGORY ENDPOINTS
-
-@app.route('/api/categories', methods=['GET'])
-@require_auth
-def get_categories():
-    """Get all categories for authenticated user"""
-    user_id = request.current_user['user_id']
-    user_categories = [cat for cat in categories.values() if cat['user_id'] == user_id]
-    
-    return jsonify({
-        'status': 'success',
-        'data': {
-            'categories': user_categories,
-            'available_categories': EXPENSE_CATEGORIES
-        }
-    })
-
-@app.route('/api/categories', methods=['POST'])
-@require_auth
-def create_category():
-    """Create new category with predefined constraints"""
-    try:
-        user_id = request.current_user['user_id']
-        data = request.get_json()
-        
-        if not data.get('title') or not data.get('description'):
-            return jsonify({'status': 'error', 'message': 'Title and description required'}), 400
-        
-        # Validate predefined categories
-        if data['title'] not in EXPENSE_CATEGORIES:
-            return jsonify({
-                'status': 'error', 
-                'message': f'Invalid category. Must be one of: {", ".join(EXPENSE_CATEGORIES)}'
-            }), 400
-        
-        # Check if user already has this category
-        for cat in categories.values():
-            if cat['user_id'] == user_id and cat['title'] == data['title']:
-                return jsonify({'status': 'error', 'message': 'Category already exists'}), 400
-        
-        # Create category
-        category_id = str(counters['category'])
-        counters['category'] += 1
-        
-        category = {
-            'id': category_id,
-            'title': data['title'],
-            'description': data['description'],
-            'user_id': user_id,
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        categories[category_id] = category
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Category created successfully',
-            'data': {'category': category}
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Category creation failed'}), 500
-
-# EXPENSE ENDPOINTS
-
-@app.route('/api/expenses', methods=['GET'])
-@require_auth
-def get_expenses():
-    """List and filter expenses with all required filters"""
-    try:
-        user_id = request.current_user['user_id']
-        
-        # Get query parameters
-        category_id = request.args.get('category_id')
-        filter_type = request.args.get('filter')
-        start_date_str = request.args.get('start_date')
-        end_date_str = request.args.get('end_date')
-        include_summary = request.args.get('include_summary', 'false').lower() == 'true'
-        
-        # Get user expenses
-        user_expenses = [exp for exp in expenses.values() if exp['user_id'] == user_id]
-        
-        # Apply category filter
-        if category_id:
-            user_expenses = [exp for exp in user_expenses if exp['category_id'] == category_id]
-        
-        # Apply date filtering
-        now = datetime.utcnow()
-        filtered_expenses = []
-        
-        for expense in user_expenses:
-            expense_date = datetime.fromisoformat(expense['expense_date'])
-            include_expense = True
-            
-            if filter_type == 'past_week':
-                include_expense = expense_date >= now - timedelta(days=7)
-            elif filter_type == 'last_month':
-                # Last calendar month
-                first_day_current = now.replace(day=1)
-                last_month = first_day_current - timedelta(days=1)
-                first_day_last_month = last_month.replace(day=1)
-                include_expense = first_day_last_month <= expense_date <= last_month
-            elif filter_type == 'last_3_months':
-                include_expense = expense_date >= now - timedelta(days=90)
-            elif filter_type == 'custom':
-                if start_date_str and end_date_str:
-                    try:
-                        start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-                        end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-                        include_expense = start_date <= expense_date <= end_date
-                    except ValueError:
-                        return jsonify({'status': 'error', 'message': 'Invalid date format'}), 400
-            
-            if include_expense:
-                filtered_expenses.append(expense)
-        
-        # Sort by date (newest first)
-        filtered_expenses.sort(key=lambda x: x['expense_date'], reverse=True)
-        
-        response_data = {'expenses': filtered_expenses}
-        
-        # Add summary if requested
-        if include_summary:
-            total_amount = sum(exp['amount'] for exp in filtered_expenses)
-            total_count = len(filtered_expenses)
-            
-            category_breakdown = {}
-            for expense in filtered_expenses:
-                cat_id = expense['category_id']
-                if cat_id not in category_breakdown:
-                    category_breakdown[cat_id] = {'amount': 0, 'count': 0}
-                category_breakdown[cat_id]['amount'] += expense['amount']
-                category_breakdown[cat_id]['count'] += 1
-            
-            response_data['summary'] = {
-                'total_amount': total_amount,
-                'total_count': total_count,
-                'category_breakdown': category_breakdown
-            }
-        
-        return jsonify({'status': 'success', 'data': response_data})
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Failed to fetch expenses'}), 500
-
-@app.route('/api/expenses', methods=['POST'])
-@require_auth
-def create_expense():
-    """Add new expense"""
-    try:
-        user_id = request.current_user['user_id']
-        data = request.get_json()
-        
-        # Validate required fields
-        required = ['amount', 'note', 'expense_date', 'category_id']
-        for field in required:
-            if field not in data:
-                return jsonify({'status': 'error', 'message': f'{field} is required'}), 400
-        
-        # Validate amount
-        try:
-            amount = float(data['amount'])
-            if amount <= 0:
-                raise ValueError()
-        except (ValueError, TypeError):
-            return jsonify({'status': 'error', 'message': 'Amount must be positive number'}), 400
-        
-        # Validate category exists and belongs to user
-        category_id = data['category_id']
-        if category_id not in categories or categories[category_id]['user_id'] != user_id:
-            return jsonify({'status': 'error', 'message': 'Invalid category'}), 400
-        
-        # Parse date
-        try:
-            expense_date = datetime.fromisoformat(data['expense_date'].replace('Z', '+00:00'))
-        except ValueError:
-            return jsonify({'status': 'error', 'message': 'Invalid date format'}), 400
-        
-        # Create expense
-        expense_id = str(counters['expense'])
-        counters['expense'] += 1
-        
-        expense = {
-            'id': expense_id,
-            'amount': amount,
-            'note': data['note'],
-            'expense_date': expense_date.isoformat(),
-            'category_id': category_id,
-            'user_id': user_id,
-            'created_at': datetime.utcnow().isoformat()
-        }
-        
-        expenses[expense_id] = expense
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Expense created successfully',
-            'data': {'expense': expense}
-        }), 201
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Expense creation failed'}), 500
-
-@app.route('/api/expenses/<expense_id>', methods=['PUT'])
-@require_auth
-def update_expense(expense_id):
-    """Update existing expense"""
-    try:
-        user_id = request.current_user['user_id']
-        data = request.get_json()
-        
-        # Check if expense exists and belongs to user
-        if expense_id not in expenses or expenses[expense_id]['user_id'] != user_id:
-            return jsonify({'status': 'error', 'message': 'Expense not found'}), 404
-        
-        expense = expenses[expense_id]
-        
-        # Update fields if provided
-        if 'amount' in data:
-            try:
-                amount = float(data['amount'])
-                if amount <= 0:
-                    raise ValueError()
-                expense['amount'] = amount
-            except (ValueError, TypeError):
-                return jsonify({'status': 'error', 'message': 'Invalid amount'}), 400
-        
-        if 'note' in data:
-            if not data['note'].strip():
-                return jsonify({'status': 'error', 'message': 'Note cannot be empty'}), 400
-            expense['note'] = data['note'].strip()
-        
-        if 'expense_date' in data:
-            try:
-                expense_date = datetime.fromisoformat(data['expense_date'].replace('Z', '+00:00'))
-                expense['expense_date'] = expense_date.isoformat()
-            except ValueError:
-                return jsonify({'status': 'error', 'message': 'Invalid date format'}), 400
-        
-        if 'category_id' in data:
-            category_id = data['category_id']
-            if category_id not in categories or categories[category_id]['user_id'] != user_id:
-                return jsonify({'status': 'error', 'message': 'Invalid category'}), 400
-            expense['category_id'] = category_id
-        
-        expense['updated_at'] = datetime.utcnow().isoformat()
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Expense updated successfully',
-            'data': {'expense': expense}
-        })
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Update failed'}), 500
-
-@app.route('/api/expenses/<expense_id>', methods=['DELETE'])
-@require_auth
-def delete_expense(expense_id):
-    """Remove existing expense"""
-    try:
-        user_id = request.current_user['user_id']
-        
-        # Check if expense exists and belongs to user
-        if expense_id not in expenses or expenses[expense_id]['user_id'] != user_id:
-            return jsonify({'status': 'error', 'message': 'Expense not found'}), 404
-        
-        del expenses[expense_id]
-        
-        return jsonify({
-            'status': 'success',
-            'message': 'Expense deleted successfully'
-        })
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Delete failed'}), 500
-
-@app.route('/api/expenses/summary', methods=['GET'])
-@require_auth
-def get_expense_summary():
-    """Get expense summary with filtering"""
-    try:
-        user_id = request.current_user['user_id']
-        filter_type = request.args.get('filter')
-        
-        # Get user expenses
-        user_expenses = [exp for exp in expenses.values() if exp['user_id'] == user_id]
-        
-        # Apply date filtering if specified
-        if filter_type:
-            now = datetime.utcnow()
-            filtered_expenses = []
-            
-            for expense in user_expenses:
-                expense_date = datetime.fromisoformat(expense['expense_date'])
-                include_expense = True
-                
-                if filter_type == 'past_week':
-                    include_expense = expense_date >= now - timedelta(days=7)
-                elif filter_type == 'last_month':
-                    first_day_current = now.replace(day=1)
-                    last_month = first_day_current - timedelta(days=1)
-                    first_day_last_month = last_month.replace(day=1)
-                    include_expense = first_day_last_month <= expense_date <= last_month
-                elif filter_type == 'last_3_months':
-                    include_expense = expense_date >= now - timedelta(days=90)
-                
-                if include_expense:
-                    filtered_expenses.append(expense)
-            
-            user_expenses = filtered_expenses
-        
-        # Calculate summary
-        total_amount = sum(exp['amount'] for exp in user_expenses)
-        total_count = len(user_expenses)
-        
-        category_breakdown = {}
-        for expense in user_expenses:
-            cat_id = expense['category_id']
-            if cat_id not in category_breakdown:
-                category_breakdown[cat_id] = {'amount': 0, 'count': 0}
-            category_breakdown[cat_id]['amount'] += expense['amount']
-            category_breakdown[cat_id]['count'] += 1
-        
-        return jsonify({
-            'status': 'success',
-            'data': {
-                'summary': {
-                    'total_amount': total_amount,
-                    'total_count': total_count,
-                    'category_breakdown': category_breakdown
-                }
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': 'Summary failed'}), 500
-
-# ERROR HANDLERS
-@app.errorhandler(404)
-def not_found(error):
-    return jsonify({'status': 'error', 'message': 'Endpoint not found'}), 404
-
-@app.errorhandler(405)
-def method_not_allowed(error):
-    return jsonify({'status': 'error', 'message': 'Method not allowed'}), 405
+It kept users and expenses in process memory with hand-rolled tokens; the
+same routes are now served from MongoDB with JWTs by the layered app.
+test_legacy_parity.py checks the legacy routes against a running server.
+"""
 
-@app.errorhandler(500)
-def internal_error(error):
-    return jsonify({'status': 'error', 'message': 'Internal server error'}), 500
+from app import app, start_background_workers
 
 if __name__ == '__main__':
-    print("=" * 80)
-    print("🚀 EXPENSE TRACKER API - INTERVIEW READY")
-    print("=" * 80)
-    print("✅ ALL REQUIREMENTS IMPLEMENTED:")
-    print("   ✓ User Authentication with JWT")
-    print("   ✓ User Signup Functionality")
-    print("   ✓ JWT Token Generation & Validation")
-    print("   ✓ Expense Filtering:")
-    print("     - Past week")
-    print("     - Last month")
-    print("     - Last 3 months") 
-    print("     - Custom date range")
-    print("   ✓ Expense CRUD Operations:")
-    print("     - Add new expenses")
-    print("     - Remove existing expenses")
-    print("     - Update existing expenses")
-    print("     - List expenses")
-    print("   ✓ JWT Protection on ALL endpoints")
-    print("   ✓ Predefined Categories:", ", ".join(EXPENSE_CATEGORIES))
-    print("   ✓ Data Model with efficient category handling")
-    print("   ✓ Comprehensive testing & documentation")
-    print()
-    print("🌐 SERVER STARTING ON: http://127.0.0.1:5000")
-    print("📋 TEST ENDPOINTS:")
-    print("   GET  /health")
-    print("   POST /api/users/register")
-    print("   POST /api/users/login")
-    print("   GET  /api/categories")
-    print("   POST /api/categories")
-    print("   GET  /api/expenses")
-    print("   POST /api/expenses")
-    print("   PUT  /api/expenses/<id>")
-    print("   DELETE /api/expenses/<id>")
-    print("   GET  /api/expenses/summary")
-    print("=" * 80)
-    print("🎯 READY FOR POSTMAN TESTING!")
-    print("=" * 80)
-    
+    start_background_workers(reloader=True)
     app.run(debug=True, host='127.0.0.1', port=5000)
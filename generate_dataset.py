@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for the Expense Tracker API
+Bulk-loads M users, each with the seven predefined categories and several
+years of expenses. Amounts are log-normal per category, volumes follow
+monthly seasonality and user activity is power-law distributed, so a few
+heavy users own most rows. Output is fully determined by --seed and
+--end-date and is written to MongoDB.
+
+Expenses are stored as the API stores them: Decimal128 amounts in the
+user's home currency, normalized tags, and an is_anomaly flag computed
+against the category's earlier history. Budget totals, tag rollups and
+anomaly stats are updated through the same bulk services the API uses.
+
+Examples:
+    python generate_dataset.py --users 1000 --years 3 --seed 42
+    python generate_dataset.py --users 50 --drop
+"""
+
+import argparse
+from collections import defaultdict
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+from bson import ObjectId
+
+from config import Config
+from models.expense import normalize_tags
+from services.anomaly_service import AnomalyService, log_amount, merge_stats, z_score
+from utils.money import to_decimal128
+
+DEFAULT_PASSWORD = 'Password123'
+
+# Per-category spend profile: median amount, log-normal sigma, expenses per month
+CATEGORY_PROFILES = {
+    'Groceries': {'median': 45.0, 'sigma': 0.5, 'per_month': 8.0},
+    'Leisure': {'median': 35.0, 'sigma': 0.8, 'per_month': 4.0},
+    'Electronics': {'median': 150.0, 'sigma': 1.0, 'per_month': 0.4},
+    'Utilities': {'median': 90.0, 'sigma': 0.3, 'per_month': 3.0},
+    'Clothing': {'median': 50.0, 'sigma': 0.7, 'per_month': 1.5},
+    'Health': {'median': 40.0, 'sigma': 0.9, 'per_month': 1.0},
+    'Others': {'median': 25.0, 'sigma': 1.0, 'per_month': 2.0}
+}
+
+# Monthly volume multipliers, January first
+SEASONALITY = [0.90, 0.85, 0.95, 1.00, 1.00, 1.05, 1.10, 1.05, 0.95, 1.00, 1.15, 1.35]
+CATEGORY_SEASONALITY = {
+    'Electronics': [0.7, 0.6, 0.7, 0.8, 0.8, 0.9, 0.9, 1.0, 1.0, 1.1, 2.2, 2.4],
+    'Clothing': [1.2, 0.8, 1.0, 1.1, 1.0, 0.9, 1.1, 1.2, 1.0, 1.0, 1.3, 1.6],
+    'Utilities': [1.3, 1.3, 1.1, 0.9, 0.8, 0.9, 1.1, 1.1, 0.9, 0.9, 1.0, 1.2],
+    'Leisure': [0.8, 0.8, 0.9, 1.0, 1.1, 1.3, 1.4, 1.4, 1.0, 0.9, 0.9, 1.2]
+}
+
+NOTES = {
+    'Groceries': ['Weekly grocery shopping', 'Supermarket run', 'Fresh fruit and vegetables', 'Bakery and dairy'],
+    'Leisure': ['Movie tickets', 'Dinner with friends', 'Concert tickets', 'Streaming subscription'],
+    'Electronics': ['Wireless headphones', 'Phone accessories', 'Laptop repair', 'Smart home device'],
+    'Utilities': ['Electricity bill', 'Water bill', 'Internet bill', 'Gas bill'],
+    'Clothing': ['Work shirt', 'Running shoes', 'Winter jacket', 'Accessories'],
+    'Health': ['Pharmacy', 'Doctor consultation', 'Dental checkup', 'Gym membership'],
+    'Others': ['Birthday gift', 'Donation', 'Stationery', 'Parking']
+}
+
+# Tags an expense may carry, each with its chance per expense
+TAGS = {
+    'Groceries': {'family': 0.4, 'weekly': 0.3},
+    'Leisure': {'friends': 0.4, 'weekend': 0.3},
+    'Electronics': {'work': 0.3, 'gift': 0.2},
+    'Utilities': {'home': 0.6, 'monthly': 0.5},
+    'Clothing': {'work': 0.2, 'gift': 0.2},
+    'Health': {'family': 0.3, 'insurance': 0.2},
+    'Others': {'gift': 0.3, 'work': 0.1}
+}
+
+FIRST_NAMES = ['Alex', 'Sam', 'Priya', 'Chen', 'Maria', 'Omar', 'Lena', 'Ravi', 'Yuki', 'Noah']
+LAST_NAMES = ['Smith', 'Kumar', 'Garcia', 'Li', 'Okafor', 'Nguyen', 'Novak', 'Silva', 'Khan', 'Brown']
+
+BCRYPT_ALPHABET = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+def poisson(rng, lam):
+    """Poisson sample (Knuth for small means, normal approximation otherwise)"""
+    if lam <= 0:
+        return 0
+    if lam > 30:
+        return max(0, int(round(rng.gauss(lam, math.sqrt(lam)))))
+    limit = math.exp(-lam)
+    count, product = 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+def seeded_object_id(rng, moment):
+    """ObjectId with a real timestamp and a seed-derived suffix"""
+    timestamp = int((moment - datetime(1970, 1, 1)).total_seconds())
+    return ObjectId(timestamp.to_bytes(4, 'big') + rng.getrandbits(64).to_bytes(8, 'big'))
+
+def seeded_password_hash(seed, password=DEFAULT_PASSWORD, rounds=12):
+    """bcrypt hash with a salt derived from the seed, computed once for all users"""
+    rng = random.Random(f'{seed}:password')
+    salt = ''.join(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + '.'
+    return bcrypt.hashpw(password.encode('utf-8'), f'$2b${rounds:02d}${salt}'.encode('ascii')).decode('utf-8')
+
+def month_starts(start, end):
+    current = start.replace(day=1)
+    while current < end:
+        yield current
+        current = (current + timedelta(days=32)).replace(day=1)
+
+def generate_user(seed, index, start, end, max_activity):
+    """Generate one user's logical records from a per-user random stream"""
+    rng = random.Random(f'{seed}:{index}')
+
+    # Pareto-distributed activity: most users are light, a few are very heavy
+    activity = min(rng.paretovariate(1.5), max_activity)
+    joined = start + timedelta(seconds=rng.randint(0, 30 * 86400))
+
+    user = {
+        'index': index,
+        'first_name': rng.choice(FIRST_NAMES),
+        'last_name': rng.choice(LAST_NAMES),
+        'email': f'user{index:06d}@dataset.example.com',
+        'created_at': joined,
+        'activity': activity
+    }
+
+    categories = [{'title': title, 'description': f'{title} expenses', 'created_at': joined}
+                  for title in Config.EXPENSE_CATEGORIES]
+
+    expenses = []
+    for month_start in month_starts(joined, end):
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        days_in_month = (next_month - month_start).days
+        for category in categories:
+            title = category['title']
+            profile = CATEGORY_PROFILES.get(title, CATEGORY_PROFILES['Others'])
+            seasonal = CATEGORY_SEASONALITY.get(title, SEASONALITY)[month_start.month - 1]
+            for _ in range(poisson(rng, profile['per_month'] * activity * seasonal)):
+                moment = month_start + timedelta(days=rng.randrange(days_in_month),
+                                                 seconds=rng.randint(8 * 3600, 22 * 3600))
+                if moment < joined or moment >= end:
+                    continue
+                amount = round(rng.lognormvariate(math.log(profile['median']), profile['sigma']), 2)
+                tags = [tag for tag, chance in TAGS.get(title, TAGS['Others']).items() if rng.random() < chance]
+                expenses.append({
+                    'title': title,
+                    'amount': max(amount, 0.01),
+                    'note': rng.choice(NOTES.get(title, NOTES['Others'])),
+                    'tags': normalize_tags(tags),
+                    'expense_date': moment,
+                    'created_at': moment + timedelta(minutes=rng.randint(0, 600))
+                })
+
+    expenses.sort(key=lambda expense: expense['expense_date'])
+
+    # Flag each expense against its category's earlier history, as the API does on write
+    history = defaultdict(lambda: (0, 0.0, 0.0))
+    for expense in expenses:
+        stats = history[expense['title']]
+        expense['is_anomaly'] = AnomalyService.is_anomaly(z_score(stats, expense['amount']))
+        history[expense['title']] = merge_stats(stats, 1, log_amount(expense['amount']), 0.0)
+
+    return user, categories, expenses, rng
+
+class MongoWriter:
+    """Writes generated users through DatabaseService.insert_many in batches,
+    applying each expense batch to the derived collections as the API does"""
+
+    def __init__(self, batch_size, drop=False):
+        from flask import Flask
+        from services.database import db_service
+        from services.budget_service import BudgetService
+        from services.tag_service import TagService
+        from services.notification_service import NotificationService
+        from services.recurring_service import RecurringExpenseService
+        from services.income_service import IncomeService
+
+        app = Flask(__name__)
+        app.config['MONGO_URI'] = Config.MONGO_URI
+        db_service.init_app(app)
+        self.db_service = db_service
+        self.batch_size = batch_size
+        self.pending = {'users': [], 'categories': [], 'expenses': []}
+        self.derived = [BudgetService.record_spend_bulk, TagService.record_bulk, AnomalyService.record_bulk]
+
+        if drop:
+            # Everything keyed by the dropped users, so no stale totals or stats survive
+            user_collections = [BudgetService.COLLECTION, BudgetService.SPEND_COLLECTION, TagService.COLLECTION,
+                                AnomalyService.COLLECTION, NotificationService.COLLECTION,
+                                RecurringExpenseService.COLLECTION, IncomeService.COLLECTION]
+            for collection_name in list(self.pending) + user_collections:
+                db_service.get_collection(collection_name).drop()
+
+    def add_user(self, user, categories, expenses, rng, password_hash):
+        user_id = seeded_object_id(rng, user['created_at'])
+        self._add('users', {
+            '_id': user_id,
+            'first_name': user['first_name'],
+            'last_name': user['last_name'],
+            'email': user['email'],
+            'password': password_hash,
+            'home_currency': Config.DEFAULT_CURRENCY
+        })
+
+        category_ids = {}
+        for category in categories:
+            category_ids[category['title']] = seeded_object_id(rng, category['created_at'])
+            self._add('categories', {
+                '_id': category_ids[category['title']],
+                'title': category['title'],
+                'description': category['description'],
+                'user_id': user_id
+            })
+
+        for expense in expenses:
+            self._add('expenses', {
+                '_id': seeded_object_id(rng, expense['created_at']),
+                'amount': to_decimal128(expense['amount']),
+                'currency': Config.DEFAULT_CURRENCY,
+                'note': expense['note'],
+                'expense_date': expense['expense_date'],
+                'category_id': category_ids[expense['title']],
+                'user_id': user_id,
+                'tags': expense['tags'],
+                'is_anomaly': expense['is_anomaly'],
+                'created_at': expense['created_at']
+            })
+
+    def _add(self, collection_name, document):
+        batch = self.pending[collection_name]
+        batch.append(document)
+        if len(batch) >= self.batch_size:
+            self._flush(collection_name)
+
+    def _flush(self, collection_name):
+        batch = self.pending[collection_name]
+        if not batch:
+            return
+        if collection_name == 'expenses':
+            # Derived updates look up each expense's user
+            self._flush('users')
+        self.db_service.insert_many(collection_name, batch, ordered=False)
+        self.pending[collection_name] = []
+        if collection_name == 'expenses':
+            for record_bulk in self.derived:
+                record_bulk(batch)
+
+    def close(self):
+        for collection_name in self.pending:
+            self._flush(collection_name)
+
+def generate(writer, users, years, seed, end_date, max_activity=50.0, hash_passwords=True):
+    """Generate the dataset into a writer and return (users, expenses) written"""
+    start_date = end_date - timedelta(days=int(365.25 * years))
+    password_hash = seeded_password_hash(seed) if hash_passwords else None
+
+    total_expenses = 0
+    for index in range(users):
+        user, categories, expenses, rng = generate_user(seed, index, start_date, end_date, max_activity)
+        writer.add_user(user, categories, expenses, rng, password_hash)
+        total_expenses += len(expenses)
+
+    writer.close()
+    return users, total_expenses
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic expense dataset')
+    parser.add_argument('--users', type=int, default=100, help='number of users (M)')
+    parser.add_argument('--years', type=float, default=3, help='years of history per user')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end-date', type=lambda value: datetime.fromisoformat(value),
+                        default=datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0),
+                        help='last day of history (default: today); pin it for repeatable output')
+    parser.add_argument('--max-activity', type=float, default=50.0,
+                        help='cap on the power-law activity multiplier')
+    parser.add_argument('--batch-size', type=int, default=5000, help='insert_many batch size')
+    parser.add_argument('--drop', action='store_true', help='drop the users, their data and derived collections first')
+    args = parser.parse_args()
+
+    print(f"Generating {args.users} users x {args.years} years (seed={args.seed}, "
+          f"end={args.end_date.date()}) into MongoDB...")
+
+    writer = MongoWriter(args.batch_size, drop=args.drop)
+
+    started = time.perf_counter()
+    users, expenses = generate(writer, args.users, args.years, args.seed, args.end_date,
+                               args.max_activity)
+    elapsed = time.perf_counter() - started
+
+    print(f"Wrote {users} users, {users * len(Config.EXPENSE_CATEGORIES)} categories and "
+          f"{expenses} expenses in {elapsed:.1f}s ({expenses / max(elapsed, 1e-9):.0f} expenses/s)")
+    print(f"All users share the password: {DEFAULT_PASSWORD}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Load test harness for the Expense Tracker API
+Replays the requests from the Postman collection as a weighted traffic mix
+from many concurrent clients at a target request rate, then reports
+throughput and p50/p95/p99 latency per endpoint.
+
+Example:
+    python load_test.py --base-url http://localhost:5000 --users 50 \
+        --concurrency 32 --rps 200 --duration 60
+"""
+
+import argparse
+import json
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+
+COLLECTION_FILE = 'Expense_Tracker_Interview_Collection.postman_collection.json'
+
+DEFAULT_MIX = {
+    'list_expenses': 30,
+    'summary': 20,
+    'list_categories': 15,
+    'create_expense': 15,
+    'update_expense': 5,
+    'delete_expense': 5,
+    'login': 8,
+    'register': 2
+}
+
+# Summary traffic isn't in the collection, so it is generated from these filters
+SUMMARY_QUERIES = [
+    '/api/expenses/summary?filter=past_week',
+    '/api/expenses/summary?filter=last_month',
+    '/api/expenses/summary?filter=last_3_months',
+    '/api/expenses/summary'
+]
+
+VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+
+def classify(method, path):
+    """Map a collection request onto a traffic class"""
+    if path.endswith('/users/register'):
+        return 'register'
+    if path.endswith('/users/login'):
+        return 'login'
+    if path.startswith('/api/categories'):
+        return 'create_category' if method == 'POST' else 'list_categories'
+    if path.startswith('/api/expenses'):
+        if method == 'POST':
+            return 'create_expense'
+        if method == 'PUT':
+            return 'update_expense'
+        if method == 'DELETE':
+            return 'delete_expense'
+        return 'list_expenses'
+    return None
+
+def load_collection(path):
+    """Read request templates from the Postman collection, grouped by traffic class"""
+    with open(path) as f:
+        collection = json.load(f)
+
+    templates = defaultdict(list)
+
+    def walk(items):
+        for item in items:
+            if 'item' in item:
+                walk(item['item'])
+                continue
+
+            request = item['request']
+            raw_url = request['url'] if isinstance(request['url'], str) else request['url'].get('raw', '')
+            parts = urlsplit(raw_url)
+            path = parts.path + (f'?{parts.query}' if parts.query else '')
+
+            traffic_class = classify(request['method'], parts.path)
+            if traffic_class is None:
+                continue
+
+            body = (request.get('body') or {}).get('raw')
+            templates[traffic_class].append({
+                'name': item['name'],
+                'method': request['method'],
+                'path': path,
+                'body': json.loads(body) if body else None
+            })
+
+    walk(collection['item'])
+    return templates
+
+class VirtualUser:
+    """State for one synthetic user: credentials, token and known ids"""
+
+    def __init__(self, index, run_id):
+        self.email = f'loadtest+{run_id}-{index}@example.com'
+        self.password = 'LoadTest123'
+        self.token = None
+        self.categories = {}
+        self.expense_ids = []
+        self.lock = threading.Lock()
+
+    def headers(self):
+        return {'Authorization': f'Bearer {self.token}'} if self.token else {}
+
+    def variables(self):
+        variables = {f'{title.lower()}_id': category_id for title, category_id in self.categories.items()}
+        with self.lock:
+            if self.expense_ids:
+                expense_id = random.choice(self.expense_ids)
+                variables.update(groceries_expense_id=expense_id, leisure_expense_id=expense_id)
+        return variables
+
+def render(value, variables):
+    """Substitute {{variables}} in a template string or JSON body"""
+    if isinstance(value, str):
+        return VARIABLE.sub(lambda match: variables.get(match.group(1), match.group(0)), value)
+    if isinstance(value, dict):
+        return {key: render(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, variables) for item in value]
+    return value
+
+class LoadTester:
+    def __init__(self, args, templates):
+        self.base_url = args.base_url.rstrip('/')
+        self.args = args
+        self.templates = templates
+        self.run_id = uuid.uuid4().hex[:8]
+        self.users = []
+        self.results = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.results_lock = threading.Lock()
+        self.local = threading.local()
+
+    def session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def send(self, name, method, path, user=None, body=None, record=True):
+        headers = user.headers() if user else {}
+        start = time.perf_counter()
+        try:
+            response = self.session().request(method, self.base_url + path, json=body,
+                                              headers=headers, timeout=self.args.timeout)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 0
+        elapsed = time.perf_counter() - start
+
+        if record:
+            with self.results_lock:
+                self.results[name].append(elapsed)
+                if status == 0 or status >= 400:
+                    self.errors[name] += 1
+        return response
+
+    # Setup
+
+    def setup_users(self):
+        print(f"Creating {self.args.users} synthetic users...")
+        register = self.templates['register'][0]
+        category_templates = self.templates['create_category']
+        expense_templates = self.templates['create_expense']
+
+        for index in range(self.args.users):
+            user = VirtualUser(index, self.run_id)
+            body = dict(register['body'], email=user.email, password=user.password)
+            response = self.send('register', 'POST', register['path'], body=body, record=False)
+            if response is None or response.status_code != 201:
+                print(f"   X Could not register {user.email}")
+                continue
+            user.token = response.json()['data']['token']
+
+            for template in category_templates:
+                response = self.send('create_category', 'POST', template['path'], user, template['body'], record=False)
+                if response is not None and response.status_code == 201:
+                    category = response.json()['data']['category']
+                    user.categories[category['title']] = category['_id']
+
+            for template in expense_templates:
+                self.create_expense(user, template, record=False)
+
+            self.users.append(user)
+
+        print(f"   {len(self.users)} users ready")
+
+    def create_expense(self, user, template, record=True):
+        body = render(template['body'], user.variables())
+        response = self.send('create_expense', 'POST', template['path'], user, body, record=record)
+        if response is not None and response.status_code == 201:
+            with user.lock:
+                user.expense_ids.append(response.json()['data']['expense']['_id'])
+
+    # Traffic
+
+    def run_operation(self, operation):
+        user = random.choice(self.users)
+
+        if operation == 'register':
+            template = self.templates['register'][0]
+            body = dict(template['body'], email=f'loadtest+{self.run_id}-{uuid.uuid4().hex}@example.com')
+            self.send('register', 'POST', template['path'], body=body)
+        elif operation == 'login':
+            template = self.templates['login'][0]
+            self.send('login', 'POST', template['path'], body={'email': user.email, 'password': user.password})
+        elif operation == 'summary':
+            self.send('summary', 'GET', random.choice(SUMMARY_QUERIES), user)
+        elif operation == 'create_expense':
+            self.create_expense(user, random.choice(self.templates['create_expense']))
+        elif operation == 'delete_expense':
+            with user.lock:
+                expense_id = user.expense_ids.pop() if len(user.expense_ids) > 1 else None
+            if expense_id:
+                self.send('delete_expense', 'DELETE', f'/api/expenses/{expense_id}', user)
+        else:
+            template = random.choice(self.templates[operation])
+            variables = user.variables()
+            self.send(operation, template['method'], render(template['path'], variables),
+                      user, render(template['body'], variables))
+
+    def run(self):
+        mix = {name: weight for name, weight in self.args.mix.items()
+               if weight > 0 and (name == 'summary' or self.templates.get(name))}
+        operations, weights = list(mix), list(mix.values())
+
+        # Open-loop pacing: a dispatcher issues tickets at the target rate and
+        # workers take them, so slow responses don't lower the offered load
+        tickets = queue.Queue(maxsize=self.args.concurrency * 4)
+        stop = threading.Event()
+        dropped = [0]
+
+        def worker():
+            while True:
+                operation = tickets.get()
+                if operation is None:
+                    return
+                self.run_operation(operation)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(self.args.concurrency)]
+        for thread in workers:
+            thread.start()
+
+        print(f"Running {self.args.duration}s at {self.args.rps} rps with {self.args.concurrency} clients...")
+        start = time.perf_counter()
+        interval = 1.0 / self.args.rps
+        next_tick = start
+        while not stop.is_set():
+            now = time.perf_counter()
+            if now - start >= self.args.duration:
+                break
+            if now < next_tick:
+                time.sleep(min(next_tick - now, 0.01))
+                continue
+            next_tick += interval
+            try:
+                tickets.put_nowait(random.choices(operations, weights)[0])
+            except queue.Full:
+                dropped[0] += 1
+
+        for _ in workers:
+            tickets.put(None)
+        for thread in workers:
+            thread.join()
+
+        return time.perf_counter() - start, dropped[0]
+
+    # Reporting
+
+    def report(self, elapsed, dropped):
+        def percentile(values, pct):
+            index = max(0, int(round(pct / 100.0 * len(values) + 0.5)) - 1)
+            return values[min(index, len(values) - 1)] * 1000
+
+        rows = {}
+        total = 0
+        for name, latencies in sorted(self.results.items()):
+            latencies.sort()
+            total += len(latencies)
+            rows[name] = {
+                'requests': len(latencies),
+                'errors': self.errors[name],
+                'rps': round(len(latencies) / elapsed, 2),
+                'p50_ms': round(percentile(latencies, 50), 2),
+                'p95_ms': round(percentile(latencies, 95), 2),
+                'p99_ms': round(percentile(latencies, 99), 2)
+            }
+
+        print("\n" + "=" * 86)
+        print(f"{'endpoint':<18}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+        print("-" * 86)
+        for name, row in rows.items():
+            print(f"{name:<18}{row['requests']:>10}{row['errors']:>8}{row['rps']:>10}"
+                  f"{row['p50_ms']:>12}{row['p95_ms']:>12}{row['p99_ms']:>12}")
+        print("-" * 86)
+        print(f"Total: {total} requests in {elapsed:.1f}s = {total / elapsed:.1f} rps "
+              f"(target {self.args.rps}, {dropped} ticks dropped by saturated clients)")
+        print("=" * 86)
+
+        return {'elapsed_s': round(elapsed, 2), 'total_requests': total,
+                'rps': round(total / elapsed, 2), 'dropped': dropped, 'endpoints': rows}
+
+def parse_mix(value):
+    mix = dict(DEFAULT_MIX)
+    for part in value.split(','):
+        if part.strip():
+            name, _, weight = part.partition('=')
+            mix[name.strip()] = float(weight)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description='Expense Tracker API load test')
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--collection', default=COLLECTION_FILE)
+    parser.add_argument('--users', type=int, default=20, help='synthetic users to create')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--rps', type=float, default=50, help='target requests per second')
+    parser.add_argument('--duration', type=float, default=30, help='test duration in seconds')
+    parser.add_argument('--timeout', type=float, default=10, help='per-request timeout in seconds')
+    parser.add_argument('--mix', type=parse_mix, default=dict(DEFAULT_MIX),
+                        help='weights, e.g. "summary=40,register=0" (merged with defaults)')
+    parser.add_argument('--json', help='write the report to this file')
+    parser.add_argument('--seed', type=int, help='random seed for a repeatable mix')
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    templates = load_collection(args.collection)
+    tester = LoadTester(args, templates)
+    tester.setup_users()
+    if not tester.users:
+        print("No users could be created - is the API running?")
+        return 1
+
+    elapsed, dropped = tester.run()
+    report = tester.report(elapsed, dropped)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
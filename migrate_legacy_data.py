@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+One-off migration of data written by the retired single-file servers
+simple_working_api.py and the other legacy servers stored user_id, and an
+expense's category_id, as strings, and amounts as floats. The layered app
+queries ObjectIds and Decimal128 amounts, so until this runs those users
+see no categories, expenses or income.
+
+Converts, in place:
+  - categories: user_id
+  - expenses: user_id, category_id, amount (Decimal128, currency left unset
+    so it reads as the user's home currency)
+  - income: user_id, amount
+
+Budget totals, tag and anomaly stats are rebuilt from the expenses on
+first use. An income document whose month the user already set through
+the layered app is left unconverted and reported.
+
+Examples:
+    python migrate_legacy_data.py --dry-run
+    python migrate_legacy_data.py --batch-size 1000
+"""
+
+import argparse
+import sys
+
+from bson import Decimal128, ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from config import Config
+from utils.money import to_decimal128
+
+# Fields stored as strings by the legacy servers, per collection
+OBJECT_ID_FIELDS = {
+    'categories': ('user_id',),
+    'expenses': ('user_id', 'category_id'),
+    'income': ('user_id',)
+}
+AMOUNT_COLLECTIONS = ('expenses', 'income')
+
+def legacy_query(collection_name):
+    """Documents with any field still in its legacy type"""
+    clauses = [{field: {'$type': 'string'}} for field in OBJECT_ID_FIELDS[collection_name]]
+    if collection_name in AMOUNT_COLLECTIONS:
+        clauses.extend({'amount': {'$type': bson_type}} for bson_type in ('double', 'int', 'long'))
+    return {'$or': clauses}
+
+def converted_fields(collection_name, document):
+    """$set for one legacy document, or None if a stored id is not a valid ObjectId"""
+    update = {}
+    for field in OBJECT_ID_FIELDS[collection_name]:
+        value = document.get(field)
+        if isinstance(value, str):
+            if not ObjectId.is_valid(value):
+                return None
+            update[field] = ObjectId(value)
+    amount = document.get('amount')
+    if collection_name in AMOUNT_COLLECTIONS and amount is not None and not isinstance(amount, Decimal128):
+        update['amount'] = to_decimal128(amount)
+    return update
+
+def migrate_collection(db_service, collection_name, batch_size, dry_run):
+    """Convert one collection; returns (converted, invalid, conflicts)"""
+    converted = invalid = conflicts = 0
+    requests = []
+
+    def flush():
+        nonlocal converted, conflicts
+        if not requests or dry_run:
+            converted += len(requests)
+            requests.clear()
+            return
+        try:
+            result = db_service.bulk_write(collection_name, requests)
+            converted += result.modified_count
+        except BulkWriteError as e:
+            # Unique indexes (one income per user and month) reject some conversions
+            if any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+            conflicts += len(e.details['writeErrors'])
+            converted += e.details['nModified']
+        requests.clear()
+
+    for document in db_service.get_collection(collection_name).find(legacy_query(collection_name)):
+        update = converted_fields(collection_name, document)
+        if update is None:
+            invalid += 1
+            continue
+        requests.append(UpdateOne({'_id': document['_id']}, {'$set': update}))
+        if len(requests) >= batch_size:
+            flush()
+    flush()
+
+    return converted, invalid, conflicts
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert legacy string ids and float amounts')
+    parser.add_argument('--batch-size', type=int, default=1000, help='bulk_write batch size')
+    parser.add_argument('--dry-run', action='store_true', help='count what would change without writing')
+    args = parser.parse_args()
+
+    from flask import Flask
+    from services.database import db_service
+
+    app = Flask(__name__)
+    app.config['MONGO_URI'] = Config.MONGO_URI
+    db_service.init_app(app)
+
+    print(f"{'Checking' if args.dry_run else 'Migrating'} legacy data in {Config.MONGO_URI}...")
+
+    failed = False
+    for collection_name in OBJECT_ID_FIELDS:
+        converted, invalid, conflicts = migrate_collection(db_service, collection_name, args.batch_size,
+                                                           args.dry_run)
+        verb = 'to convert' if args.dry_run else 'converted'
+        print(f"   {collection_name:<12}{converted:>8} {verb}, {invalid} with invalid ids, {conflicts} conflicts")
+        failed = failed or invalid or conflicts
+
+    if failed:
+        print("Some documents were left as they were; see the counts above")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+from marshmallow import Schema, fields, validate
+from config import Config
+from utils.tracing import traced_schema
+
+class BatchItemSchema(Schema):
+    id = fields.Str()
+    method = fields.Str(load_default='GET', validate=validate.OneOf(['GET', 'POST', 'PUT', 'DELETE']))
+    path = fields.Str(required=True, validate=validate.Regexp(r'^/', error='Path must start with /'))
+    headers = fields.Dict(keys=fields.Str(), values=fields.Str(), load_default=dict)
+    body = fields.Raw(allow_none=True)
+
+@traced_schema
+class BatchSchema(Schema):
+    requests = fields.List(fields.Nested(BatchItemSchema), required=True,
+                           validate=validate.Length(min=1, max=Config.BATCH_MAX_REQUESTS))
@@ -0,0 +1,39 @@
+from bson import ObjectId
+from marshmallow import Schema, fields, validate
+from datetime import datetime
+from utils.money import to_cents, to_decimal, to_float
+from utils.tracing import traced_schema
+
+class Budget:
+    def __init__(self, category_id, user_id, amount, _id=None):
+        self._id = _id
+        self.category_id = ObjectId(category_id) if isinstance(category_id, str) else category_id
+        self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        self.amount = to_float(amount)
+        self.updated_at = datetime.utcnow()
+        # Current month state, filled in by BudgetService
+        self.month = None
+        self.spent = 0.0
+
+    @classmethod
+    def from_document(cls, data):
+        budget = cls(data['category_id'], data['user_id'], data['amount'], data['_id'])
+        budget.updated_at = data.get('updated_at')
+        return budget
+
+    def to_dict(self):
+        return {
+            '_id': str(self._id) if self._id else None,
+            'category_id': str(self.category_id),
+            'user_id': str(self.user_id),
+            'amount': self.amount,
+            'month': self.month,
+            'spent': round(self.spent, 2),
+            'remaining': to_float(to_cents(to_decimal(self.amount) - to_decimal(self.spent))),
+            'percent_used': round(self.spent / self.amount * 100, 1),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+@traced_schema
+class BudgetSchema(Schema):
+    amount = fields.Float(required=True, validate=validate.Range(min=0.01))
@@ -1,17 +1,35 @@
 from bson import ObjectId
 from marshmallow import Schema, fields, validate
 from config import Config
+from utils.tracing import traced_schema
 
 class Category:
+    FIELDS = ('_id', 'title', 'description', 'user_id')
+    
     def __init__(self, title, description, user_id, _id=None):
         self._id = _id
         self.title = title
         self.description = description
         self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
     
-    def to_dict(self):
+    @classmethod
+    def from_document(cls, data):
+        """Build a category from a projected document, leaving absent fields as None"""
+        category = cls.__new__(cls)
+        category._id = data.get('_id')
+        category.title = data.get('title')
+        category.description = data.get('description')
+        category.user_id = data.get('user_id')
+        return category
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {field: _FIELD_SERIALIZERS[field](self) for field in fields}
+        
         return {
             '_id': str(self._id) if self._id else None,
+            # Legacy clients of the retired single-file servers read `id`
+            'id': str(self._id) if self._id else None,
             'title': self.title,
             'description': self.description,
             'user_id': str(self.user_id)
@@ -22,6 +40,14 @@ class Category:
         """Check if the category title is in the predefined list"""
         return title in Config.EXPENSE_CATEGORIES
 
+_FIELD_SERIALIZERS = {
+    '_id': lambda category: str(category._id) if category._id else None,
+    'title': lambda category: category.title,
+    'description': lambda category: category.description,
+    'user_id': lambda category: str(category.user_id)
+}
+
+@traced_schema
 class CategorySchema(Schema):
     title = fields.Str(required=True, validate=validate.OneOf(Config.EXPENSE_CATEGORIES))
     description = fields.Str(required=True, validate=validate.Length(min=1, max=200))
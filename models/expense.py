@@ -1,36 +1,105 @@
 from bson import ObjectId
 from marshmallow import Schema, fields, validate
 from datetime import datetime
+from utils.tracing import traced_schema
+from utils.money import to_float
+from models.user import CURRENCY_CODE
+
+MAX_TAGS = 20
+
+def normalize_tags(tags):
+    """Lowercase, trim and de-duplicate tags, keeping their order"""
+    normalized = []
+    for tag in tags or ():
+        tag = tag.strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
 
 class Expense:
-    def __init__(self, amount, note, expense_date, category_id, user_id, _id=None):
+    FIELDS = ('_id', 'amount', 'currency', 'note', 'expense_date', 'category_id', 'user_id', 'tags', 'is_anomaly',
+              'created_at')
+    
+    def __init__(self, amount, note, expense_date, category_id, user_id, _id=None, tags=None, currency=None,
+                 is_anomaly=False):
         self._id = _id
-        self.amount = float(amount)
+        self.amount = to_float(amount)
+        # None on expenses stored before currencies existed: the user's home currency
+        self.currency = currency.upper() if currency else None
         self.note = note
         self.expense_date = expense_date if isinstance(expense_date, datetime) else datetime.fromisoformat(expense_date.replace('Z', '+00:00'))
         self.category_id = ObjectId(category_id) if isinstance(category_id, str) else category_id
         self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        self.tags = normalize_tags(tags)
+        self.is_anomaly = bool(is_anomaly)
         self.created_at = datetime.utcnow()
     
-    def to_dict(self):
+    @classmethod
+    def from_document(cls, data):
+        """Build an expense from a projected document, leaving absent fields as None"""
+        expense = cls.__new__(cls)
+        expense._id = data.get('_id')
+        expense.amount = to_float(data.get('amount'))
+        expense.currency = data.get('currency')
+        expense.note = data.get('note')
+        expense.expense_date = data.get('expense_date')
+        expense.category_id = data.get('category_id')
+        expense.user_id = data.get('user_id')
+        expense.tags = data.get('tags')
+        expense.is_anomaly = data.get('is_anomaly')
+        expense.created_at = data.get('created_at')
+        return expense
+    
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return {field: _FIELD_SERIALIZERS[field](self) for field in fields}
+        
         return {
             '_id': str(self._id) if self._id else None,
+            # Legacy clients of the retired single-file servers read `id`
+            'id': str(self._id) if self._id else None,
             'amount': self.amount,
+            'currency': self.currency,
             'note': self.note,
             'expense_date': self.expense_date.isoformat(),
             'category_id': str(self.category_id),
             'user_id': str(self.user_id),
+            'tags': list(self.tags or []),
+            'is_anomaly': bool(self.is_anomaly),
             'created_at': self.created_at.isoformat()
         }
 
+_FIELD_SERIALIZERS = {
+    '_id': lambda expense: str(expense._id) if expense._id else None,
+    'amount': lambda expense: expense.amount,
+    'currency': lambda expense: expense.currency,
+    'note': lambda expense: expense.note,
+    'expense_date': lambda expense: expense.expense_date.isoformat(),
+    'category_id': lambda expense: str(expense.category_id),
+    'user_id': lambda expense: str(expense.user_id),
+    'tags': lambda expense: list(expense.tags or []),
+    'is_anomaly': lambda expense: bool(expense.is_anomaly),
+    'created_at': lambda expense: expense.created_at.isoformat() if expense.created_at else None
+}
+
+@traced_schema
 class ExpenseSchema(Schema):
     amount = fields.Float(required=True, validate=validate.Range(min=0.01))
+    currency = fields.Str(validate=CURRENCY_CODE)
     note = fields.Str(required=True, validate=validate.Length(min=1, max=500))
     expense_date = fields.DateTime(required=True)
     category_id = fields.Str(required=True)
+    tags = fields.List(fields.Str(validate=[validate.Length(min=1, max=32),
+                                            validate.Regexp(r'^[^,]+$', error='Tags cannot contain commas')]),
+                       validate=validate.Length(max=MAX_TAGS))
 
+@traced_schema
 class ExpenseUpdateSchema(Schema):
     amount = fields.Float(validate=validate.Range(min=0.01))
+    currency = fields.Str(validate=CURRENCY_CODE)
     note = fields.Str(validate=validate.Length(min=1, max=500))
     expense_date = fields.DateTime()
     category_id = fields.Str()
+    tags = fields.List(fields.Str(validate=[validate.Length(min=1, max=32),
+                                            validate.Regexp(r'^[^,]+$', error='Tags cannot contain commas')]),
+                       validate=validate.Length(max=MAX_TAGS))
@@ -0,0 +1,30 @@
+from bson import ObjectId
+from marshmallow import Schema, fields, validate
+from datetime import datetime
+from utils.tracing import traced_schema
+from utils.money import to_float
+
+class Income:
+    def __init__(self, user_id, month, amount, currency=None):
+        self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        self.month = month
+        self.amount = to_float(amount)
+        self.currency = currency
+        self.updated_at = datetime.utcnow()
+
+    @classmethod
+    def from_document(cls, data):
+        income = cls(data['user_id'], data['month'], data['amount'], data.get('currency'))
+        income.updated_at = data.get('updated_at')
+        return income
+
+    def to_dict(self):
+        return {
+            'amount': self.amount,
+            'month': self.month,
+            'currency': self.currency
+        }
+
+@traced_schema
+class IncomeSchema(Schema):
+    amount = fields.Float(required=True, validate=validate.Range(min=0.01))
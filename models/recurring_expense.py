@@ -0,0 +1,111 @@
+from bson import ObjectId
+from marshmallow import Schema, fields, validate, validates_schema, ValidationError
+from datetime import datetime, timezone
+from dateutil.rrule import rrulestr
+import re
+from utils.tracing import traced_schema
+from utils.money import to_float
+from models.user import CURRENCY_CODE
+
+# Occurrences more frequent than daily are not expenses anyone re-enters
+ALLOWED_FREQUENCIES = ('YEARLY', 'MONTHLY', 'WEEKLY', 'DAILY')
+
+def to_utc_naive(value):
+    """Normalize a datetime to naive UTC, as MongoDB returns it"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def parse_rrule(rule, start_date):
+    """Parse an RFC 5545 RRULE string anchored at start_date"""
+    rule = rule.strip()
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[6:]
+    match = re.search(r'(?:^|;)FREQ=([A-Z]+)', rule.upper())
+    if not match or match.group(1) not in ALLOWED_FREQUENCIES:
+        raise ValueError(f"RRULE FREQ must be one of: {', '.join(ALLOWED_FREQUENCIES)}")
+    return rrulestr(rule, dtstart=to_utc_naive(start_date))
+
+class RecurringExpense:
+    def __init__(self, amount, note, category_id, user_id, rrule, start_date, end_date=None,
+                 next_run_at=None, active=True, _id=None, currency=None):
+        self._id = _id
+        self.amount = to_float(amount)
+        self.currency = currency
+        self.note = note
+        self.category_id = ObjectId(category_id) if isinstance(category_id, str) else category_id
+        self.user_id = ObjectId(user_id) if isinstance(user_id, str) else user_id
+        self.rrule = rrule
+        # rrule drops microseconds from dtstart, so the first occurrence would fall before it
+        self.start_date = to_utc_naive(start_date).replace(microsecond=0)
+        self.end_date = to_utc_naive(end_date)
+        self.next_run_at = next_run_at
+        self.active = active
+        self.last_error = None
+        self.created_at = datetime.utcnow()
+
+    @classmethod
+    def from_document(cls, data):
+        rule = cls(data['amount'], data['note'], data['category_id'], data['user_id'], data['rrule'],
+                   data['start_date'], data.get('end_date'), data.get('next_run_at'),
+                   data.get('active', True), data['_id'], data.get('currency'))
+        rule.last_error = data.get('last_error')
+        rule.created_at = data.get('created_at')
+        return rule
+
+    def occurrences(self):
+        """dateutil rrule for this rule"""
+        return parse_rrule(self.rrule, self.start_date)
+
+    def first_run_at(self):
+        """First occurrence on or after start_date, or None if the rule never fires"""
+        occurrence = self.occurrences().after(self.start_date, inc=True)
+        if occurrence is None or (self.end_date and occurrence > self.end_date):
+            return None
+        return occurrence
+
+    def to_dict(self):
+        return {
+            '_id': str(self._id) if self._id else None,
+            'amount': self.amount,
+            'currency': self.currency,
+            'note': self.note,
+            'category_id': str(self.category_id),
+            'user_id': str(self.user_id),
+            'rrule': self.rrule,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'active': self.active,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+@traced_schema
+class RecurringExpenseSchema(Schema):
+    amount = fields.Float(required=True, validate=validate.Range(min=0.01))
+    currency = fields.Str(validate=CURRENCY_CODE)
+    note = fields.Str(required=True, validate=validate.Length(min=1, max=500))
+    category_id = fields.Str(required=True)
+    rrule = fields.Str(required=True, validate=validate.Length(min=1, max=500))
+    start_date = fields.DateTime(required=True)
+    end_date = fields.DateTime(allow_none=True)
+
+    @validates_schema
+    def validate_rule(self, data, **kwargs):
+        if 'rrule' not in data or 'start_date' not in data:
+            return
+        try:
+            parse_rrule(data['rrule'], data['start_date'])
+        except ValueError as e:
+            raise ValidationError(str(e), 'rrule')
+        end_date = data.get('end_date')
+        if end_date and to_utc_naive(end_date) < to_utc_naive(data['start_date']):
+            raise ValidationError('end_date must not be before start_date', 'end_date')
+
+@traced_schema
+class RecurringExpenseUpdateSchema(Schema):
+    amount = fields.Float(validate=validate.Range(min=0.01))
+    note = fields.Str(validate=validate.Length(min=1, max=500))
+    category_id = fields.Str()
+    active = fields.Bool()
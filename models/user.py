@@ -1,32 +1,45 @@
 from bson import ObjectId
-from flask_bcrypt import generate_password_hash, check_password_hash
 from marshmallow import Schema, fields, validate, ValidationError
 import re
+from utils.metrics import bcrypt_duration
+from utils.tracing import traced_schema
+from config import Config
+
+CURRENCY_CODE = validate.Regexp(r'^[A-Za-z]{3}$', error='Currency must be a 3-letter ISO 4217 code')
 
 class User:
-    def __init__(self, first_name, last_name, email, password, _id=None):
+    def __init__(self, first_name, last_name, email, password, _id=None, home_currency=None):
         self._id = _id
         self.first_name = first_name
         self.last_name = last_name
         self.email = email.lower()
         self.password = password
+        self.home_currency = (home_currency or Config.DEFAULT_CURRENCY).upper()
     
     def to_dict(self):
         return {
             '_id': str(self._id) if self._id else None,
+            # Legacy clients of the retired single-file servers read `id`
+            'id': str(self._id) if self._id else None,
             'first_name': self.first_name,
             'last_name': self.last_name,
-            'email': self.email
+            'email': self.email,
+            'home_currency': self.home_currency
         }
     
     def hash_password(self):
         """Hash the user's password"""
-        self.password = generate_password_hash(self.password).decode('utf-8')
+        # bcrypt is loaded on the first register or login rather than at startup
+        from flask_bcrypt import generate_password_hash
+        with bcrypt_duration.time(('hash',)):
+            self.password = generate_password_hash(self.password).decode('utf-8')
     
     @staticmethod
     def check_password(hashed_password, password):
         """Check if provided password matches the hashed password"""
-        return check_password_hash(hashed_password, password)
+        from flask_bcrypt import check_password_hash
+        with bcrypt_duration.time(('check',)):
+            return check_password_hash(hashed_password, password)
     
     @staticmethod
     def validate_email(email):
@@ -34,12 +47,15 @@ class User:
         pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
         return re.match(pattern, email) is not None
 
+@traced_schema
 class UserRegistrationSchema(Schema):
     first_name = fields.Str(required=True, validate=validate.Length(min=1, max=50))
     last_name = fields.Str(required=True, validate=validate.Length(min=1, max=50))
     email = fields.Email(required=True)
     password = fields.Str(required=True, validate=validate.Length(min=6, max=100))
+    home_currency = fields.Str(validate=CURRENCY_CODE)
 
+@traced_schema
 class UserLoginSchema(Schema):
     email = fields.Email(required=True)
     password = fields.Str(required=True, validate=validate.Length(min=1))
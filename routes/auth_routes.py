@@ -1,4 +1,5 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 from models.user import UserRegistrationSchema, UserLoginSchema
 from services.user_service import UserService
@@ -19,7 +20,8 @@ def register():
             data['first_name'],
             data['last_name'],
             data['email'],
-            data['password']
+            data['password'],
+            data.get('home_currency')
         )
         
         # Generate JWT token
@@ -99,12 +101,10 @@ def login():
         }), 500
 
 @auth_bp.route('/users/profile', methods=['GET'])
+@jwt_required()
 def get_profile():
     """Get user profile (requires authentication)"""
-    from flask_jwt_extended import jwt_required, get_jwt_identity
-    
     try:
-        # This will be protected by JWT middleware
         current_user = get_jwt_identity()
         
         user = UserService.get_user_by_id(current_user['user_id'])
@@ -0,0 +1,128 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
+from models.budget import BudgetSchema
+from services.budget_service import BudgetService
+from services.notification_service import NotificationService
+from utils.conditional import conditional_get
+
+budget_bp = Blueprint('budgets', __name__)
+
+@budget_bp.route('/budgets', methods=['GET'])
+@jwt_required()
+def get_budgets():
+    """Get the user's monthly budgets with this month's spend"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        budgets = BudgetService.get_user_budgets(user_id)
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'budgets': [budget.to_dict() for budget in budgets]
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching budgets'
+        }), 500
+
+@budget_bp.route('/budgets/<category_id>', methods=['PUT'])
+@jwt_required()
+def set_budget(category_id):
+    """Create or update the monthly budget for a category"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        # Validate request data
+        schema = BudgetSchema()
+        data = schema.load(request.get_json())
+
+        budget = BudgetService.set_budget(user_id, category_id, data['amount'])
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Budget saved successfully',
+            'data': {
+                'budget': budget.to_dict()
+            }
+        }), 200
+
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': e.messages
+        }), 400
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while saving budget'
+        }), 500
+
+@budget_bp.route('/budgets/<category_id>', methods=['DELETE'])
+@jwt_required()
+def delete_budget(category_id):
+    """Delete the budget for a category"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        BudgetService.delete_budget(user_id, category_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Budget deleted successfully'
+        }), 200
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while deleting budget'
+        }), 500
+
+@budget_bp.route('/notifications', methods=['GET'])
+@jwt_required()
+@conditional_get
+def get_notifications():
+    """Poll the notification feed; pass the returned cursor as since on the next call"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        since = request.args.get('since', 0, type=int)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 100)
+
+        notifications = NotificationService.get_notifications(user_id, since, limit)
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'notifications': notifications,
+                'cursor': notifications[-1]['cursor'] if notifications else since
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching notifications'
+        }), 500
@@ -1,28 +1,40 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from models.category import CategorySchema
+from models.category import Category, CategorySchema
 from services.category_service import CategoryService
+from utils.conditional import conditional_get
+from utils.fieldsets import parse_fields
+from utils.error_handlers import NotFoundError
 
 category_bp = Blueprint('categories', __name__)
 
 @category_bp.route('/categories', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_categories():
     """Get all categories for the authenticated user"""
     try:
         current_user = get_jwt_identity()
         user_id = current_user['user_id']
         
-        categories = CategoryService.get_user_categories(user_id)
+        fields = parse_fields(request.args.get('fields'), Category.FIELDS)
+        
+        categories = CategoryService.get_user_categories(user_id, fields)
         
         return jsonify({
             'status': 'success',
             'data': {
-                'categories': [category.to_dict() for category in categories]
+                'categories': [category.to_dict(fields) for category in categories]
             }
         }), 200
         
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+        
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -139,6 +151,12 @@ def update_category(category_id):
             'errors': e.messages
         }), 400
         
+    except NotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+        
     except ValueError as e:
         return jsonify({
             'status': 'error',
@@ -166,6 +184,12 @@ def delete_category(category_id):
             'message': 'Category deleted successfully'
         }), 200
         
+    except NotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+        
     except ValueError as e:
         return jsonify({
             'status': 'error',
@@ -1,14 +1,20 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
-from models.expense import ExpenseSchema, ExpenseUpdateSchema
+from models.expense import Expense, ExpenseSchema, ExpenseUpdateSchema
 from services.expense_service import ExpenseService
+from services.forecast_service import ForecastService
+from utils.conditional import conditional_get
+from utils.fieldsets import parse_fields
+from utils.idempotency import idempotent
+from utils.error_handlers import NotFoundError
 from datetime import datetime
 
 expense_bp = Blueprint('expenses', __name__)
 
 @expense_bp.route('/expenses', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_expenses():
     """Get expenses with optional filtering"""
     try:
@@ -21,6 +27,17 @@ def get_expenses():
         start_date_str = request.args.get('start_date')
         end_date_str = request.args.get('end_date')
         limit = request.args.get('limit', type=int)
+        fields = parse_fields(request.args.get('fields'), Expense.FIELDS)
+        tags = [tag for tag in request.args.get('tags', '').split(',') if tag.strip()]
+        tags_mode = request.args.get('tags_mode', 'all')
+        is_anomaly = request.args.get('is_anomaly')
+        if is_anomaly is not None:
+            if is_anomaly.lower() not in ('true', 'false'):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid is_anomaly. Must be true or false'
+                }), 400
+            is_anomaly = is_anomaly.lower() == 'true'
         
         # Parse dates if provided
         start_date = None
@@ -47,17 +64,17 @@ def get_expenses():
         # Get expenses based on filter type
         if filter_type:
             expenses = ExpenseService.get_expenses_by_filter(
-                user_id, filter_type, start_date, end_date
+                user_id, filter_type, start_date, end_date, fields, tags, tags_mode, is_anomaly
             )
         else:
             expenses = ExpenseService.get_user_expenses(
-                user_id, category_id, start_date, end_date, limit
+                user_id, category_id, start_date, end_date, limit, fields, tags, tags_mode, is_anomaly
             )
         
         # Get summary if requested
         include_summary = request.args.get('include_summary', 'false').lower() == 'true'
         response_data = {
-            'expenses': [expense.to_dict() for expense in expenses]
+            'expenses': [expense.to_dict(fields) for expense in expenses]
         }
         
         if include_summary:
@@ -112,6 +129,7 @@ def get_expense(expense_id):
 
 @expense_bp.route('/expenses', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_expense():
     """Create a new expense"""
     try:
@@ -128,7 +146,9 @@ def create_expense():
             data['note'],
             data['expense_date'],
             data['category_id'],
-            user_id
+            user_id,
+            data.get('tags'),
+            data.get('currency')
         )
         
         return jsonify({
@@ -177,7 +197,9 @@ def update_expense(expense_id):
             data.get('amount'),
             data.get('note'),
             data.get('expense_date'),
-            data.get('category_id')
+            data.get('category_id'),
+            data.get('tags'),
+            data.get('currency')
         )
         
         return jsonify({
@@ -195,6 +217,12 @@ def update_expense(expense_id):
             'errors': e.messages
         }), 400
         
+    except NotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+        
     except ValueError as e:
         return jsonify({
             'status': 'error',
@@ -222,6 +250,12 @@ def delete_expense(expense_id):
             'message': 'Expense deleted successfully'
         }), 200
         
+    except NotFoundError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+        
     except ValueError as e:
         return jsonify({
             'status': 'error',
@@ -236,6 +270,7 @@ def delete_expense(expense_id):
 
 @expense_bp.route('/expenses/summary', methods=['GET'])
 @jwt_required()
+@conditional_get
 def get_expense_summary():
     """Get expense summary with totals and breakdowns"""
     try:
@@ -270,13 +305,16 @@ def get_expense_summary():
         
         # Apply filter if specified
         if filter_type:
-            expenses = ExpenseService.get_expenses_by_filter(
-                user_id, filter_type, start_date, end_date
+            window_start, window_end = ExpenseService.resolve_filter_window(
+                filter_type, start_date, end_date
             )
             # Calculate dates for summary
-            if expenses:
-                start_date = min(expense.expense_date for expense in expenses)
-                end_date = max(expense.expense_date for expense in expenses)
+            first_date, last_date = ExpenseService.get_expense_date_range(
+                user_id, window_start, window_end
+            )
+            if first_date:
+                start_date = first_date
+                end_date = last_date
         
         summary = ExpenseService.get_expense_summary(user_id, start_date, end_date)
         
@@ -302,3 +340,94 @@ def get_expense_summary():
             'status': 'error',
             'message': 'An error occurred while generating summary'
         }), 500
+
+@expense_bp.route('/expenses/search', methods=['GET'])
+@jwt_required()
+def search_expenses():
+    """Search expense notes; all words must match and word* matches a prefix"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({
+                'status': 'error',
+                'message': 'Query parameter q is required'
+            }), 400
+        
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        
+        start_date = None
+        end_date = None
+        
+        if start_date_str:
+            try:
+                start_date = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid start_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)'
+                }), 400
+        
+        if end_date_str:
+            try:
+                end_date = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Invalid end_date format. Use ISO format (YYYY-MM-DDTHH:MM:SS)'
+                }), 400
+        
+        results = ExpenseService.search_expenses(user_id, query, start_date, end_date, limit)
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'expenses': [dict(expense.to_dict(), score=score) for expense, score in results],
+                'count': len(results)
+            }
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while searching expenses'
+        }), 500
+
+@expense_bp.route('/expenses/forecast', methods=['GET'])
+@jwt_required()
+def get_expense_forecast():
+    """Projected end-of-month spend per category, in the user's home currency"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        forecast = ForecastService.get_forecast(user_id)
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'forecast': forecast
+            }
+        }), 200
+        
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while generating forecast'
+        }), 500
@@ -0,0 +1,86 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
+from models.income import IncomeSchema
+from services.income_service import IncomeService
+
+income_bp = Blueprint('income', __name__)
+
+@income_bp.route('/income', methods=['POST'])
+@jwt_required()
+def set_monthly_income():
+    """Set the user's income for the current month"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        # Validate request data
+        schema = IncomeSchema()
+        data = schema.load(request.get_json())
+
+        income = IncomeService.set_income(user_id, data['amount'])
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Monthly income set successfully',
+            'data': {
+                'income': income.to_dict()
+            }
+        }), 201
+
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': e.messages
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while setting income'
+        }), 500
+
+@income_bp.route('/income', methods=['GET'])
+@jwt_required()
+def get_monthly_income():
+    """Get the user's income for the current month"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        income = IncomeService.get_income(user_id)
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'income': income.to_dict()
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching income'
+        }), 500
+
+@income_bp.route('/savings', methods=['GET'])
+@jwt_required()
+def calculate_savings():
+    """This month's income minus spend, with a per-category breakdown"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        savings = IncomeService.get_savings(user_id)
+
+        return jsonify({
+            'status': 'success',
+            'data': savings
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while calculating savings'
+        }), 500
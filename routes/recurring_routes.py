@@ -0,0 +1,183 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import ValidationError
+from models.recurring_expense import RecurringExpenseSchema, RecurringExpenseUpdateSchema
+from services.recurring_service import RecurringExpenseService
+
+recurring_bp = Blueprint('recurring', __name__)
+
+@recurring_bp.route('/recurring-expenses', methods=['GET'])
+@jwt_required()
+def get_recurring_expenses():
+    """Get all recurring expense rules for the authenticated user"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        rules = RecurringExpenseService.get_user_rules(user_id)
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'recurring_expenses': [rule.to_dict() for rule in rules]
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching recurring expenses'
+        }), 500
+
+@recurring_bp.route('/recurring-expenses/<rule_id>', methods=['GET'])
+@jwt_required()
+def get_recurring_expense(rule_id):
+    """Get a specific recurring expense rule"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        rule = RecurringExpenseService.get_rule_by_id(rule_id, user_id)
+        if not rule:
+            return jsonify({
+                'status': 'error',
+                'message': 'Recurring expense not found'
+            }), 404
+
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'recurring_expense': rule.to_dict()
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching recurring expense'
+        }), 500
+
+@recurring_bp.route('/recurring-expenses', methods=['POST'])
+@jwt_required()
+def create_recurring_expense():
+    """Create a recurring expense rule from an RRULE, e.g. FREQ=MONTHLY;BYMONTHDAY=1"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        # Validate request data
+        schema = RecurringExpenseSchema()
+        data = schema.load(request.get_json())
+
+        rule = RecurringExpenseService.create_rule(
+            user_id,
+            data['amount'],
+            data['note'],
+            data['category_id'],
+            data['rrule'],
+            data['start_date'],
+            data.get('end_date'),
+            data.get('currency')
+        )
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Recurring expense created successfully',
+            'data': {
+                'recurring_expense': rule.to_dict()
+            }
+        }), 201
+
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': e.messages
+        }), 400
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while creating recurring expense'
+        }), 500
+
+@recurring_bp.route('/recurring-expenses/<rule_id>', methods=['PUT'])
+@jwt_required()
+def update_recurring_expense(rule_id):
+    """Update a recurring expense rule, or pause/resume it with active"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        # Validate request data
+        schema = RecurringExpenseUpdateSchema()
+        data = schema.load(request.get_json())
+
+        rule = RecurringExpenseService.update_rule(
+            rule_id,
+            user_id,
+            data.get('amount'),
+            data.get('note'),
+            data.get('category_id'),
+            data.get('active')
+        )
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Recurring expense updated successfully',
+            'data': {
+                'recurring_expense': rule.to_dict()
+            }
+        }), 200
+
+    except ValidationError as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'Validation failed',
+            'errors': e.messages
+        }), 400
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while updating recurring expense'
+        }), 500
+
+@recurring_bp.route('/recurring-expenses/<rule_id>', methods=['DELETE'])
+@jwt_required()
+def delete_recurring_expense(rule_id):
+    """Delete a recurring expense rule; expenses it already created are kept"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+
+        RecurringExpenseService.delete_rule(rule_id, user_id)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Recurring expense deleted successfully'
+        }), 200
+
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while deleting recurring expense'
+        }), 500
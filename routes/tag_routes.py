@@ -0,0 +1,30 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from services.tag_service import TagService
+from utils.conditional import conditional_get
+
+tag_bp = Blueprint('tags', __name__)
+
+@tag_bp.route('/tags', methods=['GET'])
+@jwt_required()
+@conditional_get
+def get_tags():
+    """Get the user's tags with expense counts and totals"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        tags = TagService.get_user_tags(user_id)
+        
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'tags': tags
+            }
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': 'An error occurred while fetching tags'
+        }), 500
@@ -7,7 +7,8 @@ This script provides different ways to run the application
 import os
 import sys
 import argparse
-from app import app
+
+# The app is only built once a mode needs it, so --help and argument errors return immediately
 
 def run_development():
     """Run the application in development mode"""
@@ -17,6 +18,9 @@ def run_development():
     print("🧪 Run test_api.py to test the endpoints")
     print("-" * 50)
     
+    from app import create_app, start_background_workers
+    app = create_app()
+    start_background_workers(reloader=True)
     app.run(
         debug=True,
         host='0.0.0.0',
@@ -27,6 +31,9 @@ def run_production():
     """Run the application in production mode"""
     print("🚀 Starting Expense Tracker API in production mode...")
     
+    from app import create_app, start_background_workers
+    app = create_app()
+    start_background_workers()
     app.run(
         debug=False,
         host='0.0.0.0',
@@ -43,7 +50,7 @@ def check_dependencies():
         import flask_cors
         import pymongo
         import marshmallow
-        import python_dateutil
+        import dateutil
         print("✅ All dependencies are installed")
         return True
     except ImportError as e:
@@ -54,9 +61,9 @@ def check_dependencies():
 def check_mongodb_connection():
     """Check if MongoDB is accessible"""
     try:
+        from app import create_app
         from services.database import db_service
-        with app.app_context():
-            db_service.init_app(app)
+        with create_app().app_context():
             # Try to get database info
             db_service.get_db().command('ping')
         print("✅ MongoDB connection successful")
@@ -0,0 +1,146 @@
+from bson import ObjectId
+from collections import defaultdict
+from pymongo.errors import DuplicateKeyError
+import math
+from services.database import db_service, once_per_batch
+from services.user_service import UserService
+from services.fx_rates import fx_rates
+from utils.tracing import traced_service
+from config import Config
+
+# Spend is roughly log-normal, so statistics are kept over log(amount);
+# the floor keeps categories of near-identical amounts from flagging small changes
+MIN_LOG_STD = 0.1
+
+# Attempts at a compare-and-set stats update before giving up on it
+MAX_UPDATE_ATTEMPTS = 5
+
+def log_amount(amount):
+    # Conversion can round a tiny foreign amount down to zero cents
+    return math.log(max(float(amount), 0.01))
+
+def merge_stats(stats, count, mean, m2):
+    """Combine (count, mean, M2) summaries; a negative count removes samples"""
+    total, current_mean, current_m2 = stats
+    combined = total + count
+    if combined <= 0:
+        return 0, 0.0, 0.0
+    delta = mean - current_mean
+    new_mean = current_mean + delta * count / combined
+    # Removing a batch takes its own spread out too
+    spread = m2 if count > 0 else -m2
+    new_m2 = current_m2 + spread + delta * delta * total * count / combined
+    return combined, new_mean, max(new_m2, 0.0)
+
+def z_score(stats, amount):
+    """z-score of an amount against (count, mean, M2) of log amounts, or None if too little history"""
+    count, mean, m2 = stats
+    if count < Config.ANOMALY_MIN_SAMPLES:
+        return None
+    std = math.sqrt(m2 / (count - 1))
+    return (log_amount(amount) - mean) / max(std, MIN_LOG_STD)
+
+@traced_service
+class AnomalyService:
+    COLLECTION = 'expense_stats'
+    _indexed = False
+
+    @staticmethod
+    def score(user_id, category_id, amount, without=None):
+        """z-score of a home-currency amount against the category's history, or None if too little history.
+
+        `without` is a home-currency amount left out of the history, such as
+        the current value of an expense being edited.
+        """
+        stats = AnomalyService._get_stats(user_id, category_id)
+        summary = (stats['count'], stats['mean'], stats['m2'])
+        if without is not None:
+            summary = merge_stats(summary, -1, log_amount(without), 0.0)
+        return z_score(summary, amount)
+
+    @staticmethod
+    def is_anomaly(score):
+        return score is not None and score >= Config.ANOMALY_Z_THRESHOLD
+
+    @staticmethod
+    def record(user_id, category_id, amount, sign=1, batch=None):
+        """Add (or with sign=-1 remove) one home-currency amount in the category's stats"""
+        AnomalyService._update(AnomalyService._key(user_id, category_id),
+                               sign, log_amount(amount), 0.0, batch)
+
+    @staticmethod
+    def record_bulk(documents, batch=None):
+        """Fold a batch of inserted expense documents into the stats, one update per category.
+
+        Categories whose stats already took `batch` are left alone.
+        """
+        samples = defaultdict(list)
+        for document in documents:
+            user_id = str(document['user_id'])
+            amount = fx_rates.convert(document['amount'], document.get('currency'),
+                                      UserService.get_home_currency(user_id), document['expense_date'])
+            samples[(user_id, str(document['category_id']))].append(log_amount(amount))
+
+        for (user_id, category_id), values in samples.items():
+            count = len(values)
+            mean = sum(values) / count
+            m2 = sum((value - mean) ** 2 for value in values)
+            AnomalyService._update(AnomalyService._key(user_id, category_id), count, mean, m2, batch)
+
+    @staticmethod
+    def _update(key, count, mean, m2, batch=None):
+        # Stats that don't exist yet are backfilled from the expenses on the next score()
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            stats = db_service.find_one(AnomalyService.COLLECTION, {'_id': key})
+            if stats is None or batch in stats.get('applied_batches', ()):
+                return
+            total, new_mean, new_m2 = merge_stats((stats['count'], stats['mean'], stats['m2']), count, mean, m2)
+            # The version check makes the batch check atomic with the update
+            query, update = once_per_batch({'_id': key, 'version': stats['version']},
+                                           {'$set': {'count': total, 'mean': new_mean, 'm2': new_m2},
+                                            '$inc': {'version': 1}},
+                                           batch)
+            updated = db_service.find_one_and_update(AnomalyService.COLLECTION, query, update)
+            if updated is not None:
+                return
+        # Losing the race repeatedly only costs accuracy; a rebuild recomputes the stats
+        db_service.delete_one(AnomalyService.COLLECTION, {'_id': key})
+
+    @staticmethod
+    def _get_stats(user_id, category_id):
+        key = AnomalyService._key(user_id, category_id)
+        stats = db_service.find_one(AnomalyService.COLLECTION, {'_id': key})
+        if stats is not None:
+            return stats
+
+        # First check for this category: fold in the existing expenses once
+        home_currency = UserService.get_home_currency(user_id)
+        total, mean, m2 = 0, 0.0, 0.0
+        # Bulk inserts not yet folded in add theirs later
+        for exp_data in db_service.find_many('expenses',
+                                             {'user_id': ObjectId(user_id), 'category_id': ObjectId(category_id),
+                                              'derived_pending': {'$ne': 'anomaly'}},
+                                             projection={'_id': 0, 'amount': 1, 'currency': 1, 'expense_date': 1}):
+            amount = fx_rates.convert(exp_data['amount'], exp_data.get('currency'), home_currency,
+                                      exp_data['expense_date'])
+            total, mean, m2 = merge_stats((total, mean, m2), 1, log_amount(amount), 0.0)
+
+        stats = {'_id': key, 'user_id': ObjectId(user_id), 'category_id': ObjectId(category_id),
+                 'count': total, 'mean': mean, 'm2': m2, 'version': 0}
+        try:
+            db_service.insert_one(AnomalyService.COLLECTION, stats)
+        except DuplicateKeyError:
+            stats = db_service.find_one(AnomalyService.COLLECTION, {'_id': key}) or stats
+        return stats
+
+    @staticmethod
+    def _key(user_id, category_id):
+        return f"{user_id}:{category_id}"
+
+    @staticmethod
+    def ensure_indexes():
+        """Partial index behind ?is_anomaly=true: only flagged expenses are indexed"""
+        db_service.get_collection('expenses').create_index(
+            [('user_id', 1), ('expense_date', -1)], name='user_anomalies',
+            partialFilterExpression={'is_anomaly': True})
+        AnomalyService._indexed = True
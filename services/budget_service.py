@@ -0,0 +1,271 @@
+from bson import ObjectId
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal
+from functools import lru_cache
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from models.budget import Budget
+from services.database import db_service, once_per_batch
+from services.cache_invalidation import invalidation_bus
+from services.category_service import CategoryService
+from services.notification_service import NotificationService
+from services.user_service import UserService
+from services.fx_rates import fx_rates
+from utils.money import to_cents, to_decimal, to_decimal128, to_float
+from utils.tracing import traced_service
+from config import Config
+
+def month_of(date):
+    """Budget month key (YYYY-MM, UTC) for an expense date"""
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc)
+    return f"{date.year:04d}-{date.month:02d}"
+
+def month_bounds(month):
+    """[start, end) datetimes of a YYYY-MM month"""
+    year, month_number = map(int, month.split('-'))
+    start = datetime(year, month_number, 1)
+    end = datetime(year + month_number // 12, month_number % 12 + 1, 1)
+    return start, end
+
+@traced_service
+class BudgetService:
+    COLLECTION = 'budgets'
+    SPEND_COLLECTION = 'budget_spend'
+
+    _indexed = False
+
+    @staticmethod
+    def set_budget(user_id, category_id, amount):
+        """Create or replace the monthly budget for one of the user's categories"""
+        if not BudgetService._indexed:
+            BudgetService.ensure_indexes()
+
+        category = CategoryService.get_category_by_id(category_id, user_id)
+        if not category:
+            raise ValueError("Category not found or doesn't belong to user")
+
+        now = datetime.utcnow()
+        budget_data = db_service.find_one_and_update(BudgetService.COLLECTION,
+                                                     {'user_id': ObjectId(user_id),
+                                                      'category_id': ObjectId(category_id)},
+                                                     {'$set': {'amount': to_decimal128(amount), 'updated_at': now},
+                                                      '$setOnInsert': {'created_at': now}},
+                                                     upsert=True)
+        invalidation_bus.publish('budgets', user_id)
+        budget = Budget.from_document(budget_data)
+
+        # Expenses written before the budget existed are folded in once here;
+        # from now on the write paths keep the month total up to date
+        month = month_of(now)
+        budget.month = month
+        spent = BudgetService._reconcile(user_id, category_id, month)
+        budget.spent = to_float(spent)
+        BudgetService._check_thresholds(budget_data, BudgetService._spend_key(user_id, category_id, month),
+                                        month, spent)
+
+        return budget
+
+    @staticmethod
+    def get_user_budgets(user_id):
+        """Get the user's budgets with this month's spend"""
+        budgets = [Budget.from_document(budget_data)
+                   for budget_data in db_service.find_many(BudgetService.COLLECTION,
+                                                           {'user_id': ObjectId(user_id)})]
+
+        month = month_of(datetime.utcnow())
+        keys = [BudgetService._spend_key(user_id, budget.category_id, month) for budget in budgets]
+        spend = {row['_id']: to_float(row['spent'])
+                 for row in db_service.find_many(BudgetService.SPEND_COLLECTION, {'_id': {'$in': keys}})}
+
+        for budget, key in zip(budgets, keys):
+            budget.month = month
+            budget.spent = spend.get(key, 0.0)
+
+        return budgets
+
+    @staticmethod
+    def delete_budget(user_id, category_id):
+        """Delete the budget for a category"""
+        if not db_service.is_valid_object_id(category_id):
+            raise ValueError("Invalid category ID")
+
+        success = db_service.delete_one(BudgetService.COLLECTION, {
+            'user_id': ObjectId(user_id),
+            'category_id': ObjectId(category_id)
+        })
+
+        if not success:
+            raise ValueError("Budget not found")
+
+        invalidation_bus.publish('budgets', user_id)
+        return True
+
+    @staticmethod
+    def record_spend(user_id, category_id, expense_date, delta, batch=None):
+        """Apply an expense write (delta in the home currency) to its month total and fire any threshold alerts.
+
+        A month total that already took `batch` is left alone.
+        """
+        if not delta:
+            return
+        month = month_of(expense_date)
+        key = BudgetService._spend_key(user_id, category_id, month)
+        query, update = once_per_batch({'_id': key},
+                                       {'$inc': {'spent': to_decimal128(delta)},
+                                        '$setOnInsert': {'user_id': ObjectId(user_id),
+                                                         'category_id': ObjectId(category_id),
+                                                         'month': month}},
+                                       batch)
+        try:
+            spend = db_service.find_one_and_update(BudgetService.SPEND_COLLECTION, query, update, upsert=True)
+        except DuplicateKeyError:
+            spend = db_service.find_one(BudgetService.SPEND_COLLECTION, {'_id': key})
+
+        # Alerts only make sense for the month that is still running, and
+        # most users never set a budget
+        if month != month_of(datetime.utcnow()) or not _has_budgets(str(user_id)):
+            return
+        budget_data = db_service.find_one(BudgetService.COLLECTION, {
+            'user_id': ObjectId(user_id),
+            'category_id': ObjectId(category_id)
+        })
+        if budget_data:
+            BudgetService._check_thresholds(budget_data, key, month, spend['spent'], spend.get('alerted', []))
+
+    @staticmethod
+    def record_spend_bulk(documents, batch=None):
+        """Apply a batch of newly inserted expense documents in one bulk write.
+
+        Month totals that already took `batch` are left alone.
+        """
+        deltas = defaultdict(Decimal)
+        for document in documents:
+            home_currency = UserService.get_home_currency(document['user_id'])
+            deltas[(str(document['user_id']), str(document['category_id']),
+                    month_of(document['expense_date']))] += fx_rates.convert(
+                document['amount'], document.get('currency'), home_currency, document['expense_date'])
+        if not deltas:
+            return
+
+        requests = []
+        for (user_id, category_id, month), delta in deltas.items():
+            query, update = once_per_batch({'_id': BudgetService._spend_key(user_id, category_id, month)},
+                                           {'$inc': {'spent': to_decimal128(delta)},
+                                            '$setOnInsert': {'user_id': ObjectId(user_id),
+                                                             'category_id': ObjectId(category_id),
+                                                             'month': month}},
+                                           batch)
+            requests.append(UpdateOne(query, update, upsert=True))
+        db_service.bulk_write(BudgetService.SPEND_COLLECTION, requests, skip_duplicates=batch is not None)
+
+        current_month = month_of(datetime.utcnow())
+        for user_id, category_id, month in deltas:
+            if month == current_month:
+                BudgetService._evaluate(user_id, category_id, month)
+
+    @staticmethod
+    def _evaluate(user_id, category_id, month):
+        """Check thresholds for a month total that was updated elsewhere"""
+        if not _has_budgets(str(user_id)):
+            return
+        budget_data = db_service.find_one(BudgetService.COLLECTION, {
+            'user_id': ObjectId(user_id),
+            'category_id': ObjectId(category_id)
+        })
+        if not budget_data:
+            return
+        key = BudgetService._spend_key(user_id, category_id, month)
+        spend = db_service.find_one(BudgetService.SPEND_COLLECTION, {'_id': key})
+        if spend:
+            BudgetService._check_thresholds(budget_data, key, month, spend['spent'], spend.get('alerted', []))
+
+    @staticmethod
+    def _check_thresholds(budget_data, key, month, spent, alerted=None):
+        """Alert once per month for each threshold crossed; re-arm thresholds spend fell back under.
+
+        Spend and the budget amount are compared as Decimals, so landing
+        exactly on a threshold counts as crossing it.
+        """
+        if alerted is None:
+            spend = db_service.find_one(BudgetService.SPEND_COLLECTION, {'_id': key})
+            alerted = spend.get('alerted', []) if spend else []
+
+        spent = to_decimal(spent)
+        percent = spent * 100 / to_decimal(budget_data['amount'])
+
+        rearmed = [level for level in alerted if level > percent]
+        if rearmed:
+            db_service.find_one_and_update(BudgetService.SPEND_COLLECTION, {'_id': key},
+                                           {'$pull': {'alerted': {'$in': rearmed}}})
+
+        for level in Config.BUDGET_ALERT_THRESHOLDS:
+            if percent < level or level in alerted:
+                continue
+            # The filter makes the claim atomic, so concurrent writers alert once
+            claimed = db_service.find_one_and_update(BudgetService.SPEND_COLLECTION,
+                                                     {'_id': key, 'alerted': {'$ne': level}},
+                                                     {'$addToSet': {'alerted': level}})
+            if claimed is None:
+                continue
+            category = CategoryService.get_category_by_id(str(budget_data['category_id']),
+                                                          str(budget_data['user_id']))
+            NotificationService.notify(str(budget_data['user_id']), 'budget_threshold', {
+                'category_id': str(budget_data['category_id']),
+                'category_title': category.title if category else None,
+                'month': month,
+                'threshold': level,
+                'budget': to_float(budget_data['amount']),
+                'spent': to_float(to_cents(spent))
+            })
+
+    @staticmethod
+    def _reconcile(user_id, category_id, month):
+        """Recompute one month total from the expenses collection"""
+        key = BudgetService._spend_key(user_id, category_id, month)
+        start, end = month_bounds(month)
+
+        # The stored total is read before the expenses and corrected with $inc,
+        # so a concurrent write's own $inc is never overwritten
+        spend = db_service.find_one(BudgetService.SPEND_COLLECTION, {'_id': key})
+        stored = to_decimal(spend['spent']) if spend else Decimal(0)
+        # Converted per expense in Python: the rate depends on each expense's currency and date
+        home_currency = UserService.get_home_currency(user_id)
+        spent = sum((fx_rates.convert(exp_data['amount'], exp_data.get('currency'), home_currency,
+                                      exp_data['expense_date'])
+                     for exp_data in db_service.find_many('expenses',
+                                                          {'user_id': ObjectId(user_id),
+                                                           'category_id': ObjectId(category_id),
+                                                           'expense_date': {'$gte': start, '$lt': end},
+                                                           # Bulk inserts not yet counted add theirs later
+                                                           'derived_pending': {'$ne': 'budget'}},
+                                                          projection={'_id': 0, 'amount': 1, 'currency': 1,
+                                                                      'expense_date': 1})),
+                    Decimal(0))
+
+        spend = db_service.find_one_and_update(BudgetService.SPEND_COLLECTION,
+                                               {'_id': key},
+                                               {'$inc': {'spent': to_decimal128(spent - stored)},
+                                                '$setOnInsert': {'user_id': ObjectId(user_id),
+                                                                 'category_id': ObjectId(category_id),
+                                                                 'month': month}},
+                                               upsert=True)
+        return to_decimal(spend['spent'])
+
+    @staticmethod
+    def _spend_key(user_id, category_id, month):
+        return f"{user_id}:{category_id}:{month}"
+
+    @staticmethod
+    def ensure_indexes():
+        db_service.get_collection(BudgetService.COLLECTION).create_index(
+            [('user_id', 1), ('category_id', 1)], unique=True)
+        BudgetService._indexed = True
+
+# Whether a user has any budget, dropped whenever budgets change on any worker
+@lru_cache(maxsize=10000)
+def _has_budgets(user_id):
+    return db_service.find_one(BudgetService.COLLECTION, {'user_id': ObjectId(user_id)}) is not None
+
+invalidation_bus.subscribe('budgets', lambda user_id: _has_budgets.cache_clear())
@@ -0,0 +1,209 @@
+from datetime import datetime, timedelta
+import logging
+import os
+import socket
+import threading
+from bson import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from services.database import db_service
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Server error codes that mean change streams can't be used or resumed
+_CHANGE_STREAMS_UNSUPPORTED = {40573}
+_RESUME_TOKEN_LOST = {260, 280, 286}
+
+class InvalidationBus:
+    """Fan-out of cache invalidations keyed by collection name.
+
+    Subscribers are called with the affected user id, or with None when the
+    change can't be attributed to a single user and everything must go.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self.outbox = None
+
+    def subscribe(self, collection_name, callback, remote_only=False, local_only=False):
+        """Register a callback for invalidations on a collection.
+
+        remote_only callbacks skip this worker's own publishes, for caches
+        that the write path already updates in place; local_only callbacks
+        only see this worker's own publishes.
+        """
+        self._subscribers.setdefault(collection_name, []).append((callback, remote_only, local_only))
+
+    def publish(self, collection_name, user_id=None):
+        """Invalidate local caches after a write made by this worker"""
+        self._deliver(collection_name, user_id, local=True)
+        if self.outbox is not None:
+            self.outbox(collection_name, user_id)
+
+    def deliver(self, collection_name, user_id=None):
+        """Invalidate local caches without re-broadcasting to other workers"""
+        self._deliver(collection_name, user_id, local=False)
+
+    def _deliver(self, collection_name, user_id, local):
+        user_id = str(user_id) if user_id is not None else None
+        for callback, remote_only, local_only in self._subscribers.get(collection_name, ()):
+            if (local and remote_only) or (not local and local_only):
+                continue
+            try:
+                callback(user_id)
+            except Exception:
+                logger.exception("Cache invalidation callback failed for %s", collection_name)
+
+    def deliver_all(self):
+        """Drop every subscribed cache, e.g. after missing change events"""
+        for collection_name in list(self._subscribers):
+            self.deliver(collection_name, None)
+
+class ChangeStreamWatcher:
+    """Background thread feeding remote writes from MongoDB into the bus.
+
+    Every worker records its publishes in an outbox collection, tagged with
+    the owning user and the publishing worker. The watcher tails a change
+    stream on the outbox and skips its own entries. The resume token is
+    only kept in memory: a restarted worker starts with empty caches, so
+    it has nothing to catch up on. On a standalone server, where change streams are unavailable,
+    it polls the outbox instead. Drops and renames of the watched
+    collections still come from the change stream and clear every user.
+    """
+
+    OUTBOX_COLLECTION = 'cache_invalidations'
+
+    def __init__(self, bus, collections=('expenses', 'categories', 'users', 'notifications', 'budgets')):
+        self.bus = bus
+        self.collections = tuple(collections)
+        self.mode = Config.CACHE_INVALIDATION_MODE
+        self.poll_interval = Config.CACHE_INVALIDATION_POLL_SECONDS
+        self.node_id = os.getenv('HOSTNAME') or socket.gethostname()
+        self.origin = f"{self.node_id}:{os.getpid()}"
+        self._resume_token = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start tailing in a daemon thread (no-op when disabled or running)"""
+        if self.mode == 'off' or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cache-invalidation', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                if self.bus.outbox is None:
+                    self._enable_outbox()
+                if self.mode == 'polling':
+                    self._poll_outbox()
+                else:
+                    self._tail_change_stream()
+                backoff = 1
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAMS_UNSUPPORTED and self.mode == 'auto':
+                    logger.info("Change streams unavailable, polling %s instead", self.OUTBOX_COLLECTION)
+                    self.mode = 'polling'
+                    continue
+                if e.code in _RESUME_TOKEN_LOST:
+                    logger.warning("Change stream history lost, dropping all caches")
+                    self._resume_token = None
+                    self.bus.deliver_all()
+                    continue
+                logger.warning("Cache invalidation watcher error: %s", e)
+            except PyMongoError as e:
+                logger.warning("Cache invalidation watcher error: %s", e)
+            # Anything missed while disconnected can't be attributed to a user
+            self.bus.deliver_all()
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 30)
+
+    # Change stream mode
+
+    def _tail_change_stream(self):
+        pipeline = [
+            {'$match': {'$or': [
+                {'ns.coll': self.OUTBOX_COLLECTION, 'operationType': 'insert'},
+                {'ns.coll': {'$in': list(self.collections)},
+                 'operationType': {'$in': ['drop', 'rename', 'invalidate']}}
+            ]}},
+            {'$project': {'operationType': 1, 'ns': 1, 'fullDocument': 1}}
+        ]
+        with db_service.get_db().watch(pipeline,
+                                       resume_after=self._resume_token,
+                                       max_await_time_ms=1000) as stream:
+            while not self._stop.is_set():
+                change = stream.try_next()
+                if change is not None:
+                    self._handle_change(change)
+                self._resume_token = stream.resume_token
+
+    def _handle_change(self, change):
+        if change['operationType'] == 'insert':
+            self._apply_entry(change['fullDocument'])
+            return
+
+        # A dropped or renamed collection can't be attributed to a user
+        self.bus.deliver(change['ns']['coll'], None)
+
+    def _apply_entry(self, entry):
+        """Deliver an outbox entry published by another worker"""
+        if entry.get('origin') == self.origin:
+            return
+        self.bus.deliver(entry['collection'], entry.get('user_id'))
+
+    # Outbox
+
+    def _enable_outbox(self):
+        collection = db_service.get_collection(self.OUTBOX_COLLECTION)
+        collection.create_index('created_at', expireAfterSeconds=Config.CACHE_INVALIDATION_OUTBOX_TTL)
+
+        def record(collection_name, user_id):
+            if collection_name not in self.collections:
+                return
+            try:
+                db_service.insert_one(self.OUTBOX_COLLECTION, {
+                    'collection': collection_name,
+                    'user_id': str(user_id) if user_id is not None else None,
+                    'origin': self.origin,
+                    'created_at': datetime.utcnow()
+                })
+            except PyMongoError as e:
+                logger.warning("Failed to record cache invalidation: %s", e)
+
+        self.bus.outbox = record
+
+    # Polling mode
+
+    def _poll_outbox(self):
+        # ObjectIds from different workers aren't strictly ordered, so each
+        # poll re-reads a short overlap window and skips ids already applied
+        overlap = timedelta(seconds=max(5, self.poll_interval * 2))
+        seen = {}
+        cursor_time = datetime.utcnow()
+
+        while not self._stop.is_set():
+            since = ObjectId.from_datetime(cursor_time - overlap)
+            entries = db_service.find_many(self.OUTBOX_COLLECTION,
+                                         {'_id': {'$gte': since}},
+                                         sort=[('_id', 1)])
+            for entry in entries:
+                if entry['_id'] in seen:
+                    continue
+                seen[entry['_id']] = entry['created_at']
+                self._apply_entry(entry)
+
+            cursor_time = datetime.utcnow()
+            horizon = cursor_time - overlap * 2
+            seen = {entry_id: created for entry_id, created in seen.items() if created >= horizon}
+            self._stop.wait(self.poll_interval)
+
+# Global invalidation bus and watcher instances
+invalidation_bus = InvalidationBus()
+invalidation_watcher = ChangeStreamWatcher(invalidation_bus)
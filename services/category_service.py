@@ -1,8 +1,15 @@
 from bson import ObjectId
 from models.category import Category
 from services.database import db_service
+from services.cache_invalidation import invalidation_bus
+from services.search_index import search_index
+from services.tag_service import TagService
+from utils.fieldsets import build_projection
+from utils.error_handlers import NotFoundError
 from config import Config
+from utils.tracing import traced_service
 
+@traced_service
 class CategoryService:
     @staticmethod
     def create_category(title, description, user_id):
@@ -31,15 +38,20 @@ class CategoryService:
         
         category_id = db_service.insert_one('categories', category_data)
         category._id = category_id
+        invalidation_bus.publish('categories', user_id)
         
         return category
     
     @staticmethod
-    def get_user_categories(user_id):
+    def get_user_categories(user_id, fields=None):
         """Get all categories for a user"""
         categories_data = db_service.find_many('categories', 
                                              {'user_id': ObjectId(user_id)},
-                                             sort=[('title', 1)])
+                                             sort=[('title', 1)],
+                                             projection=build_projection(fields))
+        
+        if fields is not None:
+            return [Category.from_document(cat_data) for cat_data in categories_data]
         
         categories = []
         for cat_data in categories_data:
@@ -85,7 +97,7 @@ class CategoryService:
         # Get existing category
         existing_category = CategoryService.get_category_by_id(category_id, user_id)
         if not existing_category:
-            raise ValueError("Category not found")
+            raise NotFoundError("Category not found")
         
         update_data = {}
         
@@ -112,6 +124,7 @@ class CategoryService:
             success = db_service.update_one('categories', 
                                           {'_id': ObjectId(category_id), 'user_id': ObjectId(user_id)},
                                           update_data)
+            invalidation_bus.publish('categories', user_id)
             if not success:
                 raise ValueError("Failed to update category")
         
@@ -127,13 +140,24 @@ class CategoryService:
         # Check if category exists
         category = CategoryService.get_category_by_id(category_id, user_id)
         if not category:
-            raise ValueError("Category not found")
+            raise NotFoundError("Category not found")
         
         # Delete all expenses in this category
+        TagService.remove_category(user_id, category_id)
         db_service.delete_many('expenses', {
             'category_id': ObjectId(category_id),
             'user_id': ObjectId(user_id)
         })
+        invalidation_bus.publish('expenses', user_id)
+        # The note index is only updated in place for single expenses
+        search_index.invalidate(user_id)
+        
+        # Stop recurring expenses that would recreate them, and drop budget state
+        for collection_name in ('recurring_expenses', 'budgets', 'budget_spend', 'expense_stats'):
+            db_service.delete_many(collection_name, {
+                'category_id': ObjectId(category_id),
+                'user_id': ObjectId(user_id)
+            })
         
         # Delete the category
         success = db_service.delete_one('categories', {
@@ -141,6 +165,7 @@ class CategoryService:
             'user_id': ObjectId(user_id)
         })
         
+        invalidation_bus.publish('categories', user_id)
         if not success:
             raise ValueError("Failed to delete category")
         
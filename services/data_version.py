@@ -0,0 +1,97 @@
+from hashlib import blake2b
+import logging
+import threading
+import time
+from pymongo.errors import PyMongoError
+from services.cache_invalidation import invalidation_bus
+from services.database import db_service
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class DataVersions:
+    """Per-user data version counters used to derive HTTP validators.
+
+    Versions are counters in MongoDB bumped by every write, so all replicas
+    issue the same ETag for the same data and validators survive restarts.
+    Each worker caches the counters it has read and drops them when the
+    invalidation bus reports a write made by another worker.
+    """
+
+    COLLECTION = 'data_versions'
+    ALL_USERS = '*'
+
+    def __init__(self):
+        self._versions = {}
+        self._forgotten = 0
+        self._lock = threading.Lock()
+
+    def bump(self, user_id):
+        """Record a write made by this worker (None invalidates every user)"""
+        key = str(user_id) if user_id is not None else self.ALL_USERS
+        try:
+            document = db_service.find_one_and_update(self.COLLECTION, {'_id': key},
+                                                      {'$inc': {'version': 1}}, upsert=True)
+        except PyMongoError as e:
+            logger.warning("Failed to bump data version for %s: %s", key, e)
+            self.forget(user_id)
+            return
+
+        with self._lock:
+            if user_id is None:
+                self._versions.clear()
+                self._forgotten += 1
+            self._versions[key] = document['version']
+
+    def forget(self, user_id):
+        """Drop cached versions after a write made elsewhere (None drops all)"""
+        with self._lock:
+            if user_id is None:
+                self._versions.clear()
+            else:
+                self._versions.pop(str(user_id), None)
+            self._forgotten += 1
+
+    def get(self, user_id):
+        """(everyone's version, user's version), or None if MongoDB can't be read"""
+        key = str(user_id)
+        with self._lock:
+            if key in self._versions and self.ALL_USERS in self._versions:
+                return self._versions[self.ALL_USERS], self._versions[key]
+            forgotten = self._forgotten
+
+        try:
+            documents = db_service.find_many(self.COLLECTION, {'_id': {'$in': [self.ALL_USERS, key]}})
+        except PyMongoError as e:
+            logger.warning("Failed to read data version for %s: %s", key, e)
+            return None
+        versions = {self.ALL_USERS: 0, key: 0}
+        versions.update((document['_id'], document['version']) for document in documents)
+
+        with self._lock:
+            # A write reported while reading may have made these stale
+            if forgotten == self._forgotten:
+                self._versions.update(versions)
+        return versions[self.ALL_USERS], versions[key]
+
+    def etag(self, user_id, resource):
+        """Strong ETag for a user's view of a resource, or None if the version is unknown"""
+        versions = self.get(user_id)
+        if versions is None:
+            return None
+        key = f"{versions[0]}:{user_id}:{versions[1]}:{resource}"
+        return blake2b(key.encode('utf-8'), digest_size=12).hexdigest()
+
+    @staticmethod
+    def time_bucket():
+        """Bucket for responses relative to the current time (e.g. past_week)"""
+        return int(time.time() // Config.ETAG_RELATIVE_WINDOW_SECONDS)
+
+# Global data version instance
+data_versions = DataVersions()
+invalidation_bus.subscribe('expenses', data_versions.bump, local_only=True)
+invalidation_bus.subscribe('categories', data_versions.bump, local_only=True)
+invalidation_bus.subscribe('notifications', data_versions.bump, local_only=True)
+invalidation_bus.subscribe('expenses', data_versions.forget, remote_only=True)
+invalidation_bus.subscribe('categories', data_versions.forget, remote_only=True)
+invalidation_bus.subscribe('notifications', data_versions.forget, remote_only=True)
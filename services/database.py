@@ -1,36 +1,144 @@
+from functools import wraps
+import inspect
+from time import perf_counter
+import threading
 from flask import current_app
-from flask_pymongo import PyMongo
+from pymongo import monitoring, ReturnDocument
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
 from bson.errors import InvalidId
+from utils.metrics import mongo_duration
+from services.query_log import slow_query_log
+from utils.profiling import record_mongo_call
+from utils.tracing import tracer
+
+def instrumented(operation):
+    """Time and trace a DatabaseService operation, log slow calls and feed request profiles"""
+    def decorator(method):
+        signature = inspect.signature(method)
+        
+        @wraps(method)
+        def wrapper(self, collection_name, *args, **kwargs):
+            start = perf_counter()
+            try:
+                with tracer.span(f"mongo.{operation}", kind='client',
+                                 **{'db.system': 'mongodb',
+                                    'db.operation': operation,
+                                    'db.collection': collection_name}):
+                    return method(self, collection_name, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                mongo_duration.observe((operation, collection_name), elapsed)
+                record_mongo_call(operation, collection_name, start, elapsed)
+                if slow_query_log.is_slow(elapsed):
+                    # Arguments are only bound on the slow path
+                    call = signature.bind(self, collection_name, *args, **kwargs).arguments
+                    slow_query_log.record(self.get_collection(collection_name), operation, elapsed,
+                                          query=call.get('query'),
+                                          sort=call.get('sort'),
+                                          limit=call.get('limit'))
+        return wrapper
+    return decorator
+
+# Batches remembered per rollup document: far more than can be in flight, so
+# a batch applied again after its derived-state claim expired is recognised
+APPLIED_BATCHES_KEPT = 100
+
+def once_per_batch(query, update, batch):
+    """Make an upserted rollup update skip documents that already took `batch` (None applies it as given)"""
+    if batch is None:
+        return query, update
+    return (dict(query, applied_batches={'$ne': batch}),
+            dict(update, **{'$push': {'applied_batches': {'$each': [batch], '$slice': -APPLIED_BATCHES_KEPT}}}))
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks how many pooled connections are checked out right now"""
+    
+    def __init__(self):
+        self.checked_out = 0
+        self._lock = threading.Lock()
+    
+    def _add(self, amount):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out + amount)
+    
+    def connection_checked_out(self, event):
+        self._add(1)
+    
+    def connection_checked_in(self, event):
+        self._add(-1)
+    
+    def pool_cleared(self, event):
+        with self._lock:
+            self.checked_out = 0
+    
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_created(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): pass
+    def connection_check_out_started(self, event): pass
+    def connection_check_out_failed(self, event): pass
 
 class DatabaseService:
     def __init__(self):
         self.mongo = None
+        self.pool_monitor = PoolMonitor()
+        self._app = None
+        self._lock = threading.Lock()
     
     def init_app(self, app):
-        self.mongo = PyMongo(app)
+        # The client and its monitor threads start on first use, not at app creation
+        self._app = app
+        self.mongo = None
+    
+    def _get_mongo(self):
+        mongo = self.mongo
+        if mongo is None:
+            with self._lock:
+                if self.mongo is None:
+                    from flask_pymongo import PyMongo
+                    self.mongo = PyMongo(self._app, event_listeners=[self.pool_monitor])
+                mongo = self.mongo
+        return mongo
+    
+    def pool_usage(self):
+        """Return (checked out connections, max pool size)"""
+        max_pool_size = self._get_mongo().cx.options.pool_options.max_pool_size
+        return self.pool_monitor.checked_out, max_pool_size
     
     def get_db(self):
-        return self.mongo.db
+        return self._get_mongo().db
     
     def get_collection(self, collection_name):
         return self.get_db()[collection_name]
     
+    @instrumented('insert_one')
     def insert_one(self, collection_name, document):
         """Insert a single document"""
         collection = self.get_collection(collection_name)
         result = collection.insert_one(document)
         return result.inserted_id
     
+    @instrumented('insert_many')
+    def insert_many(self, collection_name, documents, ordered=True):
+        """Insert multiple documents"""
+        collection = self.get_collection(collection_name)
+        result = collection.insert_many(documents, ordered=ordered)
+        return result.inserted_ids
+    
+    @instrumented('find_one')
     def find_one(self, collection_name, query):
         """Find a single document"""
         collection = self.get_collection(collection_name)
         return collection.find_one(query)
     
-    def find_many(self, collection_name, query=None, sort=None, limit=None):
+    @instrumented('find_many')
+    def find_many(self, collection_name, query=None, sort=None, limit=None, projection=None):
         """Find multiple documents"""
         collection = self.get_collection(collection_name)
-        cursor = collection.find(query or {})
+        cursor = collection.find(query or {}, projection)
         
         if sort:
             cursor = cursor.sort(sort)
@@ -39,24 +147,58 @@ class DatabaseService:
             
         return list(cursor)
     
+    @instrumented('update_one')
     def update_one(self, collection_name, query, update_data):
         """Update a single document"""
         collection = self.get_collection(collection_name)
         result = collection.update_one(query, {'$set': update_data})
         return result.modified_count > 0
     
+    @instrumented('find_one_and_update')
+    def find_one_and_update(self, collection_name, query, update, upsert=False, projection=None):
+        """Atomically update a single document with an update document or pipeline, returning the new version"""
+        collection = self.get_collection(collection_name)
+        return collection.find_one_and_update(query, update, projection=projection,
+                                              upsert=upsert, return_document=ReturnDocument.AFTER)
+    
+    @instrumented('bulk_write')
+    def bulk_write(self, collection_name, requests, ordered=False, skip_duplicates=False):
+        """Run a batch of write operations in one round trip.
+
+        skip_duplicates ignores duplicate key errors, such as a once_per_batch
+        upsert colliding with the document that already took its batch.
+        """
+        if not requests:
+            return None
+        collection = self.get_collection(collection_name)
+        try:
+            return collection.bulk_write(requests, ordered=ordered)
+        except BulkWriteError as e:
+            if not skip_duplicates or any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+            return None
+    
+    @instrumented('delete_one')
     def delete_one(self, collection_name, query):
         """Delete a single document"""
         collection = self.get_collection(collection_name)
         result = collection.delete_one(query)
         return result.deleted_count > 0
     
+    @instrumented('delete_many')
     def delete_many(self, collection_name, query):
         """Delete multiple documents"""
         collection = self.get_collection(collection_name)
         result = collection.delete_many(query)
         return result.deleted_count
     
+    @instrumented('aggregate')
+    def aggregate(self, collection_name, pipeline):
+        """Run an aggregation pipeline and return the results as a list"""
+        collection = self.get_collection(collection_name)
+        return list(collection.aggregate(pipeline))
+    
+    @instrumented('count_documents')
     def count_documents(self, collection_name, query=None):
         """Count documents matching query"""
         collection = self.get_collection(collection_name)
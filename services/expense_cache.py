@@ -0,0 +1,196 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+import threading
+from bson import ObjectId
+from services.database import db_service
+from services.cache_invalidation import invalidation_bus
+from services.fx_rates import fx_rates
+from services.user_service import UserService
+from utils.money import to_float
+from config import Config
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MS = timedelta(milliseconds=1)
+_MAX_CATEGORIES = 32767
+
+def to_millis(value):
+    """Convert a datetime to integer milliseconds since the epoch (BSON precision)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _ONE_MS
+
+def from_millis(value):
+    """Convert integer milliseconds since the epoch back to a naive UTC datetime"""
+    return _EPOCH + timedelta(milliseconds=value)
+
+class ExpenseColumns:
+    """A user's expenses as parallel arrays sorted by expense date, amounts in one currency"""
+
+    def __init__(self, dates, amounts, categories, category_ids, currency=None):
+        self.dates = dates
+        self.amounts = amounts
+        self.categories = categories
+        self.category_ids = category_ids
+        self.currency = currency
+
+    @property
+    def nbytes(self):
+        return (self.dates.itemsize * len(self.dates) +
+                self.amounts.itemsize * len(self.amounts) +
+                self.categories.itemsize * len(self.categories))
+
+    def _slice(self, start_date=None, end_date=None):
+        """Return the [lo, hi) row range covering the inclusive date window"""
+        lo = bisect_left(self.dates, to_millis(start_date)) if start_date else 0
+        hi = bisect_right(self.dates, to_millis(end_date)) if end_date else len(self.dates)
+        return lo, max(lo, hi)
+
+    def summary(self, start_date=None, end_date=None):
+        """Total amount, count and per-category breakdown for a date window"""
+        lo, hi = self._slice(start_date, end_date)
+        amounts_by_index = [0] * len(self.category_ids)
+        counts_by_index = [0] * len(self.category_ids)
+
+        amounts = self.amounts
+        categories = self.categories
+        for i in range(lo, hi):
+            index = categories[i]
+            amounts_by_index[index] += amounts[i]
+            counts_by_index[index] += 1
+
+        category_summary = {}
+        for index, count in enumerate(counts_by_index):
+            if count:
+                category_summary[self.category_ids[index]] = {
+                    'amount': round(amounts_by_index[index], 2),
+                    'count': count
+                }
+
+        summary = {
+            'total_amount': round(sum(amounts_by_index), 2),
+            'total_count': hi - lo,
+            'category_breakdown': category_summary
+        }
+        if self.currency is not None:
+            summary['currency'] = self.currency
+        return summary
+
+    def date_range(self, start_date=None, end_date=None):
+        """First and last expense dates inside a date window, or (None, None)"""
+        lo, hi = self._slice(start_date, end_date)
+        if lo == hi:
+            return None, None
+        return from_millis(self.dates[lo]), from_millis(self.dates[hi - 1])
+
+class ExpenseCache:
+    """Per-worker, memory-bounded LRU cache of ExpenseColumns keyed by user"""
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = Config.EXPENSE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._entries = OrderedDict()
+        self._building = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    def get_columns(self, user_id):
+        """Return the cached columns for a user, loading them from MongoDB on a miss"""
+        if self.max_bytes <= 0:
+            return None
+
+        user_id = str(user_id)
+        with self._lock:
+            columns = self._entries.get(user_id)
+            if columns is not None:
+                self._entries.move_to_end(user_id)
+                return columns
+            token = object()
+            self._building[user_id] = token
+
+        columns = self._load(user_id)
+
+        with self._lock:
+            # A write for this user during the load makes the result stale
+            if self._building.get(user_id) is not token:
+                return columns
+            del self._building[user_id]
+            if columns is None or columns.nbytes > self.max_bytes:
+                return columns
+            self._store(user_id, columns)
+
+        return columns
+
+    def invalidate(self, user_id):
+        """Drop a user's cached columns after a write (None drops every user)"""
+        if user_id is None:
+            self.clear()
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._building.pop(user_id, None)
+            columns = self._entries.pop(user_id, None)
+            if columns is not None:
+                self._nbytes -= columns.nbytes
+
+    def clear(self):
+        """Drop every cached user"""
+        with self._lock:
+            self._building.clear()
+            self._entries.clear()
+            self._nbytes = 0
+
+    def _store(self, user_id, columns):
+        self._entries[user_id] = columns
+        self._nbytes += columns.nbytes
+        while self._nbytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._nbytes -= evicted.nbytes
+
+    @staticmethod
+    def load(user_id, start_date=None):
+        """Build a user's columns from MongoDB, optionally from a date on, without caching them"""
+        return ExpenseCache._load(user_id, start_date)
+
+    @staticmethod
+    def _load(user_id, start_date=None):
+        query = {'user_id': ObjectId(user_id)}
+        if start_date:
+            query['expense_date'] = {'$gte': start_date}
+        expenses_data = db_service.find_many('expenses',
+                                           query,
+                                           sort=[('expense_date', 1)],
+                                           projection={'_id': 0, 'expense_date': 1,
+                                                       'amount': 1, 'currency': 1, 'category_id': 1})
+
+        dates = array('q')
+        amounts = array('d')
+        categories = array('h')
+        currencies = array('h')
+        category_index = {}
+        currency_index = {}
+
+        for exp_data in expenses_data:
+            cat_id = str(exp_data['category_id'])
+            index = category_index.get(cat_id)
+            if index is None:
+                if len(category_index) >= _MAX_CATEGORIES:
+                    return None
+                index = category_index[cat_id] = len(category_index)
+            currency = exp_data.get('currency')
+            if currency not in currency_index:
+                currency_index[currency] = len(currency_index)
+            dates.append(to_millis(exp_data['expense_date']))
+            amounts.append(to_float(exp_data['amount']))
+            categories.append(index)
+            currencies.append(currency_index[currency])
+
+        # Convert the whole column once; summaries then only sum cached home-currency amounts
+        home_currency = UserService.get_home_currency(user_id)
+        amounts = fx_rates.convert_columns(amounts, currencies, list(currency_index), dates, home_currency)
+
+        return ExpenseColumns(dates, amounts, categories, list(category_index), home_currency)
+
+# Global expense cache instance
+expense_cache = ExpenseCache()
+invalidation_bus.subscribe('expenses', expense_cache.invalidate)
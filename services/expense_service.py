@@ -1,39 +1,209 @@
 from bson import ObjectId
-from models.expense import Expense
+import logging
+from collections import defaultdict
+import uuid
+from pymongo import UpdateMany
+from pymongo.errors import BulkWriteError, PyMongoError
+from models.expense import Expense, normalize_tags
 from services.database import db_service
 from services.category_service import CategoryService
+from services.budget_service import BudgetService, month_of
+from services.tag_service import TagService
+from services.anomaly_service import AnomalyService
+from services.user_service import UserService
+from services.fx_rates import fx_rates
+from services.expense_cache import expense_cache
+from services.cache_invalidation import invalidation_bus
+from services.search_index import search_index, parse_query
+from utils.fieldsets import build_projection
+from utils.money import to_decimal128
+from utils.error_handlers import NotFoundError
+from utils.tracing import traced_service
 from datetime import datetime, timedelta
 import calendar
+from config import Config
 
+logger = logging.getLogger(__name__)
+
+# Derived state applied to bulk-inserted expenses; each stays listed in the
+# document's derived_pending until applied, so a failed run can be finished later
+DERIVED_STATE = ('budget', 'tags', 'anomaly')
+DERIVED_CLAIM_SECONDS = 300
+
+@traced_service
 class ExpenseService:
+    _search_backend = Config.SEARCH_BACKEND
+    _text_indexed = False
+    
     @staticmethod
-    def create_expense(amount, note, expense_date, category_id, user_id):
-        """Create a new expense"""
+    def create_expense(amount, note, expense_date, category_id, user_id, tags=None, currency=None):
+        """Create a new expense; currency defaults to the user's home currency.
+
+        Once the insert succeeds the create does not fail: a budget, tag or
+        anomaly update that raises is left pending for finish_derived().
+        """
         # Validate category belongs to user
         category = CategoryService.get_category_by_id(category_id, user_id)
         if not category:
             raise ValueError("Category not found or doesn't belong to user")
         
+        home_currency = UserService.get_home_currency(user_id)
+        currency = ExpenseService.validate_currency(currency or home_currency)
+        
         # Create expense
-        expense = Expense(amount, note, expense_date, category_id, user_id)
+        expense = Expense(amount, note, expense_date, category_id, user_id, tags=tags, currency=currency)
+        home_amount = ExpenseService._home_amount(expense, home_currency)
+        
+        # Compare with the category's history before this expense joins it
+        expense.is_anomaly = AnomalyService.is_anomaly(
+            AnomalyService.score(user_id, category_id, home_amount))
         
         expense_data = {
-            'amount': expense.amount,
+            'amount': to_decimal128(expense.amount),
+            'currency': expense.currency,
             'note': expense.note,
             'expense_date': expense.expense_date,
             'category_id': expense.category_id,
             'user_id': expense.user_id,
+            'tags': expense.tags,
+            'is_anomaly': expense.is_anomaly,
             'created_at': expense.created_at
         }
         
         expense_id = db_service.insert_one('expenses', expense_data)
         expense._id = expense_id
+        invalidation_bus.publish('expenses', user_id)
+        search_index.add(user_id, expense_id, expense.note, expense.expense_date)
+        
+        # The expense id is its own batch, so finishing a step that failed
+        # half way can't count it twice
+        batch = str(expense_id)
+        steps = [
+            ('budget', lambda: BudgetService.record_spend(user_id, expense.category_id, expense.expense_date,
+                                                          home_amount, batch=batch)),
+            ('tags', lambda: TagService.record(user_id, new_tags=expense.tags, new_amount=home_amount,
+                                               batch=batch)),
+            ('anomaly', lambda: AnomalyService.record(user_id, expense.category_id, home_amount, batch=batch))
+        ]
+        for index, (name, step) in enumerate(steps):
+            try:
+                step()
+            except Exception:
+                logger.exception("Updating %s for expense %s failed, leaving it to finish_derived()",
+                                 name, expense_id)
+                ExpenseService._leave_pending(expense_id, [name for name, _ in steps[index:]], batch)
+                break
         
         return expense
     
     @staticmethod
-    def get_user_expenses(user_id, category_id=None, start_date=None, end_date=None, limit=None):
-        """Get expenses for user with optional filtering"""
+    def create_expenses_bulk(documents):
+        """Insert prepared expense documents in one batch, skipping duplicate occurrence keys.
+
+        Budgets, tags and anomaly stats are applied after the insert; whatever
+        a failure leaves pending is picked up by finish_derived().
+        """
+        if not documents:
+            return 0
+        
+        claim = ExpenseService._new_claim()
+        for document in documents:
+            document['derived_pending'] = list(DERIVED_STATE)
+            document['derived_batch'] = claim['token']
+            document['derived_claim'] = claim
+        
+        try:
+            db_service.insert_many('expenses', documents, ordered=False)
+            inserted = documents
+        except BulkWriteError as e:
+            # Duplicates were already inserted by an earlier or concurrent run
+            if any(error['code'] != 11000 for error in e.details['writeErrors']):
+                raise
+            skipped = {error['index'] for error in e.details['writeErrors']}
+            inserted = [document for index, document in enumerate(documents) if index not in skipped]
+        finally:
+            for user_id in {document['user_id'] for document in documents}:
+                invalidation_bus.publish('expenses', user_id)
+        
+        # insert_many sets _id on the documents it was given
+        for document in inserted:
+            search_index.add(document['user_id'], document['_id'], document.get('note'), document['expense_date'])
+        ExpenseService._apply_derived(inserted, claim)
+        
+        return len(inserted)
+    
+    @staticmethod
+    def finish_derived():
+        """Apply derived state that bulk inserts left pending; returns the expenses finished.
+
+        A claim is held for DERIVED_CLAIM_SECONDS, so a run that is still
+        applying its own documents is not doubled up on. A run that outlives
+        its claim is harmless too: rollups remember the insert batches they
+        took, so a batch applied twice counts once.
+        """
+        claim = ExpenseService._new_claim()
+        expired = claim['at'] - timedelta(seconds=DERIVED_CLAIM_SECONDS)
+        db_service.bulk_write('expenses', [UpdateMany(
+            {'derived_pending.0': {'$exists': True}, 'derived_claim.at': {'$lt': expired}},
+            {'$set': {'derived_claim': claim}})])
+        documents = db_service.find_many('expenses', {'derived_claim.token': claim['token']})
+        ExpenseService._apply_derived(documents, claim)
+        return len(documents)
+    
+    @staticmethod
+    def _leave_pending(expense_id, names, batch):
+        """Hand derived updates of one expense to the next finish_derived()"""
+        claim = ExpenseService._new_claim()
+        claim['at'] -= timedelta(seconds=DERIVED_CLAIM_SECONDS)
+        try:
+            db_service.update_one('expenses', {'_id': expense_id},
+                                  {'derived_pending': names, 'derived_batch': batch, 'derived_claim': claim})
+        except PyMongoError:
+            logger.exception("Could not record pending updates for expense %s", expense_id)
+    
+    @staticmethod
+    def _new_claim():
+        return {'token': uuid.uuid4().hex, 'at': datetime.utcnow()}
+    
+    @staticmethod
+    def _apply_derived(documents, claim):
+        """Apply each pending derived update once per insert batch, marking it done on the documents as it lands"""
+        if not documents:
+            return
+        
+        ids = [document['_id'] for document in documents]
+        recorders = {'budget': BudgetService.record_spend_bulk,
+                     'tags': TagService.record_bulk,
+                     'anomaly': AnomalyService.record_bulk}
+        try:
+            for name in DERIVED_STATE:
+                pending = [document for document in documents if name in document.get('derived_pending', ())]
+                if not pending:
+                    continue
+                batches = defaultdict(list)
+                for document in pending:
+                    batches[document.get('derived_batch', str(document['_id']))].append(document)
+                for batch, batch_documents in batches.items():
+                    recorders[name](batch_documents, batch=batch)
+                db_service.bulk_write('expenses', [UpdateMany(
+                    {'_id': {'$in': [document['_id'] for document in pending]},
+                     'derived_claim.token': claim['token']},
+                    {'$pull': {'derived_pending': name}})])
+        except Exception:
+            # Let the next finish_derived() retry right away instead of after the claim expires
+            db_service.bulk_write('expenses', [UpdateMany(
+                {'_id': {'$in': ids}, 'derived_claim.token': claim['token']},
+                {'$set': {'derived_claim.at': claim['at'] - timedelta(seconds=DERIVED_CLAIM_SECONDS)}})])
+            raise
+        
+        db_service.bulk_write('expenses', [UpdateMany(
+            {'_id': {'$in': ids}, 'derived_pending': []},
+            {'$unset': {'derived_pending': '', 'derived_batch': '', 'derived_claim': ''}})])
+    
+    @staticmethod
+    def get_user_expenses(user_id, category_id=None, start_date=None, end_date=None, limit=None, fields=None,
+                          tags=None, tags_mode='all', is_anomaly=None):
+        """Get expenses for user with optional filtering; tags_mode 'all' or 'any' combines tags"""
         query = {'user_id': ObjectId(user_id)}
         
         if category_id:
@@ -49,10 +219,27 @@ class ExpenseService:
                 date_query['$lte'] = end_date
             query['expense_date'] = date_query
         
+        if tags:
+            if tags_mode not in ('all', 'any'):
+                raise ValueError("Invalid tags_mode. Must be one of: all, any")
+            if not TagService._indexed:
+                TagService.ensure_indexes()
+            query['tags'] = {'$all' if tags_mode == 'all' else '$in': normalize_tags(tags)}
+        
+        if is_anomaly is not None:
+            if not AnomalyService._indexed:
+                AnomalyService.ensure_indexes()
+            query['is_anomaly'] = True if is_anomaly else {'$ne': True}
+        
         expenses_data = db_service.find_many('expenses', 
                                            query,
                                            sort=[('expense_date', -1)],
-                                           limit=limit)
+                                           limit=limit,
+                                           projection=build_projection(fields))
+        
+        # Sparse fieldsets skip decoding fields the caller won't serialize
+        if fields is not None:
+            return [Expense.from_document(exp_data) for exp_data in expenses_data]
         
         expenses = []
         for exp_data in expenses_data:
@@ -62,7 +249,10 @@ class ExpenseService:
                 exp_data['expense_date'],
                 exp_data['category_id'],
                 exp_data['user_id'],
-                exp_data['_id']
+                exp_data['_id'],
+                exp_data.get('tags'),
+                exp_data.get('currency'),
+                exp_data.get('is_anomaly')
             )
             expenses.append(expense)
         
@@ -88,13 +278,17 @@ class ExpenseService:
             expense_data['expense_date'],
             expense_data['category_id'],
             expense_data['user_id'],
-            expense_data['_id']
+            expense_data['_id'],
+            expense_data.get('tags'),
+            expense_data.get('currency'),
+            expense_data.get('is_anomaly')
         )
         
         return expense
     
     @staticmethod
-    def update_expense(expense_id, user_id, amount=None, note=None, expense_date=None, category_id=None):
+    def update_expense(expense_id, user_id, amount=None, note=None, expense_date=None, category_id=None,
+                       tags=None, currency=None):
         """Update expense"""
         if not db_service.is_valid_object_id(expense_id):
             raise ValueError("Invalid expense ID")
@@ -102,14 +296,17 @@ class ExpenseService:
         # Get existing expense
         existing_expense = ExpenseService.get_expense_by_id(expense_id, user_id)
         if not existing_expense:
-            raise ValueError("Expense not found")
+            raise NotFoundError("Expense not found")
         
         update_data = {}
         
         if amount is not None:
             if amount <= 0:
                 raise ValueError("Amount must be greater than 0")
-            update_data['amount'] = float(amount)
+            update_data['amount'] = to_decimal128(amount)
+        
+        if currency is not None:
+            update_data['currency'] = ExpenseService.validate_currency(currency)
         
         if note is not None:
             if not note.strip():
@@ -126,15 +323,62 @@ class ExpenseService:
                 raise ValueError("Category not found or doesn't belong to user")
             update_data['category_id'] = ObjectId(category_id)
         
+        if tags is not None:
+            update_data['tags'] = normalize_tags(tags)
+        
+        # Re-check the flag against the category's history without this expense in it
+        if update_data.keys() & {'amount', 'currency', 'expense_date', 'category_id'}:
+            home_currency = UserService.get_home_currency(user_id)
+            candidate = Expense(update_data.get('amount', existing_expense.amount), existing_expense.note,
+                                update_data.get('expense_date', existing_expense.expense_date),
+                                update_data.get('category_id', existing_expense.category_id), user_id,
+                                currency=update_data.get('currency', existing_expense.currency))
+            candidate_amount = ExpenseService._home_amount(candidate, home_currency)
+            same_category = str(candidate.category_id) == str(existing_expense.category_id)
+            update_data['is_anomaly'] = AnomalyService.is_anomaly(AnomalyService.score(
+                user_id, candidate.category_id, candidate_amount,
+                without=ExpenseService._home_amount(existing_expense, home_currency) if same_category else None))
+        
         if update_data:
             success = db_service.update_one('expenses',
                                           {'_id': ObjectId(expense_id), 'user_id': ObjectId(user_id)},
                                           update_data)
+            invalidation_bus.publish('expenses', user_id)
             if not success:
                 raise ValueError("Failed to update expense")
         
         # Return updated expense
-        return ExpenseService.get_expense_by_id(expense_id, user_id)
+        updated_expense = ExpenseService.get_expense_by_id(expense_id, user_id)
+        
+        if updated_expense and update_data.keys() & {'note', 'expense_date'}:
+            search_index.add(user_id, expense_id, updated_expense.note, updated_expense.expense_date)
+        
+        if updated_expense and update_data.keys() & {'amount', 'currency', 'expense_date', 'category_id', 'tags'}:
+            home_currency = UserService.get_home_currency(user_id)
+            old_amount = ExpenseService._home_amount(existing_expense, home_currency)
+            new_amount = ExpenseService._home_amount(updated_expense, home_currency)
+        
+        # Move the amount between budget months/categories as needed
+        if updated_expense and update_data.keys() & {'amount', 'currency', 'expense_date', 'category_id'}:
+            if (existing_expense.category_id == updated_expense.category_id and
+                    month_of(existing_expense.expense_date) == month_of(updated_expense.expense_date)):
+                BudgetService.record_spend(user_id, updated_expense.category_id, updated_expense.expense_date,
+                                           new_amount - old_amount)
+            else:
+                BudgetService.record_spend(user_id, existing_expense.category_id, existing_expense.expense_date,
+                                           -old_amount)
+                BudgetService.record_spend(user_id, updated_expense.category_id, updated_expense.expense_date,
+                                           new_amount)
+        
+        if updated_expense and update_data.keys() & {'amount', 'currency', 'expense_date', 'tags'}:
+            TagService.record(user_id, existing_expense.tags, old_amount, updated_expense.tags, new_amount)
+        
+        # Only now that the update is stored does the sample move in the stats
+        if updated_expense and update_data.keys() & {'amount', 'currency', 'expense_date', 'category_id'}:
+            AnomalyService.record(user_id, existing_expense.category_id, old_amount, sign=-1)
+            AnomalyService.record(user_id, updated_expense.category_id, new_amount)
+        
+        return updated_expense
     
     @staticmethod
     def delete_expense(expense_id, user_id):
@@ -145,21 +389,104 @@ class ExpenseService:
         # Check if expense exists
         expense = ExpenseService.get_expense_by_id(expense_id, user_id)
         if not expense:
-            raise ValueError("Expense not found")
+            raise NotFoundError("Expense not found")
         
         success = db_service.delete_one('expenses', {
             '_id': ObjectId(expense_id),
             'user_id': ObjectId(user_id)
         })
         
+        invalidation_bus.publish('expenses', user_id)
         if not success:
             raise ValueError("Failed to delete expense")
         
+        search_index.remove(user_id, expense_id)
+        home_amount = ExpenseService._home_amount(expense, UserService.get_home_currency(user_id))
+        BudgetService.record_spend(user_id, expense.category_id, expense.expense_date, -home_amount)
+        TagService.record(user_id, old_tags=expense.tags, old_amount=home_amount)
+        AnomalyService.record(user_id, expense.category_id, home_amount, sign=-1)
+        
         return True
     
     @staticmethod
-    def get_expenses_by_filter(user_id, filter_type, start_date=None, end_date=None):
-        """Get expenses by predefined filters or custom date range"""
+    def search_expenses(user_id, query, start_date=None, end_date=None, limit=20):
+        """Search expense notes; every word must match and a trailing * matches a prefix.
+        
+        Returns [(expense, score)], best match first.
+        """
+        terms = parse_query(query or '')
+        if not terms:
+            raise ValueError("Search query must contain at least one word")
+        
+        # A text index can't match prefixes, so those queries always use the note index
+        prefixed = any(is_prefix for _, is_prefix in terms)
+        if ExpenseService._search_backend != 'memory' and not prefixed:
+            try:
+                return ExpenseService._search_text(user_id, terms, start_date, end_date, limit)
+            except PyMongoError:
+                if ExpenseService._search_backend == 'text':
+                    raise
+                logger.warning("MongoDB text search unavailable, using the in-process note index", exc_info=True)
+                ExpenseService._search_backend = 'memory'
+        
+        ranked = search_index.search(user_id, terms, start_date, end_date, limit)
+        if not ranked:
+            return []
+        
+        expenses_data = db_service.find_many('expenses', {
+            '_id': {'$in': [ObjectId(expense_id) for expense_id, _ in ranked]},
+            'user_id': ObjectId(user_id)
+        })
+        by_id = {str(exp_data['_id']): Expense.from_document(exp_data) for exp_data in expenses_data}
+        
+        return [(by_id[expense_id], score) for expense_id, score in ranked if expense_id in by_id]
+    
+    @staticmethod
+    def _search_text(user_id, terms, start_date, end_date, limit):
+        """Search through the MongoDB text index (whole words only)"""
+        if not ExpenseService._text_indexed:
+            db_service.get_collection('expenses').create_index(
+                [('user_id', 1), ('note', 'text')], name='user_note_text')
+            ExpenseService._text_indexed = True
+        
+        # Quoted words are ANDed by $text, bare words would be ORed
+        query = {
+            'user_id': ObjectId(user_id),
+            '$text': {'$search': ' '.join(f'"{term}"' for term, _ in terms)}
+        }
+        
+        if start_date or end_date:
+            date_query = {}
+            if start_date:
+                date_query['$gte'] = start_date
+            if end_date:
+                date_query['$lte'] = end_date
+            query['expense_date'] = date_query
+        
+        projection = {'score': {'$meta': 'textScore'}}
+        sort = [('score', {'$meta': 'textScore'}), ('expense_date', -1)]
+        
+        expenses_data = db_service.find_many('expenses', query, sort=sort, limit=limit, projection=projection)
+        
+        return [(Expense.from_document(exp_data), round(exp_data.get('score', 0.0), 4))
+                for exp_data in expenses_data]
+    
+    @staticmethod
+    def validate_currency(currency):
+        """Upper-cased currency code, if the FX rate table can convert it"""
+        currency = currency.upper()
+        if not fx_rates.supports(currency):
+            raise ValueError(f"Unsupported currency: {currency}")
+        return currency
+    
+    @staticmethod
+    def _home_amount(expense, home_currency):
+        """Expense amount in the user's home currency at the expense date's rate"""
+        return fx_rates.convert(expense.amount, expense.currency, home_currency, expense.expense_date)
+    
+    @staticmethod
+    def resolve_filter_window(filter_type, start_date=None, end_date=None):
+        """Resolve a predefined filter or custom date range to (start_date, end_date)"""
         now = datetime.utcnow()
         
         if filter_type == 'past_week':
@@ -180,27 +507,75 @@ class ExpenseService:
         else:
             raise ValueError("Invalid filter type. Must be one of: past_week, last_month, last_3_months, custom")
         
-        return ExpenseService.get_user_expenses(user_id, start_date=start_date, end_date=end_date)
+        return start_date, end_date
+    
+    @staticmethod
+    def get_expenses_by_filter(user_id, filter_type, start_date=None, end_date=None, fields=None,
+                               tags=None, tags_mode='all', is_anomaly=None):
+        """Get expenses by predefined filters or custom date range"""
+        start_date, end_date = ExpenseService.resolve_filter_window(filter_type, start_date, end_date)
+        
+        return ExpenseService.get_user_expenses(user_id, start_date=start_date, end_date=end_date,
+                                                fields=fields, tags=tags, tags_mode=tags_mode,
+                                                is_anomaly=is_anomaly)
+    
+    @staticmethod
+    def get_expense_date_range(user_id, start_date=None, end_date=None):
+        """Get the first and last expense dates inside a window, or (None, None)"""
+        columns = expense_cache.get_columns(user_id)
+        if columns is not None:
+            return columns.date_range(start_date, end_date)
+        
+        expenses = ExpenseService.get_user_expenses(user_id, start_date=start_date, end_date=end_date)
+        if not expenses:
+            return None, None
+        
+        return (min(expense.expense_date for expense in expenses),
+                max(expense.expense_date for expense in expenses))
     
     @staticmethod
     def get_expense_summary(user_id, start_date=None, end_date=None):
         """Get expense summary with total amount and count"""
+        columns = expense_cache.get_columns(user_id)
+        if columns is not None:
+            return columns.summary(start_date, end_date)
+        
         expenses = ExpenseService.get_user_expenses(user_id, start_date=start_date, end_date=end_date)
         
-        total_amount = sum(expense.amount for expense in expenses)
+        return ExpenseService.summarize_expenses(expenses, UserService.get_home_currency(user_id))
+    
+    @staticmethod
+    def summarize_expenses(expenses, home_currency=None):
+        """Total amount, count and per-category breakdown for a list of expenses.
+        
+        With a home currency, amounts are converted to it first.
+        """
+        if home_currency is None:
+            amounts = [expense.amount for expense in expenses]
+        else:
+            amounts = [round(fx_rates.factor(expense.currency, home_currency, expense.expense_date) * expense.amount, 2)
+                       for expense in expenses]
+        total_amount = sum(amounts)
         total_count = len(expenses)
         
         # Group by category
         category_summary = {}
-        for expense in expenses:
+        for expense, amount in zip(expenses, amounts):
             cat_id = str(expense.category_id)
             if cat_id not in category_summary:
                 category_summary[cat_id] = {'amount': 0, 'count': 0}
-            category_summary[cat_id]['amount'] += expense.amount
+            category_summary[cat_id]['amount'] += amount
             category_summary[cat_id]['count'] += 1
         
-        return {
+        summary = {
             'total_amount': total_amount,
             'total_count': total_count,
             'category_breakdown': category_summary
         }
+        if home_currency is not None:
+            # Converted cents summed as floats; round away the binary noise
+            summary['total_amount'] = round(total_amount, 2)
+            for entry in category_summary.values():
+                entry['amount'] = round(entry['amount'], 2)
+            summary['currency'] = home_currency
+        return summary
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import calendar
+import threading
+from services.expense_cache import ExpenseCache, expense_cache, from_millis, to_millis
+from services.cache_invalidation import invalidation_bus
+from services.budget_service import month_of
+from utils.tracing import traced_service
+from config import Config
+
+_MS_PER_DAY = 86400000
+
+def build_forecast(columns, now, history_days=None, smoothing=None):
+    """Project end-of-month spend per category from a user's expense columns.
+
+    Each category's daily totals over the history window are split into a
+    weekday profile (seasonal averages) and a level, tracked by simple
+    exponential smoothing over the deseasonalized series. Every remaining
+    day of the month is forecast as level * weekday factor.
+    """
+    history_days = Config.FORECAST_HISTORY_DAYS if history_days is None else history_days
+    smoothing = Config.FORECAST_SMOOTHING if smoothing is None else smoothing
+
+    today = to_millis(now) // _MS_PER_DAY
+    month_start = to_millis(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)) // _MS_PER_DAY
+    days_in_month = calendar.monthrange(now.year, now.month)[1]
+    dates, amounts, categories = columns.dates, columns.amounts, columns.categories
+    category_count = len(columns.category_ids)
+
+    # History is the complete days before today, starting no earlier than the first expense
+    first_day = today - history_days
+    if len(dates):
+        first_day = max(first_day, dates[0] // _MS_PER_DAY)
+    length = max(today - first_day, 0)
+
+    # One pass buckets rows into a flat [category][day] grid
+    series = array('d', bytes(8 * category_count * length))
+    month_to_date = [0.0] * category_count
+    lo = bisect_left(dates, min(first_day, month_start) * _MS_PER_DAY)
+    hi = bisect_right(dates, to_millis(now))
+    for i in range(lo, hi):
+        day = dates[i] // _MS_PER_DAY
+        index = categories[i]
+        if first_day <= day < today:
+            series[index * length + day - first_day] += amounts[i]
+        if day >= month_start:
+            month_to_date[index] += amounts[i]
+
+    remaining_days = [today + offset for offset in range(1, month_start + days_in_month - today)]
+    # 1970-01-01 was a Thursday; weekday() numbering has Monday as 0
+    weekday_of = lambda day: (day + 3) % 7
+
+    forecasts = {}
+    for index, category_id in enumerate(columns.category_ids):
+        daily = series[index * length:(index + 1) * length]
+        mean = sum(daily) / length if length else 0.0
+
+        weekday_totals = [0.0] * 7
+        weekday_counts = [0] * 7
+        for offset, value in enumerate(daily):
+            weekday = weekday_of(first_day + offset)
+            weekday_totals[weekday] += value
+            weekday_counts[weekday] += 1
+        season = [weekday_totals[weekday] / weekday_counts[weekday] / mean
+                  if mean and weekday_counts[weekday] else 1.0
+                  for weekday in range(7)]
+
+        level = mean
+        for offset, value in enumerate(daily):
+            factor = season[weekday_of(first_day + offset)]
+            if factor:
+                level += smoothing * (value / factor - level)
+
+        remaining = sum(level * season[weekday_of(day)] for day in remaining_days)
+        if not month_to_date[index] and not remaining:
+            continue
+        forecasts[category_id] = {
+            'month_to_date': round(month_to_date[index], 2),
+            'projected_remaining': round(remaining, 2),
+            'projected_total': round(month_to_date[index] + remaining, 2),
+            'daily_level': round(level, 2)
+        }
+
+    return {
+        'month': month_of(now),
+        'as_of': from_millis(today * _MS_PER_DAY).date().isoformat(),
+        'days_elapsed': today - month_start + 1,
+        'days_in_month': days_in_month,
+        'history_days': length,
+        'currency': columns.currency,
+        'month_to_date': round(sum(entry['month_to_date'] for entry in forecasts.values()), 2),
+        'projected_total': round(sum(entry['projected_total'] for entry in forecasts.values()), 2),
+        'category_forecasts': forecasts
+    }
+
+class ForecastCache:
+    """Per-worker LRU of each user's forecast for the current month, dropped on writes.
+
+    Entries are stamped with the day they were computed for, since the
+    remaining days of the month shrink as the month goes on.
+    """
+
+    def __init__(self, max_users=None):
+        self.max_users = Config.FORECAST_CACHE_MAX_USERS if max_users is None else max_users
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, day):
+        with self._lock:
+            entry = self._entries.get(str(user_id))
+            if entry is None or entry[0] != day:
+                return None
+            self._entries.move_to_end(str(user_id))
+            return entry[1]
+
+    def begin(self, user_id):
+        """Token to hand back to store(); a write in between makes the store a no-op"""
+        token = object()
+        with self._lock:
+            self._building[str(user_id)] = token
+        return token
+
+    def store(self, user_id, day, forecast, token):
+        user_id = str(user_id)
+        with self._lock:
+            if self._building.get(user_id) is not token or self.max_users <= 0:
+                return
+            del self._building[user_id]
+            self._entries[user_id] = (day, forecast)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Drop a user's forecast after a write (None drops every user)"""
+        with self._lock:
+            if user_id is None:
+                self._building.clear()
+                self._entries.clear()
+                return
+            self._building.pop(str(user_id), None)
+            self._entries.pop(str(user_id), None)
+
+@traced_service
+class ForecastService:
+    @staticmethod
+    def get_forecast(user_id, now=None):
+        """End-of-month spend forecast for the user, in their home currency"""
+        now = now or datetime.utcnow()
+        day = now.date()
+        forecast = forecast_cache.get(user_id, day)
+        if forecast is not None:
+            return forecast
+
+        token = forecast_cache.begin(user_id)
+        columns = expense_cache.get_columns(user_id)
+        if columns is None:
+            # Cache disabled or the user is too large for it: load only the window the model reads
+            start = min(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+                        datetime(day.year, day.month, day.day) - timedelta(days=Config.FORECAST_HISTORY_DAYS))
+            columns = ExpenseCache.load(user_id, start)
+        if columns is None:
+            raise ValueError("Too many categories to forecast")
+
+        forecast = build_forecast(columns, now)
+        forecast_cache.store(user_id, day, forecast, token)
+        return forecast
+
+# Global forecast cache instance
+forecast_cache = ForecastCache()
+invalidation_bus.subscribe('expenses', forecast_cache.invalidate)
+invalidation_bus.subscribe('categories', forecast_cache.invalidate)
@@ -0,0 +1,133 @@
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from decimal import Decimal
+import csv
+import logging
+import threading
+from utils.money import to_cents, to_decimal
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+_MS_PER_DAY = 86400000
+_NEVER = float('inf')
+
+def day_number(value):
+    """Days since the epoch for a datetime (converted to UTC if aware)"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).days
+
+class FxRateTable:
+    """Daily FX rates from a CSV rate file, held as per-currency sorted arrays.
+
+    Rates are units of the currency per one unit of the base currency. The
+    rate for a day is the latest one published on or before it; days before
+    the first published rate use the first. The file is read on first use.
+    """
+
+    def __init__(self, path=None, base=None):
+        self.path = Config.FX_RATES_FILE if path is None else path
+        self.base = (Config.FX_BASE_CURRENCY if base is None else base).upper()
+        self._series = None
+        self._lock = threading.Lock()
+
+    def _get_series(self):
+        series = self._series
+        if series is None:
+            with self._lock:
+                if self._series is None:
+                    self._series = self._load(self.path, self.base)
+                series = self._series
+        return series
+
+    def supports(self, currency):
+        """Whether amounts in this currency can be stored and converted (the base currency always can)"""
+        return currency in self._get_series()
+
+    def factor(self, source, target, date):
+        """Multiplier converting source amounts to target at a date"""
+        if source is None or source == target:
+            return 1.0
+        return self._window(self._get_series(), source, target, day_number(date))[0]
+
+    def convert(self, amount, source, target, date):
+        """Convert an amount to target at a date's rate, as a Decimal rounded to cents.
+
+        A source of None (expenses stored before currencies existed) means the
+        amount is already in the target currency.
+        """
+        if source is None or source == target:
+            return to_cents(amount)
+        return to_cents(to_decimal(amount) * Decimal(self.factor(source, target, date)))
+
+    def convert_columns(self, amounts, currencies, codes, dates, target):
+        """Convert a date-sorted amount column to target in one pass.
+
+        `currencies` holds indexes into `codes` and `dates` epoch milliseconds.
+        Each source currency keeps its current factor together with the day
+        range it is valid for, so rates are only looked up when a row crosses
+        a rate change instead of once per row.
+        """
+        converted = array('d', amounts)
+        if all(code is None or code == target for code in codes):
+            return converted
+
+        series = self._get_series()
+        factors = [1.0] * len(codes)
+        valid_from = [-_NEVER] * len(codes)
+        valid_until = [_NEVER if code is None or code == target else -_NEVER for code in codes]
+
+        for i in range(len(converted)):
+            index = currencies[i]
+            day = dates[i] // _MS_PER_DAY
+            if not valid_from[index] <= day < valid_until[index]:
+                factors[index], valid_from[index], valid_until[index] = \
+                    self._window(series, codes[index], target, day)
+            converted[i] = round(converted[i] * factors[index], 2)
+
+        return converted
+
+    @staticmethod
+    def _window(series, source, target, day):
+        """(factor, first day, day after last) for the rates in effect on a day"""
+        rates = []
+        start, end = -_NEVER, _NEVER
+        for currency in (source, target):
+            if currency not in series:
+                raise ValueError(f"No FX rates for {currency}")
+            days, values = series[currency]
+            i = bisect_right(days, day) - 1
+            if i >= 0:
+                start = max(start, days[i])
+            if i + 1 < len(days):
+                end = min(end, days[i + 1])
+            rates.append(values[max(i, 0)])
+        return rates[1] / rates[0], start, end
+
+    @staticmethod
+    def _load(path, base):
+        points = {}
+        try:
+            with open(path, newline='') as rate_file:
+                rows = csv.DictReader(line for line in rate_file
+                                      if line.strip() and not line.startswith('#'))
+                for row in rows:
+                    currency = row['currency'].strip().upper()
+                    day = day_number(datetime.strptime(row['date'].strip(), '%Y-%m-%d'))
+                    points.setdefault(currency, []).append((day, float(row['rate'])))
+        except FileNotFoundError:
+            logger.warning("FX rate file %s not found; only %s amounts are supported", path, base)
+
+        series = {}
+        for currency, currency_points in points.items():
+            currency_points.sort()
+            series[currency] = (array('q', (day for day, _ in currency_points)),
+                                array('d', (rate for _, rate in currency_points)))
+        series[base] = (array('q', [0]), array('d', [1.0]))
+        return series
+
+# Global FX rate table
+fx_rates = FxRateTable()
@@ -0,0 +1,88 @@
+import threading
+import time
+from services.database import db_service
+from utils.metrics import requests_in_flight
+from config import Config
+
+class HealthService:
+    """Readiness probe with a short result cache so polling adds no load"""
+    
+    def __init__(self):
+        self._cached = None
+        self._cached_at = 0.0
+        self._lock = threading.Lock()
+        self._ping_client = None
+    
+    def readiness(self):
+        """Return (ready, report), probing dependencies at most once per cache window"""
+        now = time.monotonic()
+        cached = self._cached
+        if cached is not None and now - self._cached_at < Config.READINESS_CACHE_SECONDS:
+            return cached
+        
+        # Only one probe runs at a time; concurrent callers reuse the last result
+        if not self._lock.acquire(blocking=cached is None):
+            return cached
+        try:
+            result = self._probe()
+            self._cached = result
+            self._cached_at = time.monotonic()
+            return result
+        finally:
+            self._lock.release()
+    
+    def _ping_admin(self):
+        """Admin database on a single-connection client whose timeouts bound
+        the ping, so an unreachable MongoDB fails the probe within
+        READINESS_MAX_PING_MS instead of the app client's 30s server selection"""
+        if self._ping_client is None:
+            from pymongo import MongoClient
+            timeout_ms = max(1, int(Config.READINESS_MAX_PING_MS))
+            self._ping_client = MongoClient(Config.MONGO_URI,
+                                            serverSelectionTimeoutMS=timeout_ms,
+                                            connectTimeoutMS=timeout_ms,
+                                            socketTimeoutMS=timeout_ms,
+                                            maxPoolSize=1)
+        return self._ping_client.admin
+    
+    def _probe(self):
+        checks = {}
+        ready = True
+        
+        # MongoDB round trip
+        start = time.perf_counter()
+        try:
+            self._ping_admin().command('ping')
+            ping_ms = (time.perf_counter() - start) * 1000
+            mongo_ok = ping_ms <= Config.READINESS_MAX_PING_MS
+            checks['mongodb'] = {'ok': mongo_ok, 'latency_ms': round(ping_ms, 2)}
+        except Exception as e:
+            mongo_ok = False
+            checks['mongodb'] = {'ok': False, 'error': str(e)}
+        ready = ready and mongo_ok
+        
+        # Connection pool saturation
+        checked_out, max_pool_size = db_service.pool_usage()
+        saturation = checked_out / max_pool_size if max_pool_size else 0.0
+        pool_ok = saturation < Config.READINESS_MAX_POOL_SATURATION
+        checks['mongo_pool'] = {
+            'ok': pool_ok,
+            'checked_out': checked_out,
+            'max_pool_size': max_pool_size,
+            'saturation': round(saturation, 3)
+        }
+        ready = ready and pool_ok
+        
+        # Requests queued on this worker (the probe itself counts as one)
+        in_flight = max(0, requests_in_flight.get() - 1)
+        queue_ok = in_flight <= Config.READINESS_MAX_IN_FLIGHT
+        checks['worker_queue'] = {'ok': queue_ok, 'in_flight': in_flight}
+        ready = ready and queue_ok
+        
+        return ready, {
+            'status': 'ready' if ready else 'not_ready',
+            'checks': checks
+        }
+
+# Global health service instance
+health_service = HealthService()
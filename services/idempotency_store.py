@@ -0,0 +1,160 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from services.database import db_service
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class IdempotencyStore:
+    """Stored responses for Idempotency-Key requests: TTL-indexed Mongo
+    collection shared by all workers, fronted by a per-worker LRU of
+    completed responses."""
+
+    COLLECTION = 'idempotency_keys'
+
+    def __init__(self, max_entries=None, ttl=None, lease_seconds=None):
+        self.max_entries = Config.IDEMPOTENCY_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = Config.IDEMPOTENCY_TTL_SECONDS if ttl is None else ttl
+        self.lease_seconds = Config.IDEMPOTENCY_LEASE_SECONDS if lease_seconds is None else lease_seconds
+        self._entries = OrderedDict()
+        self._held = set()
+        self._renewer = None
+        self._lock = threading.Lock()
+        self._indexed = False
+
+    def claim(self, user_id, key, fingerprint, lease):
+        """Reserve a key for this request under `lease`.
+
+        Returns None when the caller owns the key and should run the request,
+        otherwise the existing record (completed or still processing). Claims
+        are renewed while their request runs (see hold()), so a processing
+        claim older than the lease period was left by a worker that died
+        mid-request, and a retry with the same body takes it over.
+        """
+        record = self._cached(user_id, key)
+        if record is not None:
+            return record
+
+        self._ensure_indexes()
+        now = datetime.utcnow()
+        try:
+            db_service.insert_one(self.COLLECTION, {
+                'user_id': user_id,
+                'key': key,
+                'fingerprint': fingerprint,
+                'state': 'processing',
+                'lease': lease,
+                'claimed_at': now,
+                'created_at': now
+            })
+            return None
+        except DuplicateKeyError:
+            record = db_service.find_one(self.COLLECTION, {'user_id': user_id, 'key': key})
+            if record is None:
+                # Expired or released between the insert and the read
+                return self.claim(user_id, key, fingerprint, lease)
+            if record['state'] == 'completed':
+                self._remember(record)
+                return record
+            claimed_at = record.get('claimed_at', record['created_at'])
+            if record['fingerprint'] == fingerprint and claimed_at <= now - timedelta(seconds=self.lease_seconds):
+                taken = db_service.find_one_and_update(
+                    self.COLLECTION,
+                    {'_id': record['_id'], 'state': 'processing', 'lease': record.get('lease')},
+                    {'$set': {'lease': lease, 'claimed_at': now}})
+                if taken is not None:
+                    return None
+                # Completed, released or taken over by another retry meanwhile
+                return self.claim(user_id, key, fingerprint, lease)
+            return record
+
+    def complete(self, user_id, key, fingerprint, lease, status, body, mimetype):
+        """Store the response for a key claimed under `lease`; False if the claim was lost"""
+        update = {
+            'state': 'completed',
+            'status': status,
+            'body': body,
+            'mimetype': mimetype
+        }
+        if not db_service.update_one(self.COLLECTION, {'user_id': user_id, 'key': key, 'state': 'processing',
+                                                       'lease': lease}, update):
+            return False
+        self._remember(dict(update, user_id=user_id, key=key, fingerprint=fingerprint,
+                            created_at=datetime.utcnow()))
+        return True
+
+    def release(self, user_id, key, lease):
+        """Forget a key claimed under `lease` so the client can retry after a server error"""
+        db_service.delete_one(self.COLLECTION, {'user_id': user_id, 'key': key, 'state': 'processing',
+                                                'lease': lease})
+
+    def hold(self, user_id, key, lease):
+        """Keep renewing a claim until unhold(), so a long request isn't taken over by its retry"""
+        with self._lock:
+            self._held.add((user_id, key, lease))
+            if self._renewer is None or not self._renewer.is_alive():
+                self._renewer = threading.Thread(target=self._renew_held, name='idempotency-leases',
+                                                 daemon=True)
+                self._renewer.start()
+
+    def unhold(self, user_id, key, lease):
+        with self._lock:
+            self._held.discard((user_id, key, lease))
+
+    def _renew_held(self):
+        # One bulk write per interval renews every claim this worker is running
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._lock:
+                held = list(self._held)
+            if not held:
+                continue
+            now = datetime.utcnow()
+            try:
+                db_service.bulk_write(self.COLLECTION, [
+                    UpdateOne({'user_id': user_id, 'key': key, 'state': 'processing', 'lease': lease},
+                              {'$set': {'claimed_at': now}})
+                    for user_id, key, lease in held
+                ])
+            except PyMongoError as e:
+                logger.warning("Failed to renew idempotency claims: %s", e)
+
+    def _cached(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            record, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+            return record
+
+    def _remember(self, record):
+        if self.max_entries <= 0:
+            return
+        # Expire alongside the Mongo TTL so the LRU never outlives the stored key
+        age = (datetime.utcnow() - record['created_at']).total_seconds()
+        expires_at = time.monotonic() + max(0, self.ttl - age)
+        with self._lock:
+            self._entries[(record['user_id'], record['key'])] = (record, expires_at)
+            self._entries.move_to_end((record['user_id'], record['key']))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _ensure_indexes(self):
+        if self._indexed:
+            return
+        collection = db_service.get_collection(self.COLLECTION)
+        collection.create_index([('user_id', 1), ('key', 1)], unique=True)
+        collection.create_index('created_at', expireAfterSeconds=self.ttl)
+        self._indexed = True
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore()
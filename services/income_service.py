@@ -0,0 +1,90 @@
+from bson import ObjectId
+from datetime import datetime, timedelta
+from models.income import Income
+from services.database import db_service
+from services.category_service import CategoryService
+from services.expense_service import ExpenseService
+from services.user_service import UserService
+from services.budget_service import month_of, month_bounds
+from utils.money import to_decimal128
+from utils.tracing import traced_service
+
+@traced_service
+class IncomeService:
+    COLLECTION = 'income'
+
+    _indexed = False
+
+    @staticmethod
+    def set_income(user_id, amount, now=None):
+        """Set the user's income for the current month, in their home currency"""
+        if not IncomeService._indexed:
+            IncomeService.ensure_indexes()
+
+        month = month_of(now or datetime.utcnow())
+        income_data = db_service.find_one_and_update(IncomeService.COLLECTION,
+                                                     {'user_id': ObjectId(user_id), 'month': month},
+                                                     {'$set': {'amount': to_decimal128(amount),
+                                                               'currency': UserService.get_home_currency(user_id),
+                                                               'updated_at': datetime.utcnow()}},
+                                                     upsert=True)
+        return Income.from_document(income_data)
+
+    @staticmethod
+    def get_income(user_id, now=None):
+        """Get the user's income for the current month (an amount of 0 if none was set)"""
+        month = month_of(now or datetime.utcnow())
+        income_data = db_service.find_one(IncomeService.COLLECTION, {
+            'user_id': ObjectId(user_id),
+            'month': month
+        })
+        if not income_data:
+            return Income(user_id, month, 0, UserService.get_home_currency(user_id))
+        return Income.from_document(income_data)
+
+    @staticmethod
+    def get_savings(user_id, now=None):
+        """This month's income minus spend, with a per-category breakdown"""
+        now = now or datetime.utcnow()
+        income = IncomeService.get_income(user_id, now)
+        start, end = month_bounds(income.month)
+
+        # Both summaries come from the expense column cache when the user fits in it
+        monthly = ExpenseService.get_expense_summary(user_id, start, end - timedelta(milliseconds=1))
+        overall = ExpenseService.get_expense_summary(user_id)
+
+        categories = {}
+        for category in CategoryService.get_user_categories(user_id):
+            category_id = str(category._id)
+            all_time = overall['category_breakdown'].get(category_id, {'amount': 0, 'count': 0})
+            this_month = monthly['category_breakdown'].get(category_id, {'amount': 0, 'count': 0})
+            categories[category_id] = {
+                'category_name': category.title,
+                'total_amount': all_time['amount'],
+                'expense_count': all_time['count'],
+                'monthly_amount': this_month['amount'],
+                'monthly_count': this_month['count']
+            }
+
+        total_expenses = monthly['total_amount']
+        savings = round(income.amount - total_expenses, 2)
+        return {
+            'monthly_summary': {
+                'month': income.month,
+                'currency': income.currency,
+                'income': income.amount,
+                'total_expenses': total_expenses,
+                'savings': savings,
+                'savings_percentage': round(savings / income.amount * 100, 2) if income.amount > 0 else 0
+            },
+            'expense_breakdown': {
+                'total_count': monthly['total_count'],
+                'categories': categories
+            }
+        }
+
+    @staticmethod
+    def ensure_indexes():
+        db_service.get_collection(IncomeService.COLLECTION).create_index(
+            [('user_id', 1), ('month', 1)], unique=True)
+        IncomeService._indexed = True
@@ -0,0 +1,57 @@
+from bson import ObjectId
+from services.database import db_service
+from services.cache_invalidation import invalidation_bus
+from utils.tracing import traced_service
+from datetime import datetime
+
+@traced_service
+class NotificationService:
+    COLLECTION = 'notifications'
+    COUNTERS = 'notification_counters'
+    _indexed = False
+
+    @staticmethod
+    def notify(user_id, notification_type, data):
+        """Append a notification to the user's feed with the next feed sequence number"""
+        if not NotificationService._indexed:
+            NotificationService.ensure_indexes()
+
+        # A per-user counter makes the since-cursor strictly increasing across workers
+        counter = db_service.find_one_and_update(NotificationService.COUNTERS,
+                                                 {'_id': ObjectId(user_id)},
+                                                 {'$inc': {'seq': 1}},
+                                                 upsert=True)
+
+        notification = {
+            'user_id': ObjectId(user_id),
+            'seq': counter['seq'],
+            'type': notification_type,
+            'data': data,
+            'created_at': datetime.utcnow()
+        }
+        notification['_id'] = db_service.insert_one(NotificationService.COLLECTION, notification)
+        invalidation_bus.publish('notifications', user_id)
+
+        return notification
+
+    @staticmethod
+    def get_notifications(user_id, since=0, limit=100):
+        """Get notifications newer than the `since` cursor, oldest first"""
+        notifications = db_service.find_many(NotificationService.COLLECTION,
+                                             {'user_id': ObjectId(user_id), 'seq': {'$gt': since}},
+                                             sort=[('seq', 1)],
+                                             limit=limit)
+
+        return [{
+            'id': str(notification['_id']),
+            'cursor': notification['seq'],
+            'type': notification['type'],
+            'data': notification['data'],
+            'created_at': notification['created_at'].isoformat()
+        } for notification in notifications]
+
+    @staticmethod
+    def ensure_indexes():
+        db_service.get_collection(NotificationService.COLLECTION).create_index(
+            [('user_id', 1), ('seq', 1)], unique=True)
+        NotificationService._indexed = True
@@ -0,0 +1,107 @@
+from datetime import datetime
+import json
+import logging
+import threading
+import time
+from config import Config
+
+logger = logging.getLogger('expense_tracker.slow_query')
+
+def query_shape(value):
+    """Replace literal values in a query with '?' so similar queries group together"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or take lists of sub-queries; everything else is a literal list
+        if value and all(isinstance(item, dict) for item in value):
+            return [query_shape(item) for item in value]
+        return '?'
+    return '?'
+
+def _find_stage(plan, stages):
+    """Walk a winning plan depth-first collecting stage names and index names"""
+    if not isinstance(plan, dict):
+        return
+    stage = plan.get('stage')
+    if stage:
+        stages.append(f"{stage}({plan['indexName']})" if plan.get('indexName') else stage)
+    for key in ('inputStage', 'queryPlan'):
+        _find_stage(plan.get(key), stages)
+    for child in plan.get('inputStages', ()):
+        _find_stage(child, stages)
+
+def summarize_explain(explain):
+    """Reduce explain() output to the index used and docs examined vs returned"""
+    planner = explain.get('queryPlanner', {})
+    winning_plan = planner.get('winningPlan', {})
+    stats = explain.get('executionStats', {})
+
+    stages = []
+    _find_stage(winning_plan, stages)
+
+    return {
+        'plan': ' <- '.join(stages),
+        'collscan': any(stage.startswith('COLLSCAN') for stage in stages),
+        'keys_examined': stats.get('totalKeysExamined'),
+        'docs_examined': stats.get('totalDocsExamined'),
+        'returned': stats.get('nReturned'),
+        'execution_ms': stats.get('executionTimeMillis')
+    }
+
+class SlowQueryLog:
+    """Logs DatabaseService calls slower than Config.SLOW_QUERY_MS as JSON lines"""
+
+    EXPLAINABLE = ('find_one', 'find_many', 'count_documents')
+
+    def __init__(self):
+        self.threshold = Config.SLOW_QUERY_MS / 1000.0
+        self.explain_enabled = Config.SLOW_QUERY_EXPLAIN
+        self.explain_interval = Config.SLOW_QUERY_EXPLAIN_INTERVAL
+        self._explained_at = {}
+        self._lock = threading.Lock()
+
+    def is_slow(self, elapsed):
+        return self.threshold >= 0 and elapsed >= self.threshold
+
+    def record(self, collection, operation, elapsed, query=None, sort=None, limit=None):
+        """Log one slow call, with an explain() summary when enabled"""
+        shape = query_shape(query) if query is not None else None
+        entry = {
+            'ts': datetime.utcnow().isoformat() + 'Z',
+            'event': 'slow_query',
+            'collection': collection.name,
+            'operation': operation,
+            'duration_ms': round(elapsed * 1000, 3),
+            'shape': shape,
+            'sort': [list(item) for item in sort] if sort else None,
+            'limit': limit
+        }
+
+        if self.explain_enabled and operation in self.EXPLAINABLE and self._should_explain(collection.name, operation, shape, sort):
+            try:
+                cursor = collection.find(query or {})
+                if sort:
+                    cursor = cursor.sort(sort)
+                if limit:
+                    cursor = cursor.limit(limit)
+                entry['explain'] = summarize_explain(cursor.explain())
+            except Exception as e:
+                entry['explain_error'] = str(e)
+
+        logger.warning(json.dumps(entry, default=str, sort_keys=True))
+
+    def _should_explain(self, collection_name, operation, shape, sort):
+        # Explain re-runs the query, so each shape is explained at most once per interval
+        key = json.dumps([collection_name, operation, shape, sort], default=str, sort_keys=True)
+        now = time.monotonic()
+        with self._lock:
+            last = self._explained_at.get(key)
+            if last is not None and now - last < self.explain_interval:
+                return False
+            if len(self._explained_at) > 1000:
+                self._explained_at.clear()
+            self._explained_at[key] = now
+        return True
+
+# Global slow query log instance
+slow_query_log = SlowQueryLog()
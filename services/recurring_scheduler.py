@@ -0,0 +1,53 @@
+import logging
+import threading
+from config import Config
+
+logger = logging.getLogger('expense_tracker.recurring')
+
+class RecurringScheduler:
+    """Background thread materializing due recurring expenses.
+
+    Runs once at start so occurrences missed while the API was down are
+    caught up, then every RECURRING_POLL_SECONDS.
+    """
+
+    def __init__(self):
+        self.enabled = Config.RECURRING_SCHEDULER_ENABLED
+        self.poll_interval = Config.RECURRING_POLL_SECONDS
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Start the scheduler in a daemon thread (no-op when disabled or running)"""
+        if not self.enabled or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='recurring-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        from services.recurring_service import RecurringExpenseService
+        rules, created = RecurringExpenseService.materialize_due()
+        if created:
+            logger.info("Materialized %d recurring expenses from %d rules", created, rules)
+        return rules, created
+
+    def _run(self):
+        indexed = False
+        while not self._stop.is_set():
+            try:
+                if not indexed:
+                    from services.recurring_service import RecurringExpenseService
+                    RecurringExpenseService.ensure_indexes()
+                    indexed = True
+                self.run_once()
+            except Exception:
+                # Keep the thread alive; the next pass retries from the rules' next_run_at
+                logger.exception("Recurring expense scheduler error")
+            self._stop.wait(self.poll_interval)
+
+# Global recurring scheduler instance
+recurring_scheduler = RecurringScheduler()
@@ -0,0 +1,224 @@
+from bson import ObjectId
+import logging
+from pymongo import UpdateOne
+from models.recurring_expense import RecurringExpense
+from services.database import db_service
+from services.category_service import CategoryService
+from services.expense_service import ExpenseService
+from services.user_service import UserService
+from utils.money import to_decimal128
+from utils.tracing import traced_service
+from config import Config
+from datetime import datetime
+
+logger = logging.getLogger('expense_tracker.recurring')
+
+@traced_service
+class RecurringExpenseService:
+    COLLECTION = 'recurring_expenses'
+
+    @staticmethod
+    def create_rule(user_id, amount, note, category_id, rrule, start_date, end_date=None, currency=None):
+        """Create a recurring expense rule; currency defaults to the user's home currency"""
+        # Validate category belongs to user
+        category = CategoryService.get_category_by_id(category_id, user_id)
+        if not category:
+            raise ValueError("Category not found or doesn't belong to user")
+
+        currency = ExpenseService.validate_currency(currency or UserService.get_home_currency(user_id))
+        rule = RecurringExpense(amount, note.strip(), category_id, user_id, rrule, start_date, end_date,
+                                currency=currency)
+        rule.next_run_at = rule.first_run_at()
+        rule.active = rule.next_run_at is not None
+
+        rule_data = {
+            'amount': to_decimal128(rule.amount),
+            'currency': rule.currency,
+            'note': rule.note,
+            'category_id': rule.category_id,
+            'user_id': rule.user_id,
+            'rrule': rule.rrule,
+            'start_date': rule.start_date,
+            'end_date': rule.end_date,
+            'next_run_at': rule.next_run_at,
+            'active': rule.active,
+            'created_at': rule.created_at
+        }
+
+        rule._id = db_service.insert_one(RecurringExpenseService.COLLECTION, rule_data)
+
+        return rule
+
+    @staticmethod
+    def get_user_rules(user_id):
+        """Get all recurring expense rules for a user"""
+        rules_data = db_service.find_many(RecurringExpenseService.COLLECTION,
+                                          {'user_id': ObjectId(user_id)},
+                                          sort=[('created_at', -1)])
+
+        return [RecurringExpense.from_document(rule_data) for rule_data in rules_data]
+
+    @staticmethod
+    def get_rule_by_id(rule_id, user_id):
+        """Get a recurring expense rule by ID for a specific user"""
+        if not db_service.is_valid_object_id(rule_id):
+            return None
+
+        rule_data = db_service.find_one(RecurringExpenseService.COLLECTION, {
+            '_id': ObjectId(rule_id),
+            'user_id': ObjectId(user_id)
+        })
+
+        return RecurringExpense.from_document(rule_data) if rule_data else None
+
+    @staticmethod
+    def update_rule(rule_id, user_id, amount=None, note=None, category_id=None, active=None):
+        """Update a rule's template or pause/resume it"""
+        rule = RecurringExpenseService.get_rule_by_id(rule_id, user_id)
+        if not rule:
+            raise ValueError("Recurring expense not found")
+
+        update_data = {}
+
+        if amount is not None:
+            update_data['amount'] = to_decimal128(amount)
+
+        if note is not None:
+            if not note.strip():
+                raise ValueError("Note cannot be empty")
+            update_data['note'] = note.strip()
+
+        if category_id is not None:
+            category = CategoryService.get_category_by_id(category_id, user_id)
+            if not category:
+                raise ValueError("Category not found or doesn't belong to user")
+            update_data['category_id'] = ObjectId(category_id)
+
+        if active is not None and active != rule.active:
+            if active:
+                # Resuming skips the paused period instead of backfilling it
+                next_run_at = rule.occurrences().after(datetime.utcnow(), inc=True)
+                if next_run_at is None or (rule.end_date and next_run_at > rule.end_date):
+                    raise ValueError("Recurring expense has no future occurrences")
+                update_data['next_run_at'] = next_run_at
+                update_data['last_error'] = None
+            update_data['active'] = active
+
+        if update_data:
+            db_service.update_one(RecurringExpenseService.COLLECTION,
+                                  {'_id': rule._id, 'user_id': rule.user_id},
+                                  update_data)
+
+        return RecurringExpenseService.get_rule_by_id(rule_id, user_id)
+
+    @staticmethod
+    def delete_rule(rule_id, user_id):
+        """Delete a rule; expenses it already created are kept"""
+        if not db_service.is_valid_object_id(rule_id):
+            raise ValueError("Invalid recurring expense ID")
+
+        success = db_service.delete_one(RecurringExpenseService.COLLECTION, {
+            '_id': ObjectId(rule_id),
+            'user_id': ObjectId(user_id)
+        })
+
+        if not success:
+            raise ValueError("Recurring expense not found")
+
+        return True
+
+    @staticmethod
+    def ensure_indexes():
+        """Due-time index for the scheduler, the per-occurrence uniqueness key
+        and the sweep for derived state left pending"""
+        rules = db_service.get_collection(RecurringExpenseService.COLLECTION)
+        rules.create_index([('active', 1), ('next_run_at', 1)])
+        rules.create_index('user_id')
+        db_service.get_collection('expenses').create_index(
+            'occurrence_key', unique=True,
+            partialFilterExpression={'occurrence_key': {'$exists': True}})
+        db_service.get_collection('expenses').create_index(
+            'derived_claim.at',
+            partialFilterExpression={'derived_pending': {'$exists': True}})
+
+    @staticmethod
+    def materialize_due(now=None, batch_size=None):
+        """Create expenses for every occurrence due by `now` across all users.
+
+        Returns (rules processed, expenses created). Safe to run concurrently
+        or repeatedly: each occurrence has a unique key, so one that was
+        already materialized is skipped.
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or Config.RECURRING_BATCH_SIZE
+        max_per_rule = Config.RECURRING_MAX_OCCURRENCES_PER_PASS
+        rules_processed = 0
+        expenses_created = 0
+
+        # Derived state an earlier pass failed to apply after its insert
+        ExpenseService.finish_derived()
+
+        while True:
+            rules_data = db_service.find_many(RecurringExpenseService.COLLECTION,
+                                              {'active': True, 'next_run_at': {'$lte': now}},
+                                              sort=[('next_run_at', 1)],
+                                              limit=batch_size)
+            if not rules_data:
+                break
+
+            documents = []
+            updates = []
+            for rule_data in rules_data:
+                try:
+                    rule_documents, update_data = RecurringExpenseService._due_occurrences(
+                        rule_data, now, max_per_rule)
+                except Exception as e:
+                    # One broken rule must not stall every rule queued behind it
+                    logger.exception("Deactivating recurring rule %s", rule_data.get('_id'))
+                    rule_documents, update_data = [], {'active': False, 'last_error': str(e), 'last_run_at': now}
+                documents.extend(rule_documents)
+                # Matching on next_run_at keeps a concurrent scheduler from moving it backwards
+                updates.append(UpdateOne({'_id': rule_data['_id'], 'next_run_at': rule_data.get('next_run_at')},
+                                         {'$set': update_data}))
+
+            # Expenses first: if we stop before advancing the rules, the rerun dedupes
+            expenses_created += ExpenseService.create_expenses_bulk(documents)
+            db_service.bulk_write(RecurringExpenseService.COLLECTION, updates)
+            rules_processed += len(rules_data)
+
+            if len(rules_data) < batch_size:
+                break
+
+        return rules_processed, expenses_created
+
+    @staticmethod
+    def _due_occurrences(rule_data, now, max_per_rule):
+        """Expense documents for a rule's occurrences due by `now`, and the rule's update"""
+        rule = RecurringExpense.from_document(rule_data)
+        occurrences = rule.occurrences()
+        occurrence = rule.next_run_at
+        documents = []
+
+        # Catch up on everything missed, a bounded chunk per rule per batch
+        while (occurrence is not None and occurrence <= now and len(documents) < max_per_rule
+               and not (rule.end_date and occurrence > rule.end_date)):
+            documents.append({
+                'amount': to_decimal128(rule.amount),
+                'currency': rule.currency,
+                'note': rule.note,
+                'expense_date': occurrence,
+                'category_id': rule.category_id,
+                'user_id': rule.user_id,
+                'recurring_id': rule._id,
+                'occurrence_key': f"{rule._id}:{occurrence.isoformat()}",
+                'created_at': now
+            })
+            occurrence = occurrences.after(occurrence)
+
+        if occurrence is not None and rule.end_date and occurrence > rule.end_date:
+            occurrence = None
+
+        update_data = {'next_run_at': occurrence, 'last_run_at': now}
+        if occurrence is None:
+            update_data['active'] = False
+        return documents, update_data
@@ -0,0 +1,247 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+import heapq
+import math
+import re
+import threading
+from bson import ObjectId
+from services.database import db_service
+from services.cache_invalidation import invalidation_bus
+from services.expense_cache import to_millis
+from config import Config
+
+TOKEN = re.compile(r'\w+')
+
+# A prefix expands to at most this many vocabulary terms
+MAX_PREFIX_EXPANSIONS = 64
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+def tokenize(text):
+    return TOKEN.findall(text.lower()) if text else []
+
+def parse_query(query):
+    """Split a query into (term, is_prefix) pairs; a trailing * marks a prefix term"""
+    terms = []
+    for raw in query.split():
+        is_prefix = raw.endswith('*')
+        for token in tokenize(raw):
+            terms.append((token, False))
+        if is_prefix and terms:
+            terms[-1] = (terms[-1][0], True)
+    return terms
+
+class NoteIndex:
+    """Inverted index over one user's expense notes.
+
+    Documents are append-only slots; deletes and updates tombstone the old
+    slot, and the index compacts itself once a quarter of the slots are dead.
+    Postings are array('i') of slot numbers, one entry per occurrence.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = []
+        self.dates = array('q')
+        self.lengths = array('H')
+        self.alive = bytearray()
+        self.tokens = []
+        self.slots = {}
+        self.postings = {}
+        self.vocabulary = []
+        self.total_length = 0
+        self.dead = 0
+
+    @property
+    def size(self):
+        return len(self.ids) - self.dead
+
+    def add(self, expense_id, note, expense_date):
+        expense_id = str(expense_id)
+        if expense_id in self.slots:
+            self.remove(expense_id)
+        self._append(expense_id, tokenize(note), to_millis(expense_date))
+
+    def remove(self, expense_id):
+        slot = self.slots.pop(str(expense_id), None)
+        if slot is None:
+            return
+        self.alive[slot] = 0
+        self.total_length -= self.lengths[slot]
+        self.dead += 1
+        if self.dead > 64 and self.dead * 4 > len(self.ids):
+            self._compact()
+
+    def _compact(self):
+        live = [(self.ids[slot], self.tokens[slot], self.dates[slot])
+                for slot in range(len(self.ids)) if self.alive[slot]]
+        lock = self.lock
+        self.__init__()
+        self.lock = lock
+        for expense_id, tokens, date in live:
+            self._append(expense_id, tokens, date)
+
+    def _append(self, expense_id, tokens, date_millis):
+        slot = len(self.ids)
+        self.ids.append(expense_id)
+        self.dates.append(date_millis)
+        self.lengths.append(min(len(tokens), 65535))
+        self.alive.append(1)
+        self.tokens.append(tokens)
+        self.slots[expense_id] = slot
+        self.total_length += len(tokens)
+        for token in tokens:
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = array('i')
+                insort(self.vocabulary, token)
+            postings.append(slot)
+
+    def _expand(self, term, is_prefix):
+        if not is_prefix:
+            return [term] if term in self.postings else []
+        start = bisect_left(self.vocabulary, term)
+        matches = []
+        for token in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, terms, start_date=None, end_date=None, limit=20):
+        """Return [(expense_id, score)] matching every term, best BM25 score first"""
+        if not terms or not self.size:
+            return []
+
+        lo = to_millis(start_date) if start_date else None
+        hi = to_millis(end_date) if end_date else None
+        documents = self.size
+        average_length = self.total_length / documents or 1
+
+        # Per query term: {slot: score contribution}, over all of its expansions
+        per_term = []
+        for term, is_prefix in terms:
+            scores = {}
+            for token in self._expand(term, is_prefix):
+                postings = self.postings[token]
+                counts = {}
+                for slot in postings:
+                    if self.alive[slot]:
+                        counts[slot] = counts.get(slot, 0) + 1
+                if not counts:
+                    continue
+                idf = math.log(1 + (documents - len(counts) + 0.5) / (len(counts) + 0.5))
+                for slot, tf in counts.items():
+                    norm = K1 * (1 - B + B * self.lengths[slot] / average_length)
+                    score = idf * tf * (K1 + 1) / (tf + norm)
+                    # Keep the best-matching expansion of a prefix per document
+                    if score > scores.get(slot, 0):
+                        scores[slot] = score
+            if not scores:
+                return []
+            per_term.append(scores)
+
+        # Every term must match: walk the smallest candidate set
+        per_term.sort(key=len)
+        results = []
+        for slot, score in per_term[0].items():
+            date = self.dates[slot]
+            if (lo is not None and date < lo) or (hi is not None and date > hi):
+                continue
+            total = score
+            for scores in per_term[1:]:
+                other = scores.get(slot)
+                if other is None:
+                    break
+                total += other
+            else:
+                results.append((total, date, slot))
+
+        best = heapq.nlargest(limit, results)
+        return [(self.ids[slot], round(score, 4)) for score, _, slot in best]
+
+class SearchIndexCache:
+    """Per-worker LRU of NoteIndex keyed by user, built lazily on first search.
+
+    This worker's own writes are applied incrementally. Writes made by other
+    workers arrive through the invalidation bus and drop the user's index so
+    it is rebuilt on the next search.
+    """
+
+    def __init__(self, max_users=None):
+        self.max_users = Config.SEARCH_INDEX_MAX_USERS if max_users is None else max_users
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            index = self._entries.get(user_id)
+            if index is not None:
+                self._entries.move_to_end(user_id)
+                return index
+            token = object()
+            self._building[user_id] = token
+
+        index = self._load(user_id)
+
+        with self._lock:
+            # A remote write during the load makes the result stale
+            if self._building.get(user_id) is not token or self.max_users <= 0:
+                return index
+            del self._building[user_id]
+            self._entries[user_id] = index
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+        return index
+
+    def add(self, user_id, expense_id, note, expense_date):
+        """Index a new or changed expense if the user's index is loaded"""
+        with self._lock:
+            self._building.pop(str(user_id), None)
+            index = self._entries.get(str(user_id))
+        if index is not None:
+            with index.lock:
+                index.add(expense_id, note, expense_date)
+
+    def remove(self, user_id, expense_id):
+        """Drop an expense from the user's index if it is loaded"""
+        with self._lock:
+            self._building.pop(str(user_id), None)
+            index = self._entries.get(str(user_id))
+        if index is not None:
+            with index.lock:
+                index.remove(expense_id)
+
+    def search(self, user_id, terms, start_date=None, end_date=None, limit=20):
+        index = self.get_index(user_id)
+        with index.lock:
+            return index.search(terms, start_date, end_date, limit)
+
+    def invalidate(self, user_id):
+        """Drop a user's index (None drops every user)"""
+        with self._lock:
+            if user_id is None:
+                self._building.clear()
+                self._entries.clear()
+                return
+            self._building.pop(str(user_id), None)
+            self._entries.pop(str(user_id), None)
+
+    @staticmethod
+    def _load(user_id):
+        index = NoteIndex()
+        for exp_data in db_service.find_many('expenses',
+                                             {'user_id': ObjectId(user_id)},
+                                             projection={'note': 1, 'expense_date': 1}):
+            index.add(exp_data['_id'], exp_data.get('note'), exp_data['expense_date'])
+        return index
+
+# Global search index instance
+search_index = SearchIndexCache()
+invalidation_bus.subscribe('expenses', search_index.invalidate, remote_only=True)
@@ -0,0 +1,105 @@
+from bson import ObjectId
+from collections import defaultdict
+from decimal import Decimal
+from pymongo import UpdateOne
+from services.database import db_service, once_per_batch
+from services.user_service import UserService
+from services.fx_rates import fx_rates
+from utils.money import to_decimal128, to_float
+from utils.tracing import traced_service
+
+def _new_delta():
+    return [0, Decimal(0)]
+
+@traced_service
+class TagService:
+    COLLECTION = 'tag_stats'
+    _indexed = False
+
+    @staticmethod
+    def record(user_id, old_tags=None, old_amount=0, new_tags=None, new_amount=0, batch=None):
+        """Apply an expense create, update or delete (amounts in the home currency) to the tag stats"""
+        deltas = defaultdict(_new_delta)
+        for tag in old_tags or ():
+            deltas[tag][0] -= 1
+            deltas[tag][1] -= old_amount
+        for tag in new_tags or ():
+            deltas[tag][0] += 1
+            deltas[tag][1] += new_amount
+        TagService._apply({str(user_id): deltas}, batch)
+
+    @staticmethod
+    def record_bulk(documents, sign=1, batch=None):
+        """Apply a batch of inserted (or, with sign=-1, deleted) expense documents; tags that already took `batch` are left alone"""
+        deltas = defaultdict(lambda: defaultdict(_new_delta))
+        for document in documents:
+            if not document.get('tags'):
+                continue
+            user_id = str(document['user_id'])
+            amount = fx_rates.convert(document['amount'], document.get('currency'),
+                                      UserService.get_home_currency(user_id), document['expense_date'])
+            for tag in document['tags']:
+                delta = deltas[user_id][tag]
+                delta[0] += sign
+                delta[1] += sign * amount
+        TagService._apply(deltas, batch)
+
+    @staticmethod
+    def remove_category(user_id, category_id):
+        """Take a category's expenses out of the tag stats; call before deleting them"""
+        documents = db_service.find_many('expenses',
+                                         {'user_id': ObjectId(user_id),
+                                          'category_id': ObjectId(category_id),
+                                          'tags.0': {'$exists': True}},
+                                         projection={'_id': 0, 'user_id': 1, 'tags': 1, 'amount': 1,
+                                                     'currency': 1, 'expense_date': 1})
+        TagService.record_bulk(documents, sign=-1)
+
+    @staticmethod
+    def get_user_tags(user_id):
+        """Get the user's tags with expense counts and totals, most used first"""
+        stats = db_service.find_many(TagService.COLLECTION,
+                                     {'user_id': ObjectId(user_id)},
+                                     sort=[('count', -1), ('tag', 1)])
+
+        return [{
+            'tag': stat['tag'],
+            'count': stat['count'],
+            'total': round(to_float(stat['total']), 2)
+        } for stat in stats]
+
+    @staticmethod
+    def _apply(deltas_by_user, batch=None):
+        if not TagService._indexed:
+            TagService.ensure_indexes()
+
+        requests = []
+        emptied = defaultdict(list)
+        for user_id, deltas in deltas_by_user.items():
+            for tag, (count, total) in deltas.items():
+                if not count and not total:
+                    continue
+                query, update = once_per_batch({'_id': f"{user_id}:{tag}"},
+                                               {'$inc': {'count': count, 'total': to_decimal128(total)},
+                                                '$setOnInsert': {'user_id': ObjectId(user_id), 'tag': tag}},
+                                               batch)
+                requests.append(UpdateOne(query, update, upsert=True))
+                if count < 0:
+                    emptied[user_id].append(tag)
+        if not requests:
+            return
+
+        db_service.bulk_write(TagService.COLLECTION, requests, skip_duplicates=batch is not None)
+
+        # Tags no expense carries any more drop out of the rollup
+        for user_id, tags in emptied.items():
+            db_service.delete_many(TagService.COLLECTION, {'user_id': ObjectId(user_id),
+                                                           'tag': {'$in': tags},
+                                                           'count': {'$lte': 0}})
+
+    @staticmethod
+    def ensure_indexes():
+        """Rollup listing order, plus the multikey index behind ?tags= filtering"""
+        db_service.get_collection(TagService.COLLECTION).create_index([('user_id', 1), ('count', -1)])
+        db_service.get_collection('expenses').create_index([('user_id', 1), ('tags', 1), ('expense_date', -1)])
+        TagService._indexed = True
@@ -1,11 +1,17 @@
 from bson import ObjectId
+from functools import lru_cache
 from models.user import User
 from services.database import db_service
+from services.cache_invalidation import invalidation_bus
 from flask_jwt_extended import create_access_token
+from services.fx_rates import fx_rates
+from utils.tracing import traced_service
+from config import Config
 
+@traced_service
 class UserService:
     @staticmethod
-    def create_user(first_name, last_name, email, password):
+    def create_user(first_name, last_name, email, password, home_currency=None):
         """Create a new user"""
         # Check if user already exists
         existing_user = db_service.find_one('users', {'email': email.lower()})
@@ -13,7 +19,9 @@ class UserService:
             raise ValueError("User with this email already exists")
         
         # Create new user
-        user = User(first_name, last_name, email, password)
+        user = User(first_name, last_name, email, password, home_currency=home_currency)
+        if not fx_rates.supports(user.home_currency):
+            raise ValueError(f"Unsupported currency: {user.home_currency}")
         user.hash_password()
         
         # Insert into database
@@ -21,11 +29,13 @@ class UserService:
             'first_name': user.first_name,
             'last_name': user.last_name,
             'email': user.email,
-            'password': user.password
+            'password': user.password,
+            'home_currency': user.home_currency
         }
         
         user_id = db_service.insert_one('users', user_data)
         user._id = user_id
+        invalidation_bus.publish('users', user_id)
         
         return user
     
@@ -45,7 +55,8 @@ class UserService:
             user_data['last_name'], 
             user_data['email'],
             user_data['password'],
-            user_data['_id']
+            user_data['_id'],
+            user_data.get('home_currency')
         )
         
         return user
@@ -66,11 +77,17 @@ class UserService:
             user_data['last_name'],
             user_data['email'],
             user_data['password'],
-            user_data['_id']
+            user_data['_id'],
+            user_data.get('home_currency')
         )
         
         return user
     
+    @staticmethod
+    def get_home_currency(user_id):
+        """Currency the user's summaries and rollups are kept in"""
+        return _home_currency(str(user_id))
+    
     @staticmethod
     def generate_token(user):
         """Generate JWT token for user"""
@@ -82,3 +99,9 @@ class UserService:
         }
         
         return create_access_token(identity=identity)
+
+# Home currency is fixed at registration, so it can be cached for the process lifetime
+@lru_cache(maxsize=10000)
+def _home_currency(user_id):
+    user_data = db_service.find_one('users', {'_id': ObjectId(user_id)})
+    return (user_data or {}).get('home_currency') or Config.DEFAULT_CURRENCY
@@ -202,6 +202,35 @@ class APITester:
             print(f"❌ Expense summary failed: {response.text}")
             return False
     
+    def test_dashboard_batch(self):
+        """Test loading the dashboard in one batch request"""
+        print("\n🧪 Testing Dashboard Batch...")
+        
+        headers = {"Authorization": f"Bearer {self.token}", "Accept-Encoding": "gzip"}
+        data = {
+            "requests": [
+                {"id": "categories", "path": "/api/categories"},
+                {"id": "expenses", "path": "/api/expenses?limit=20"},
+                {"id": "summary", "path": "/api/expenses/summary?filter=last_month"},
+                {"id": "profile", "path": "/api/users/profile", "headers": {"Accept-Encoding": "gzip"}}
+            ]
+        }
+        response = requests.post(f"{self.base_url}/batch", json=data, headers=headers)
+        
+        if response.status_code != 200:
+            print(f"❌ Dashboard batch failed: {response.text}")
+            return False
+        
+        responses = response.json()['data']['responses']
+        failed = [entry['id'] for entry in responses if entry['status'] != 200 or not isinstance(entry['body'], dict)]
+        if failed:
+            print(f"❌ Dashboard batch sub-requests failed: {', '.join(failed)}")
+            return False
+        
+        print("✅ Dashboard batch successful")
+        print(f"   Profile: {responses[3]['body']['data']['user']['email']}")
+        return True
+    
     def test_delete_expense(self):
         """Test deleting an expense"""
         print("\n🧪 Testing Expense Deletion...")
@@ -244,6 +273,7 @@ class APITester:
             self.test_expense_filtering,
             self.test_update_expense,
             self.test_expense_summary,
+            self.test_dashboard_batch,
             self.test_delete_expense,
             self.test_delete_category
         ]
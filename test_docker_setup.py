@@ -43,7 +43,8 @@ def test_docker_setup():
     required_files = [
         'Dockerfile',
         'docker-compose.yml',
-        'mongodb_api.py',
+        'app.py',
+        'run.py',
         'requirements.txt'
     ]
     
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Legacy route parity check for the Expense Tracker API
+Walks every route the retired single-file servers (expense_tracker_api.py,
+mongodb_api.py, simple_working_api.py and final_api.py) exposed and checks
+the status codes and response fields they returned, against a running server.
+
+With --compare, the same walk also runs against a second server (for
+example a build of an old entry point) and any status that differs between
+the two is reported. Users, categories and expenses must carry `id` as the
+legacy servers did (the layered app also returns `_id`).
+
+Known differences from the legacy servers, not covered by this walk:
+  - tokens they issued carry a bare user id and are rejected with 401, so
+    clients log in again;
+  - data they wrote with string user_ids is only visible after running
+    migrate_legacy_data.py.
+
+Examples:
+    python test_legacy_parity.py
+    python test_legacy_parity.py --url http://localhost:5000 --compare http://localhost:5001
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+BASE_URL = "http://localhost:5000"
+MISSING_ID = "5f0000000000000000000000"
+
+def has_path(body, path):
+    """Whether a dotted path exists in a JSON body"""
+    value = body
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return False
+        value = value[key]
+    return True
+
+def object_id(body, path):
+    value = body
+    for key in path.split('.'):
+        value = value[key]
+    return value.get('id')
+
+class ParityRun:
+    """One walk over the legacy routes against a server, recording each status"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {}
+        self.state = {}
+        self.statuses = {}
+        self.failures = []
+
+    def check(self, name, method, path, expected_status, fields=(), json=None, auth=True):
+        response = requests.request(method, f"{self.base_url}{path}", json=json,
+                                    headers=self.headers if auth else {})
+        self.statuses[name] = response.status_code
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+
+        problems = []
+        if response.status_code != expected_status:
+            problems.append(f"status {response.status_code}, expected {expected_status}")
+        problems.extend(f"missing {field}" for field in fields if not has_path(body, field))
+
+        if problems:
+            self.failures.append(name)
+            print(f"❌ {name}: {'; '.join(problems)}")
+        else:
+            print(f"✅ {name}")
+        return body
+
+    def run(self):
+        today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+        email = f"parity-{int(time.time() * 1000)}@example.com"
+        user = {'first_name': 'Parity', 'last_name': 'Check', 'email': email, 'password': 'parity123'}
+
+        # Service
+        self.check('home', 'GET', '/', 200, ['status', 'message'])
+        self.check('health', 'GET', '/health', 200, ['status', 'message'])
+        self.check('unknown route', 'GET', '/api/does-not-exist', 404, ['status', 'message'])
+
+        # Users
+        self.check('register without fields', 'POST', '/api/users/register', 400, ['status'],
+                   json={'email': email})
+        body = self.check('register', 'POST', '/api/users/register', 201,
+                          ['data.user.id', 'data.user.email', 'data.token'], json=user)
+        self.headers = {'Authorization': f"Bearer {body.get('data', {}).get('token')}"}
+        self.check('register duplicate', 'POST', '/api/users/register', 400, ['status'], json=user)
+        self.check('login without password', 'POST', '/api/users/login', 400, ['status'],
+                   json={'email': email})
+        self.check('login wrong password', 'POST', '/api/users/login', 401, ['status'],
+                   json={'email': email, 'password': 'wrong-password'})
+        self.check('login', 'POST', '/api/users/login', 200, ['data.user.id', 'data.token'],
+                   json={'email': email, 'password': user['password']})
+
+        # Categories
+        self.check('categories without token', 'GET', '/api/categories', 401, auth=False)
+        self.check('list categories', 'GET', '/api/categories', 200, ['data.categories'])
+        self.check('create unknown category', 'POST', '/api/categories', 400, ['status'],
+                   json={'title': 'Not A Category', 'description': 'parity'})
+        body = self.check('create category', 'POST', '/api/categories', 201,
+                          ['data.category.id', 'data.category.title'],
+                          json={'title': 'Groceries', 'description': 'parity'})
+        category_id = object_id(body, 'data.category') if 'data' in body else MISSING_ID
+        self.check('create duplicate category', 'POST', '/api/categories', 400, ['status'],
+                   json={'title': 'Groceries', 'description': 'parity'})
+
+        # Expenses
+        expense = {'amount': 42.5, 'note': 'parity', 'expense_date': today.isoformat(),
+                   'category_id': category_id}
+        self.check('create expense with negative amount', 'POST', '/api/expenses', 400, ['status'],
+                   json={**expense, 'amount': -1})
+        self.check('create expense with bad date', 'POST', '/api/expenses', 400, ['status'],
+                   json={**expense, 'expense_date': 'not-a-date'})
+        self.check('create expense in unknown category', 'POST', '/api/expenses', 400, ['status'],
+                   json={**expense, 'category_id': MISSING_ID})
+        body = self.check('create expense', 'POST', '/api/expenses', 201,
+                          ['data.expense.id', 'data.expense.amount', 'data.expense.category_id'], json=expense)
+        expense_id = object_id(body, 'data.expense') if 'data' in body else MISSING_ID
+
+        self.check('list expenses', 'GET', '/api/expenses', 200, ['data.expenses'])
+        for filter_type in ('past_week', 'last_month', 'last_3_months'):
+            self.check(f'list expenses ({filter_type})', 'GET', f'/api/expenses?filter={filter_type}', 200,
+                       ['data.expenses'])
+        start = (today - timedelta(days=30)).isoformat()
+        self.check('list expenses (custom)', 'GET',
+                   f'/api/expenses?filter=custom&start_date={start}&end_date={today.isoformat()}', 200,
+                   ['data.expenses'])
+        self.check('list expenses (custom, bad date)', 'GET',
+                   '/api/expenses?filter=custom&start_date=bad&end_date=bad', 400, ['status'])
+        self.check('list expenses by category', 'GET', f'/api/expenses?category_id={category_id}', 200,
+                   ['data.expenses'])
+
+        self.check('update expense', 'PUT', f'/api/expenses/{expense_id}', 200,
+                   ['data.expense.id', 'data.expense.amount'], json={**expense, 'amount': 60})
+        self.check('update missing expense', 'PUT', f'/api/expenses/{MISSING_ID}', 404, ['status'],
+                   json={**expense, 'amount': 60})
+        self.check('expense summary', 'GET', '/api/expenses/summary', 200,
+                   ['data.summary.total_amount', 'data.summary.total_count',
+                    'data.summary.category_breakdown', 'data.period'])
+
+        # Income and savings (simple_working_api.py)
+        self.check('set income with zero amount', 'POST', '/api/income', 400, ['status'], json={'amount': 0})
+        self.check('set income', 'POST', '/api/income', 201, ['data.income.amount', 'data.income.month'],
+                   json={'amount': 1000})
+        self.check('get income', 'GET', '/api/income', 200, ['data.income.amount', 'data.income.month'])
+        self.check('savings', 'GET', '/api/savings', 200,
+                   ['data.monthly_summary.income', 'data.monthly_summary.total_expenses',
+                    'data.monthly_summary.savings', 'data.monthly_summary.savings_percentage',
+                    'data.expense_breakdown.total_count', 'data.expense_breakdown.categories'])
+
+        self.check('delete expense', 'DELETE', f'/api/expenses/{expense_id}', 200, ['status'])
+        self.check('delete missing expense', 'DELETE', f'/api/expenses/{expense_id}', 404, ['status'])
+
+        return not self.failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Check a server against the legacy API routes')
+    parser.add_argument('--url', default=BASE_URL, help='server under test')
+    parser.add_argument('--compare', help='second server to compare statuses with, e.g. a legacy build')
+    args = parser.parse_args()
+
+    print("Legacy Route Parity Check")
+    print("=" * 50)
+
+    try:
+        run = ParityRun(args.url)
+        passed = run.run()
+        print(f"\n📊 {len(run.statuses) - len(run.failures)}/{len(run.statuses)} legacy checks passed on {args.url}")
+
+        if args.compare:
+            print(f"\n🔍 Comparing with {args.compare}...")
+            other = ParityRun(args.compare)
+            other.run()
+            differences = [name for name in run.statuses if run.statuses[name] != other.statuses.get(name)]
+            for name in differences:
+                print(f"❌ {name}: {run.statuses[name]} vs {other.statuses.get(name)}")
+            if not differences:
+                print("✅ Every legacy route returned the same status on both servers")
+            passed = passed and not differences
+    except requests.exceptions.ConnectionError as e:
+        print(f"❌ Connection error: make sure the API server is running ({e})")
+        return 1
+
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
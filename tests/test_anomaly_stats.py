@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the running (count, mean, M2) summaries behind anomaly flags
+Runs without a server or database:
+    python -m unittest tests.test_anomaly_stats
+"""
+
+import math
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.anomaly_service import merge_stats, log_amount
+
+def summarize(values):
+    """Direct (count, mean, M2) of a list of samples"""
+    if not values:
+        return 0, 0.0, 0.0
+    mean = sum(values) / len(values)
+    return len(values), mean, sum((value - mean) ** 2 for value in values)
+
+def add_all(values, stats=(0, 0.0, 0.0)):
+    for value in values:
+        stats = merge_stats(stats, 1, value, 0.0)
+    return stats
+
+class MergeStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.samples = [log_amount(rng.lognormvariate(3, 0.8)) for _ in range(200)]
+
+    def assertStatsEqual(self, actual, expected):
+        self.assertEqual(actual[0], expected[0])
+        self.assertTrue(math.isclose(actual[1], expected[1], rel_tol=1e-9, abs_tol=1e-9), (actual, expected))
+        self.assertTrue(math.isclose(actual[2], expected[2], rel_tol=1e-7, abs_tol=1e-7), (actual, expected))
+
+    def test_adding_one_at_a_time_matches_direct_summary(self):
+        self.assertStatsEqual(add_all(self.samples), summarize(self.samples))
+
+    def test_adding_a_batch_matches_adding_one_at_a_time(self):
+        stats = add_all(self.samples[:120])
+        batched = merge_stats(stats, *summarize(self.samples[120:]))
+        self.assertStatsEqual(batched, add_all(self.samples))
+
+    def test_removing_a_sample_undoes_adding_it(self):
+        stats = add_all(self.samples)
+        removed = merge_stats(stats, -1, self.samples[17], 0.0)
+        self.assertStatsEqual(removed, summarize(self.samples[:17] + self.samples[18:]))
+        self.assertStatsEqual(merge_stats(removed, 1, self.samples[17], 0.0), stats)
+
+    def test_removing_a_batch_undoes_adding_it(self):
+        stats = add_all(self.samples)
+        count, mean, m2 = summarize(self.samples[150:])
+        self.assertStatsEqual(merge_stats(stats, -count, mean, m2), summarize(self.samples[:150]))
+
+    def test_editing_a_sample_matches_recomputing(self):
+        # update_expense removes the old amount and adds the new one
+        stats = add_all(self.samples)
+        edited = merge_stats(merge_stats(stats, -1, self.samples[3], 0.0), 1, log_amount(5000), 0.0)
+        self.assertStatsEqual(edited, summarize(self.samples[:3] + [log_amount(5000)] + self.samples[4:]))
+
+    def test_removing_everything_resets(self):
+        stats = add_all(self.samples[:2])
+        stats = merge_stats(merge_stats(stats, -1, self.samples[0], 0.0), -1, self.samples[1], 0.0)
+        self.assertEqual(stats, (0, 0.0, 0.0))
+        self.assertEqual(merge_stats((1, 2.0, 0.0), -3, 1.0, 0.0), (0, 0.0, 0.0))
+
+    def test_m2_never_goes_negative(self):
+        stats = add_all([1.0, 1.0, 1.0])
+        self.assertGreaterEqual(merge_stats(stats, -1, 1.0 + 1e-12, 0.0)[2], 0.0)
+
+    def test_log_amount_floors_tiny_amounts(self):
+        self.assertEqual(log_amount(0), math.log(0.01))
+        self.assertEqual(log_amount('12.50'), math.log(12.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import zlib
+from flask import request
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'text/'
+)
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        compressor = self._compressobj()
+        return compressor.compress(data) + compressor.flush()
+
+    def stream(self, chunks):
+        compressor = self._compressobj()
+        for chunk in chunks:
+            # Sync-flush every chunk so clients receive data as it is produced
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    def _compressobj(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, level):
+        self.level = level
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def stream(self, chunks):
+        compressor = brotli.Compressor(quality=self.level)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+class ZstdEncoder:
+    name = 'zstd'
+
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def stream(self, chunks):
+        compressor = self.compressor.compressobj()
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            if data:
+                yield data
+        yield compressor.flush()
+
+def build_encoders():
+    """Instantiate the configured encoders whose libraries are installed"""
+    factories = {
+        'gzip': lambda: GzipEncoder(Config.COMPRESSION_LEVEL),
+        'br': lambda: BrotliEncoder(Config.BROTLI_QUALITY) if brotli else None,
+        'zstd': lambda: ZstdEncoder(Config.ZSTD_LEVEL) if zstandard else None
+    }
+
+    encoders = {}
+    for name in Config.COMPRESSION_ALGORITHMS:
+        factory = factories.get(name)
+        encoder = factory() if factory else None
+        if encoder is not None:
+            encoders[name] = encoder
+    return encoders
+
+def _is_compressible(response):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    return response.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+def register_compression(app):
+    """Register negotiated response compression for the Flask app"""
+    encoders = build_encoders()
+    if not encoders:
+        return
+
+    # Server preference order breaks ties between equally weighted encodings
+    preference = list(encoders)
+
+    @app.after_request
+    def compress_response(response):
+        if not _is_compressible(response):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        name = request.accept_encodings.best_match(preference)
+        if name is None:
+            return response
+        encoder = encoders[name]
+
+        if response.is_streamed:
+            response.response = encoder.stream(response.iter_encoded())
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < Config.COMPRESSION_MIN_SIZE:
+                return response
+            response.set_data(encoder.compress(data))
+
+        response.headers['Content-Encoding'] = name
+
+        # The encoded body is a different representation of the same data
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+        return response
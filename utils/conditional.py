@@ -0,0 +1,37 @@
+from functools import wraps
+from flask import request, make_response
+from flask_jwt_extended import get_jwt_identity
+from services.data_version import data_versions
+
+def conditional_get(view):
+    """Answer GETs with 304 when If-None-Match matches the user's data version.
+
+    Must be applied below @jwt_required() so the identity is available. The
+    check runs before the view, so a match costs no database queries.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user_id = get_jwt_identity()['user_id']
+
+        resource = request.full_path
+        filter_type = request.args.get('filter')
+        if filter_type and filter_type != 'custom':
+            # Relative windows move with the clock, not only with writes
+            resource = f"{resource}@{data_versions.time_bucket()}"
+
+        etag = data_versions.etag(user_id, resource)
+        if etag is None:
+            return view(*args, **kwargs)
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
@@ -3,6 +3,9 @@ from marshmallow import ValidationError
 from flask_jwt_extended.exceptions import JWTExtendedException
 from werkzeug.exceptions import HTTPException
 
+class NotFoundError(ValueError):
+    """The requested resource doesn't exist for the user; answered with 404 instead of 400"""
+
 def register_error_handlers(app):
     """Register global error handlers for the Flask app"""
     
@@ -31,6 +34,14 @@ def register_error_handlers(app):
             'message': str(e)
         }), 400
     
+    @app.errorhandler(NotFoundError)
+    def handle_not_found_error(e):
+        """Handle lookups of resources the user doesn't have"""
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 404
+    
     @app.errorhandler(404)
     def handle_not_found(e):
         """Handle 404 errors"""
@@ -0,0 +1,30 @@
+def parse_fields(raw_fields, allowed_fields):
+    """Parse a comma-separated ?fields= value into a tuple of field names.
+
+    Returns None when no fieldset was requested so callers keep the full
+    representation. Unknown names raise ValueError.
+    """
+    if not raw_fields:
+        return None
+    
+    fields = []
+    for field in raw_fields.split(','):
+        field = field.strip()
+        if field and field not in fields:
+            fields.append(field)
+    
+    invalid = [field for field in fields if field not in allowed_fields]
+    if invalid:
+        raise ValueError(f"Invalid fields: {', '.join(invalid)}. Must be any of: {', '.join(allowed_fields)}")
+    
+    return tuple(fields) or None
+
+def build_projection(fields):
+    """MongoDB projection for a parsed fieldset (None means all fields)"""
+    if fields is None:
+        return None
+    
+    projection = {field: 1 for field in fields}
+    if '_id' not in projection:
+        projection['_id'] = 0
+    return projection
@@ -0,0 +1,90 @@
+from functools import wraps
+import hashlib
+import json
+import uuid
+from flask import request, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
+from services.idempotency_store import idempotency_store
+
+MAX_KEY_LENGTH = 255
+
+def _fingerprint():
+    """Hash of the method, path and JSON body, insensitive to key order"""
+    raw = request.get_data()
+    try:
+        body = json.dumps(json.loads(raw), sort_keys=True, separators=(',', ':')).encode()
+    except ValueError:
+        body = raw
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(body)
+    return digest.hexdigest()
+
+def _replay(record):
+    response = make_response(record['body'], record['status'])
+    response.mimetype = record['mimetype']
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(view):
+    """Honour an Idempotency-Key header on a POST view.
+
+    Must be applied below @jwt_required() so keys are scoped per user. A retry
+    with the same key and body gets the stored response without the view
+    running again; the same key with a different body is rejected with 422.
+    The claim is renewed while the view runs and released on a server error,
+    so views must only answer 5xx when they have written nothing.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+
+        key = key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({
+                'status': 'error',
+                'message': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters'
+            }), 400
+
+        user_id = get_jwt_identity()['user_id']
+        fingerprint = _fingerprint()
+
+        lease = uuid.uuid4().hex
+        record = idempotency_store.claim(user_id, key, fingerprint, lease)
+        if record is not None:
+            if record['fingerprint'] != fingerprint:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Idempotency-Key was already used with a different request body'
+                }), 422
+            if record['state'] != 'completed':
+                response = jsonify({
+                    'status': 'error',
+                    'message': 'A request with this Idempotency-Key is still being processed'
+                })
+                response.status_code = 409
+                response.headers['Retry-After'] = '1'
+                return response
+            return _replay(record)
+
+        idempotency_store.hold(user_id, key, lease)
+        try:
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                idempotency_store.release(user_id, key, lease)
+                raise
+
+            # Server errors are not final, so the client may retry them
+            if response.status_code >= 500 or response.is_streamed:
+                idempotency_store.release(user_id, key, lease)
+            else:
+                # A claim lost to a retry keeps the response that retry stores
+                idempotency_store.complete(user_id, key, fingerprint, lease, response.status_code,
+                                           response.get_data(as_text=True), response.mimetype)
+        finally:
+            idempotency_store.unhold(user_id, key, lease)
+        return response
+
+    return wrapper
@@ -0,0 +1,174 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import hmac
+import threading
+from time import perf_counter
+from flask import g, jsonify, request, Response
+from flask.json.provider import DefaultJSONProvider
+from utils.tracing import tracer
+from config import Config
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BCRYPT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.0)
+JSON_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005, 0.01, 0.05)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus three additions"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        """Record a value for a tuple of label values"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, labels=()):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, perf_counter() - start)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2])
+                        for labels, series in self._series.items()]
+
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound!r}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {total}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+class Gauge:
+    """Gauge with inc/dec keyed by a tuple of label values"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def get(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {value}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by blueprint and endpoint',
+    ('blueprint', 'endpoint', 'method', 'status')))
+requests_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being served'))
+mongo_duration = registry.register(Histogram(
+    'mongo_operation_duration_seconds', 'DatabaseService operation latency',
+    ('operation', 'collection')))
+bcrypt_duration = registry.register(Histogram(
+    'bcrypt_duration_seconds', 'Password hashing and verification time',
+    ('operation',), buckets=BCRYPT_BUCKETS))
+json_duration = registry.register(Histogram(
+    'json_serialization_duration_seconds', 'Time spent serializing JSON responses',
+    buckets=JSON_BUCKETS))
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Default JSON provider that records and traces serialization time"""
+
+    def dumps(self, obj, **kwargs):
+        start = perf_counter()
+        try:
+            with tracer.span('json.dumps'):
+                return super().dumps(obj, **kwargs)
+        finally:
+            json_duration.observe((), perf_counter() - start)
+
+def _is_scraper(authorization):
+    if not Config.METRICS_TOKEN or not authorization or not authorization.startswith('Bearer '):
+        return False
+    return hmac.compare_digest(authorization[len('Bearer '):], Config.METRICS_TOKEN)
+
+def register_metrics(app):
+    """Register request instrumentation and the /metrics endpoint"""
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def start_request_timer():
+        g._metrics_start = perf_counter()
+        g._metrics_in_flight = True
+        requests_in_flight.inc()
+
+    @app.after_request
+    def record_request_duration(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            endpoint = request.endpoint or 'unmatched'
+            request_duration.observe(
+                (request.blueprint or '', endpoint, request.method, response.status_code),
+                perf_counter() - start)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        if g.pop('_metrics_in_flight', False):
+            requests_in_flight.dec()
+
+    @app.route('/metrics')
+    def metrics():
+        if not _is_scraper(request.headers.get('Authorization')):
+            return jsonify({'status': 'error', 'message': 'Resource not found'}), 404
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
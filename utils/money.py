@@ -0,0 +1,29 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from bson.decimal128 import Decimal128
+
+CENT = Decimal('0.01')
+
+def to_decimal(value):
+    """Exact Decimal for a stored or submitted amount (Decimal128, float, int or str)"""
+    if isinstance(value, Decimal128):
+        return value.to_decimal()
+    if isinstance(value, Decimal):
+        return value
+    # str() keeps floats like 0.1 at their shortest repr instead of the binary expansion
+    return Decimal(str(value))
+
+def to_cents(value):
+    """Round an amount to cents, banker's rounding"""
+    return to_decimal(value).quantize(CENT, rounding=ROUND_HALF_EVEN)
+
+def to_decimal128(value):
+    """Decimal128 of an amount rounded to cents, for storage and $inc"""
+    return Decimal128(to_cents(value))
+
+def to_float(value):
+    """Float for JSON output and in-memory arithmetic"""
+    if value is None:
+        return None
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    return float(value)
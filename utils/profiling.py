@@ -0,0 +1,245 @@
+import cProfile
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from flask import g, jsonify, request, send_file, has_request_context
+from config import Config
+
+PROFILE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+class CProfileRecorder:
+    """Deterministic profile of the request thread, saved as pstats"""
+    extension = 'pstats'
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        # Raises ValueError when another profiler is already active
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+
+    def save(self, path, name):
+        self.profiler.dump_stats(path)
+
+class SamplingRecorder:
+    """Samples the request thread's stack on a timer, saved as speedscope JSON"""
+    extension = 'speedscope.json'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.frames = []
+        self.frame_index = {}
+        self.samples = []
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                if key not in self.frame_index:
+                    self.frame_index[key] = len(self.frames)
+                    self.frames.append({'name': key[0], 'file': key[1], 'line': key[2]})
+                stack.append(self.frame_index[key])
+                frame = frame.f_back
+            # speedscope wants stacks root first
+            stack.reverse()
+            self.samples.append(stack)
+
+    def save(self, path, name):
+        document = {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'shared': {'frames': self.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': self.elapsed,
+                'samples': self.samples,
+                'weights': [self.interval] * len(self.samples)
+            }],
+            'exporter': 'expense-tracker-api'
+        }
+        with open(path, 'w') as f:
+            json.dump(document, f)
+
+class RequestProfile:
+    """Profiler plus Mongo call timings for one request"""
+
+    def __init__(self, mode):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.recorder = (SamplingRecorder(Config.PROFILE_SAMPLE_INTERVAL) if mode == 'sample'
+                         else CProfileRecorder())
+        self.mongo_calls = []
+        self.started = time.perf_counter()
+
+    def record_mongo_call(self, operation, collection, start, elapsed):
+        self.mongo_calls.append({
+            'operation': operation,
+            'collection': collection,
+            'offset_ms': round((start - self.started) * 1000, 3),
+            'duration_ms': round(elapsed * 1000, 3)
+        })
+
+    def save(self, directory, status):
+        duration = time.perf_counter() - self.started
+        name = f"{request.method} {request.path}"
+        trace_file = f"{self.id}.{self.recorder.extension}"
+        self.recorder.save(os.path.join(directory, trace_file), name)
+
+        mongo_ms = sum(call['duration_ms'] for call in self.mongo_calls)
+        metadata = {
+            'id': self.id,
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status': status,
+            'mode': self.mode,
+            'duration_ms': round(duration * 1000, 3),
+            'mongo': {
+                'calls': len(self.mongo_calls),
+                'total_ms': round(mongo_ms, 3),
+                'timeline': self.mongo_calls
+            },
+            'trace_file': trace_file
+        }
+        with open(os.path.join(directory, f"{self.id}.json"), 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+def record_mongo_call(operation, collection, start, elapsed):
+    """Attach a DatabaseService call to the current request's profile, if any"""
+    if not has_request_context():
+        return
+    profile = g.get('_profile')
+    if profile is not None:
+        profile.record_mongo_call(operation, collection, start, elapsed)
+
+def _is_admin(token):
+    return bool(Config.PROFILE_ADMIN_TOKEN) and token is not None and \
+        hmac.compare_digest(token, Config.PROFILE_ADMIN_TOKEN)
+
+def _should_profile():
+    if _is_admin(request.headers.get('X-Profile-Token')):
+        return True
+    return Config.PROFILE_SAMPLE_RATE > 0 and random.random() < Config.PROFILE_SAMPLE_RATE
+
+def _prune(directory, keep):
+    """Delete the oldest profiles beyond the newest `keep`"""
+    metadata = sorted((entry for entry in os.scandir(directory) if entry.name.endswith('.json')
+                       and PROFILE_ID.match(entry.name.split('.')[0])),
+                      key=lambda entry: entry.stat().st_mtime, reverse=True)
+    stale = {entry.name.split('.')[0] for entry in metadata[keep:]}
+    for entry in os.scandir(directory):
+        if entry.name.split('.')[0] in stale:
+            os.remove(entry.path)
+
+def register_profiling(app):
+    """Register the opt-in per-request profiler and the profile download endpoints"""
+    directory = os.path.abspath(Config.PROFILE_DIR)
+    lock = threading.Lock()
+
+    @app.before_request
+    def start_profile():
+        if request.path.startswith('/profiles') or not _should_profile():
+            return
+        mode = request.headers.get('X-Profile-Mode', Config.PROFILE_MODE)
+        profile = RequestProfile('sample' if mode == 'sample' else 'cprofile')
+        try:
+            profile.recorder.start()
+        except ValueError:
+            # Another request on this interpreter is already under cProfile
+            return
+        g._profile = profile
+
+    @app.after_request
+    def save_profile(response):
+        profile = g.pop('_profile', None)
+        if profile is None:
+            return response
+        profile.recorder.stop()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            profile.save(directory, response.status_code)
+            with lock:
+                _prune(directory, Config.PROFILE_MAX_FILES)
+            response.headers['X-Profile-Id'] = profile.id
+        except OSError as e:
+            app.logger.warning(f"Could not save profile {profile.id}: {e}")
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc):
+        # after_request is skipped on unhandled errors
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            profile.recorder.stop()
+
+    def admin_only():
+        if not _is_admin(request.headers.get('X-Profile-Token')):
+            return jsonify({'status': 'error', 'message': 'Resource not found'}), 404
+        return None
+
+    @app.route('/profiles')
+    def list_profiles():
+        denied = admin_only()
+        if denied:
+            return denied
+        profiles = []
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.name.endswith('.json') and PROFILE_ID.match(entry.name[:-5]):
+                    with open(entry.path) as f:
+                        profiles.append(json.load(f))
+        profiles.sort(key=lambda profile: profile['created_at'], reverse=True)
+        return jsonify({'status': 'success', 'data': {'profiles': profiles}}), 200
+
+    @app.route('/profiles/<profile_id>')
+    def get_profile(profile_id):
+        denied = admin_only()
+        if denied:
+            return denied
+        path = os.path.join(directory, f"{profile_id}.json")
+        if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+            return jsonify({'status': 'error', 'message': 'Profile not found'}), 404
+        with open(path) as f:
+            return jsonify({'status': 'success', 'data': {'profile': json.load(f)}}), 200
+
+    @app.route('/profiles/<profile_id>/trace')
+    def download_trace(profile_id):
+        denied = admin_only()
+        if denied:
+            return denied
+        path = os.path.join(directory, f"{profile_id}.json")
+        if not PROFILE_ID.match(profile_id) or not os.path.exists(path):
+            return jsonify({'status': 'error', 'message': 'Profile not found'}), 404
+        with open(path) as f:
+            trace_file = json.load(f)['trace_file']
+        return send_file(os.path.join(directory, trace_file), as_attachment=True, download_name=trace_file)
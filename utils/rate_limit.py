@@ -0,0 +1,182 @@
+import logging
+import math
+import threading
+import time
+import jwt
+from flask import request, jsonify
+from jwt.exceptions import PyJWTError
+from pymongo.errors import PyMongoError
+from config import Config
+
+logger = logging.getLogger('expense_tracker.rate_limit')
+
+# Endpoints limited by IP with the strict auth policy
+AUTH_ENDPOINTS = {'auth.login', 'auth.register'}
+
+# Reads that cost noticeably more than a plain list
+EXPENSIVE_ENDPOINTS = {'expenses.get_expense_summary', 'expenses.search_expenses', 'expenses.get_expense_forecast',
+                       'income.calculate_savings'}
+
+class Policy:
+    """Token bucket: `capacity` requests, refilled evenly over `period` seconds"""
+
+    def __init__(self, name, spec):
+        capacity, _, period = spec.partition('/')
+        self.name = name
+        self.capacity = float(capacity)
+        self.period = float(period or 1)
+        self.rate = self.capacity / self.period
+
+class MemoryBucketStore:
+    """Per-worker buckets: {key: (tokens, updated_at)}"""
+
+    MAX_KEYS = 100000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, policy, cost):
+        """Spend `cost` tokens; return seconds to wait, or 0 when allowed"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + (now - updated_at) * policy.rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) / policy.rate
+            if len(self._buckets) > self.MAX_KEYS:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        # Buckets that have refilled carry no state worth keeping
+        longest = max(policy.period for policy in rate_limiter.policies.values())
+        self._buckets = {key: value for key, value in self._buckets.items()
+                         if now - value[1] < longest}
+
+class MongoBucketStore:
+    """Buckets shared by every replica, updated atomically with a pipeline update.
+
+    Refill is computed from the server clock ($$NOW), so replica clock skew
+    does not matter.
+    """
+
+    COLLECTION = 'rate_limits'
+
+    def __init__(self):
+        self._indexed = False
+
+    def take(self, key, policy, cost):
+        from services.database import db_service
+
+        if not self._indexed:
+            db_service.get_collection(self.COLLECTION).create_index('expires_at', expireAfterSeconds=0)
+            self._indexed = True
+
+        elapsed = {'$divide': [{'$subtract': ['$$NOW', {'$ifNull': ['$updated_at', '$$NOW']}]}, 1000]}
+        refilled = {'$min': [policy.capacity,
+                             {'$add': [{'$ifNull': ['$tokens', policy.capacity]},
+                                       {'$multiply': [elapsed, policy.rate]}]}]}
+        bucket = db_service.find_one_and_update(self.COLLECTION, {'_id': key}, [
+            {'$set': {'tokens': refilled, 'updated_at': '$$NOW'}},
+            {'$set': {'allowed': {'$gte': ['$tokens', cost]}}},
+            {'$set': {'tokens': {'$cond': ['$allowed', {'$subtract': ['$tokens', cost]}, '$tokens']},
+                      'expires_at': {'$add': ['$$NOW', int(policy.period * 1000)]}}}
+        ], upsert=True, projection={'tokens': 1, 'allowed': 1})
+
+        if bucket['allowed']:
+            return 0
+        return (cost - bucket['tokens']) / policy.rate
+
+class RateLimiter:
+    def __init__(self):
+        self.policies = {
+            'auth': Policy('auth', Config.RATE_LIMIT_AUTH),
+            'expensive': Policy('expensive', Config.RATE_LIMIT_EXPENSIVE),
+            'read': Policy('read', Config.RATE_LIMIT_READ),
+            'write': Policy('write', Config.RATE_LIMIT_WRITE)
+        }
+        self.memory = MemoryBucketStore()
+        self.store = MongoBucketStore() if Config.RATE_LIMIT_STORAGE == 'mongo' else self.memory
+
+    def classify(self):
+        """Return (policy, bucket name, cost) for the current request, or None if exempt"""
+        endpoint = request.endpoint
+        # Only API blueprints are limited; health, metrics and profiles are not
+        if request.blueprint is None or request.method == 'OPTIONS':
+            return None
+        if endpoint in AUTH_ENDPOINTS:
+            return self.policies['auth'], endpoint, 1
+        if endpoint == 'batch.run_batch':
+            # Each sub-request is dispatched through these hooks and charged to
+            # its own endpoint's bucket; the envelope itself costs one write
+            return self.policies['write'], 'write', 1
+        if endpoint in EXPENSIVE_ENDPOINTS:
+            return self.policies['expensive'], endpoint, 1
+        if request.method in ('GET', 'HEAD'):
+            return self.policies['read'], 'read', 1
+        return self.policies['write'], 'write', 1
+
+    def client_id(self, by_user=True):
+        """User id from the bearer token when one is present, otherwise client IP.
+
+        The token is decoded without verifying it: choosing a bucket is not an
+        authorization decision, and @jwt_required() verifies it for the view.
+        """
+        authorization = request.headers.get('Authorization', '')
+        if by_user and authorization.startswith('Bearer '):
+            try:
+                identity = jwt.decode(authorization[len('Bearer '):], options={'verify_signature': False}).get('sub')
+                if isinstance(identity, dict) and identity.get('user_id'):
+                    return f"user:{identity['user_id']}"
+            except PyJWTError:
+                # The view reports the bad token; fall back to the IP bucket
+                pass
+
+        address = request.remote_addr
+        if Config.RATE_LIMIT_TRUST_PROXY:
+            address = request.headers.get('X-Real-IP') or address
+        return f"ip:{address}"
+
+    def check(self):
+        """Return a 429 response if the current request is over its limit"""
+        classified = self.classify()
+        if classified is None:
+            return None
+        policy, bucket, cost = classified
+
+        key = f"{bucket}:{self.client_id(by_user=policy.name != 'auth')}"
+        cost = min(cost, policy.capacity)
+        try:
+            wait = self.store.take(key, policy, cost)
+        except PyMongoError as e:
+            logger.warning(f"Shared rate limit store unavailable, using local buckets: {e}")
+            wait = self.memory.take(key, policy, cost)
+
+        if wait <= 0:
+            return None
+
+        retry_after = max(1, math.ceil(wait))
+        response = jsonify({
+            'status': 'error',
+            'message': f'Too many requests. Retry in {retry_after} seconds'
+        })
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
+
+def register_rate_limiting(app):
+    """Apply per-user, per-route token buckets to the API blueprints"""
+    if not Config.RATE_LIMIT_ENABLED:
+        return
+
+    @app.before_request
+    def enforce_rate_limit():
+        return rate_limiter.check()
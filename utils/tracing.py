@@ -0,0 +1,214 @@
+import atexit
+import contextvars
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, request
+from config import Config
+
+# W3C trace context: version-traceid-parentid-flags
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+class Span:
+    """One timed operation in a trace"""
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'sampled',
+                 'attributes', 'status', 'start_ns', '_start')
+
+    def __init__(self, name, trace_id, parent_id, sampled, kind='internal', attributes=None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.sampled = sampled
+        self.attributes = attributes or {}
+        self.status = 'ok'
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+
+    @property
+    def traceparent(self):
+        """W3C traceparent header value for propagating this span downstream"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def to_dict(self, duration):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'kind': self.kind,
+            'start_ns': self.start_ns,
+            'duration_ms': round(duration * 1000, 3),
+            'status': self.status,
+            'attributes': self.attributes
+        }
+
+class FileSpanExporter:
+    """Appends finished spans as JSON lines to a local file from a background thread"""
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, span_data):
+        if self._thread is None:
+            self._start()
+        self._queue.put(span_data)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write every queued span to the file"""
+        lines = []
+        while True:
+            try:
+                lines.append(json.dumps(self._queue.get_nowait(), default=str))
+            except queue.Empty:
+                break
+        if lines:
+            with self._lock, open(self.path, 'a') as f:
+                f.write('\n'.join(lines) + '\n')
+
+class Tracer:
+    def __init__(self):
+        self.enabled = Config.TRACING_ENABLED
+        self.sample_rate = Config.TRACE_SAMPLE_RATE
+        self.exporter = FileSpanExporter(Config.TRACE_FILE)
+
+    @contextmanager
+    def span(self, name, kind='internal', **attributes):
+        """Run a block as a child of the current span (no-op outside a sampled trace)"""
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            yield None
+            return
+
+        span = Span(name, parent.trace_id, parent.span_id, True, kind, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.status = 'error'
+            span.set_attribute('error', type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+    def start_server_span(self, name, traceparent=None, **attributes):
+        """Start the root span of an incoming request, continuing the caller's trace if given"""
+        match = TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+        if match and match.group(1) != '0' * 32:
+            trace_id, parent_id = match.group(1), match.group(2)
+            sampled = int(match.group(3), 16) & 1 == 1
+        else:
+            trace_id, parent_id = os.urandom(16).hex(), None
+            sampled = random.random() < self.sample_rate
+
+        span = Span(name, trace_id, parent_id, sampled, 'server', attributes)
+        return span, _current_span.set(span)
+
+    def end(self, span):
+        if span.sampled:
+            self.exporter.export(span.to_dict(time.perf_counter() - span._start))
+
+tracer = Tracer()
+
+def current_span():
+    return _current_span.get()
+
+def traced(name):
+    """Decorator running a function inside a span"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def traced_service(cls):
+    """Class decorator wrapping every public static method of a service in a span"""
+    for attr, value in list(vars(cls).items()):
+        if isinstance(value, staticmethod) and not attr.startswith('_'):
+            setattr(cls, attr, staticmethod(traced(f"{cls.__name__}.{attr}")(value.__func__)))
+    return cls
+
+def traced_schema(cls):
+    """Class decorator adding a span around marshmallow load/validation"""
+    cls.load = traced(f"{cls.__name__}.load")(cls.load)
+    return cls
+
+def register_tracing(app):
+    """Open a server span per request, honouring an incoming W3C traceparent header"""
+    if not tracer.enabled:
+        return
+
+    @app.before_request
+    def start_request_span():
+        rule = request.url_rule.rule if request.url_rule else 'unmatched'
+        span, token = tracer.start_server_span(
+            f"{request.method} {rule}",
+            request.headers.get('traceparent'),
+            **{'http.method': request.method,
+               'http.route': rule,
+               'http.target': request.full_path.rstrip('?'),
+               'flask.blueprint': request.blueprint or ''})
+        g._trace_span = span
+        g._trace_token = token
+
+    @app.after_request
+    def finish_request_span(response):
+        span = g.get('_trace_span')
+        if span is not None:
+            span.set_attribute('http.status_code', response.status_code)
+            if response.status_code >= 500:
+                span.status = 'error'
+            response.headers['X-Trace-Id'] = span.trace_id
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc):
+        span = g.pop('_trace_span', None)
+        token = g.pop('_trace_token', None)
+        if span is None:
+            return
+        if exc is not None:
+            span.status = 'error'
+            span.set_attribute('error', type(exc).__name__)
+        tracer.end(span)
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Token was created in another context (e.g. a copied one)
+            _current_span.set(None)
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for production servers:
+    gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+
+Builds the app and starts the background workers (cache invalidation
+watcher, recurring expense scheduler) in each server worker that imports
+it. Threads don't survive a fork, so don't combine it with --preload.
+"""
+
+from app import app, start_background_workers
+
+start_background_workers()